@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -14,5 +15,5 @@ from server import approve_and_post_draft
 if __name__ == "__main__":
     draft_id = "020382c6"
     print(f"Attempting to post draft {draft_id}...")
-    result = approve_and_post_draft(draft_id)
+    result = asyncio.run(approve_and_post_draft(draft_id))
     print(result)
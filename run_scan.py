@@ -7,6 +7,8 @@ sys.path.append(os.path.join(os.getcwd(), 'src'))
 
 from ai_handler import AIHandler
 from data_handler import DataManager
+from scan_manifest import DEFAULT_MANIFEST_FILE, ScanManifest
+from image_dedup import DEFAULT_MAX_DISTANCE, cluster_near_duplicates
 
 def scan_and_draft(folder_path):
     load_dotenv()
@@ -15,6 +17,7 @@ def scan_and_draft(folder_path):
     # Force the model to be sure
     ai_handler.model = "gemini-1.5-flash" 
     data_manager = DataManager()
+    scan_manifest = ScanManifest(os.getenv("SCAN_MANIFEST_FILE", DEFAULT_MANIFEST_FILE))
     
     print(f"Scanning {folder_path}...")
     
@@ -32,25 +35,40 @@ def scan_and_draft(folder_path):
         print(f"No images found.")
         return
         
-    for img_file in images:
-        full_path = os.path.join(folder_path, img_file)
-        print(f"Processing {img_file}...")
-        
-        # Generate 3 tweet options
-        generated_tweets = ai_handler.generate_tweet_from_image(full_path, count=3)
-        
-        if generated_tweets and not generated_tweets[0].startswith("Error"):
-            print(f"Generated {len(generated_tweets)} options:")
-            for i, tweet_text in enumerate(generated_tweets):
-                draft_id = data_manager.add_draft(
-                    text=tweet_text,
-                    media_path=full_path,
-                    model=f"{ai_handler.provider}:{ai_handler.model}",
-                    notes=f"Option {i+1} generated from image: {img_file}"
-                )
-                print(f"  [{i+1}] Draft {draft_id}: {tweet_text}")
-        else:
-            print(f"Failed: {generated_tweets[0] if generated_tweets else 'Unknown error'}")
+    # Images drafted by an earlier run are skipped unless they changed
+    paths = scan_manifest.new_or_modified([os.path.join(folder_path, img_file) for img_file in images])
+    print(f"Processing {len(paths)} images ({len(images) - len(paths)} unchanged, skipped)...")
+    # Only one image per group of near-duplicates goes to the model
+    clusters = cluster_near_duplicates(paths, int(os.getenv("IMAGE_DEDUP_DISTANCE", str(DEFAULT_MAX_DISTANCE))))
+    duplicates = {cluster[0]: cluster[1:] for cluster in clusters}
+    print(f"{len(paths) - len(duplicates)} near-duplicates grouped with similar images")
+    scanned = {}
+    with data_manager.write_session() as session:
+        # Generate 3 tweet options per image, several images at a time
+        results = ai_handler.generate_tweets_from_images(list(duplicates), count=3)
+        for full_path, generated_tweets in results:
+            img_file = os.path.basename(full_path)
+            print(f"Processed {img_file}")
+            if generated_tweets and not generated_tweets[0].startswith("Error"):
+                print(f"Generated {len(generated_tweets)} options:")
+                draft_ids = []
+                for i, tweet_text in enumerate(generated_tweets):
+                    draft_id = session.add_draft(
+                        text=tweet_text,
+                        media_path=full_path,
+                        model=f"{ai_handler.provider}:{ai_handler.model}",
+                        notes=f"Option {i+1} generated from image: {img_file}"
+                    )
+                    draft_ids.append(draft_id)
+                    print(f"  [{i+1}] Draft {draft_id}: {tweet_text}")
+                scanned[full_path] = draft_ids
+                for duplicate in duplicates[full_path]:
+                    print(f"  Near-duplicate, skipped: {os.path.basename(duplicate)}")
+                    scanned[duplicate] = draft_ids
+            else:
+                print(f"Failed: {generated_tweets[0] if generated_tweets else 'Unknown error'}")
+    # Recorded once the drafts are saved; failed images are retried next run
+    scan_manifest.record_many(scanned)
 
 if __name__ == "__main__":
     scan_and_draft("/Users/ppt04/Pictures/Twitter MCP/")
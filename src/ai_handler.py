@@ -1,12 +1,21 @@
 import os
-from typing import List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Union
 import json
 import html
+import hashlib
+import threading
+import time
+from media_cache import file_digest
+from response_cache import DEFAULT_CACHE_FILE as DEFAULT_RESPONSE_CACHE_FILE, ResponseCache, request_key
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
+# Model calls in flight at once per provider (override with e.g. GEMINI_MAX_CONCURRENCY)
+DEFAULT_PROVIDER_CONCURRENCY = {"gemini": 4, "openai": 4, "anthropic": 2}
+
 class AIHandler:
     def __init__(self):
         self.provider = "gemini" # Default
@@ -15,6 +24,24 @@ class AIHandler:
         self.voice_profile_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "voice_profile.txt")
         self.client = None
         self._voice_profile_cache = None
+        # Gemini GenerativeModel per model name, built once per configure
+        self._gemini_models = {}
+        self._gemini_models_lock = threading.Lock()
+        self.setup_stats = {"models_built": 0, "build_seconds": 0.0, "models_reused": 0}
+        # Per-provider limits on concurrent calls, shared by every thread using this handler
+        self._provider_slots = {}
+        self._provider_slots_lock = threading.Lock()
+        self.image_workers = int(os.getenv("AI_IMAGE_WORKERS", "8"))
+        # Opt-in: repeated prompts are answered from disk instead of the API
+        self.response_cache = None
+        if os.getenv("LLM_CACHE", "").lower() in ("1", "true", "yes"):
+            cache_path = os.getenv("LLM_CACHE_FILE", DEFAULT_RESPONSE_CACHE_FILE)
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self.response_cache = ResponseCache(
+                cache_path,
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            )
 
         # Initialize default from env if available
         if os.getenv("GEMINI_API_KEY"):
@@ -27,11 +54,15 @@ class AIHandler:
     def configure(self, provider: str, api_key: str, model: str = None):
         self.provider = provider.lower()
         self.api_key = api_key
+        # Models built for the previous provider/key are no longer valid
+        with self._gemini_models_lock:
+            self._gemini_models = {}
         
         if self.provider == "gemini":
             import google.generativeai as genai
             self.model = model or "gemini-1.5-flash-001" # Try specific version
             genai.configure(api_key=self.api_key)
+            self._gemini_model()
         elif self.provider == "openai":
             from openai import OpenAI
             self.model = model or "gpt-4o-mini"
@@ -85,7 +116,7 @@ class AIHandler:
                 return self._voice_profile_cache
         return "No voice profile found. Please run analyze_voice first."
 
-    def generate_tweet(self, topic: str, count: int = 1) -> List[str]:
+    def generate_tweet(self, topic: str, count: int = 1, fresh: bool = False) -> List[str]:
         voice_profile = html.escape(self.get_voice_profile())
         escaped_topic = html.escape(topic)
 
@@ -108,7 +139,7 @@ class AIHandler:
         - Do not number them.
         """
         
-        response = self._call_model(prompt)
+        response = self._call_model(prompt, fresh=fresh)
         tweets = [t.strip() for t in response.split('\n') if t.strip() and not t.strip().startswith('---')]
         # Simple cleanup if the model creates numbered lists
         clean_tweets = []
@@ -119,7 +150,7 @@ class AIHandler:
             
         return clean_tweets[:count]
 
-    def generate_retweet_comment(self, original_tweet_text: str) -> str:
+    def generate_retweet_comment(self, original_tweet_text: str, fresh: bool = False) -> str:
         voice_profile = html.escape(self.get_voice_profile())
         escaped_original_tweet = html.escape(original_tweet_text)
 
@@ -141,9 +172,9 @@ class AIHandler:
         - Output ONLY the comment text.
         """
         
-        return self._call_model(prompt).strip()
+        return self._call_model(prompt, fresh=fresh).strip()
 
-    def generate_tweet_from_image(self, image_path: str, count: int = 1) -> List[str]:
+    def generate_tweet_from_image(self, image_path: str, count: int = 1, fresh: bool = False) -> List[str]:
         if not Image:
              return ["Error: Pillow library not installed. Please install it to use image features."]
              
@@ -166,7 +197,7 @@ class AIHandler:
         
         try:
             img = Image.open(image_path)
-            response = self._call_model(prompt, images=[img])
+            response = self._call_model(prompt, images=[img], fresh=fresh)
             
             tweets = [t.strip() for t in response.split('\n') if t.strip() and not t.strip().startswith('---')]
             clean_tweets = []
@@ -179,37 +210,115 @@ class AIHandler:
         except Exception as e:
             return [f"Error analyzing image: {str(e)}"]
 
-    def _call_model(self, prompt: str, images: list = None) -> str:
+    def generate_tweets_from_images(self, image_paths: List[str], count: int = 1, fresh: bool = False,
+                                    max_workers: int = None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        generate_tweet_from_image for many images on a pool of up to
+        max_workers threads (AI_IMAGE_WORKERS), with calls in flight capped
+        per provider. Yields (image_path, tweets) in image_paths order.
+        """
+        # Load the profile once up front instead of racing on the first read
+        self.get_voice_profile()
+        workers = max(1, min(max_workers or self.image_workers, len(image_paths) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda path: self.generate_tweet_from_image(path, count, fresh=fresh), image_paths)
+            for path, tweets in zip(image_paths, results):
+                yield path, tweets
+
+    def _provider_slot(self, provider: str) -> threading.BoundedSemaphore:
+        with self._provider_slots_lock:
+            slot = self._provider_slots.get(provider)
+            if slot is None:
+                limit = int(os.getenv(f"{provider.upper()}_MAX_CONCURRENCY",
+                                      str(DEFAULT_PROVIDER_CONCURRENCY.get(provider, 4))))
+                slot = threading.BoundedSemaphore(max(1, limit))
+                self._provider_slots[provider] = slot
+            return slot
+
+    def _gemini_model(self):
+        """The GenerativeModel for self.model, built on first use after each configure."""
+        with self._gemini_models_lock:
+            model = self._gemini_models.get(self.model)
+            if model is not None:
+                self.setup_stats["models_reused"] += 1
+                return model
+            import google.generativeai as genai
+            started = time.perf_counter()
+            model = genai.GenerativeModel(self.model)
+            self.setup_stats["models_built"] += 1
+            self.setup_stats["build_seconds"] += time.perf_counter() - started
+            self._gemini_models[self.model] = model
+            return model
+
+    def get_setup_stats(self) -> dict:
+        """
+        Client setup overhead: GenerativeModel constructions, their total
+        time, and the estimated time saved by reusing models instead of
+        building one per call.
+        """
+        with self._gemini_models_lock:
+            stats = dict(self.setup_stats)
+        built = stats["models_built"]
+        average = stats["build_seconds"] / built if built else 0.0
+        stats["avg_build_ms"] = average * 1000
+        stats["saved_seconds"] = average * stats["models_reused"]
+        return stats
+
+    @staticmethod
+    def _image_digest(img) -> str:
+        filename = getattr(img, "filename", "")
+        if filename and os.path.exists(filename):
+            return file_digest(filename)
+        return hashlib.sha256(img.tobytes()).hexdigest()
+
+    def _call_model(self, prompt: str, images: list = None, fresh: bool = False) -> str:
+        """
+        Sends the prompt (and images) to the configured model. With the
+        response cache enabled, a repeat of an earlier request is answered
+        from the cache unless fresh is set; errors are never cached.
+        """
+        if images and self.provider != "gemini":
+            # TODO: Implement OpenAI/Claude Vision support if needed
+            return "Error: Image support only implemented for Gemini currently."
+
+        key = None
+        if self.response_cache is not None:
+            key = request_key(self.provider, self.model, prompt, [self._image_digest(img) for img in images or []])
+            if not fresh:
+                cached = self.response_cache.get(key)
+                if cached is not None:
+                    return cached
+
         try:
-            if self.provider == "gemini":
-                import google.generativeai as genai
-                model = genai.GenerativeModel(self.model)
-                if images:
-                    response = model.generate_content([prompt, *images])
-                else:
-                    response = model.generate_content(prompt)
-                return response.text
-                
-            elif self.provider == "openai":
-                if images:
-                    # TODO: Implement OpenAI Vision support if needed
-                    return "Error: Image support only implemented for Gemini currently."
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.choices[0].message.content
-                
-            elif self.provider == "anthropic":
-                if images:
-                     # TODO: Implement Claude Vision support if needed
-                    return "Error: Image support only implemented for Gemini currently."
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1000,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
-                
+            with self._provider_slot(self.provider):
+                response = self._generate(prompt, images)
         except Exception as e:
             return f"Error generating content: {str(e)}"
+
+        if key is not None and response:
+            self.response_cache.put(key, response)
+        return response
+
+    def _generate(self, prompt: str, images: list = None) -> str:
+        if self.provider == "gemini":
+            model = self._gemini_model()
+            if images:
+                response = model.generate_content([prompt, *images])
+            else:
+                response = model.generate_content(prompt)
+            return response.text
+
+        elif self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.choices[0].message.content
+
+        elif self.provider == "anthropic":
+            response = self.client.messages.create(
+                model=self.model,
+                max_tokens=1000,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.content[0].text
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+from oauthlib.oauth1 import Client as OAuth1Client
+
+from twitter_handler import RateLimitError, TwitterHandler
+
+logger = logging.getLogger(__name__)
+
+class AsyncTwitterHandler:
+    """
+    asyncio counterpart of TwitterHandler with the same public methods, for
+    the MCP server's event loop. Requests go through an httpx.AsyncClient and
+    are signed with OAuth 1.0a by oauthlib.
+
+    Credentials, rate-limit budgets and the user id caches are shared with the
+    wrapped TwitterHandler, so sync and async callers spend the same budgets.
+    Media uploads run the handler's chunked upload pipeline (already parallel
+    and mmap-based) on a worker thread.
+    """
+
+    def __init__(self, handler: TwitterHandler = None, transport: httpx.AsyncBaseTransport = None):
+        self.handler = handler or TwitterHandler()
+        self.transport = transport
+        self.oauth = None
+        if self.handler.consumer_key and self.handler.access_token:
+            self.oauth = OAuth1Client(
+                self.handler.consumer_key,
+                client_secret=self.handler.consumer_secret,
+                resource_owner_key=self.handler.access_token,
+                resource_owner_secret=self.handler.access_token_secret,
+            )
+        self._client = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # An AsyncClient's connections belong to the loop that opened them, so
+        # each event loop (e.g. one per asyncio.run) gets its own client.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            connect_timeout, read_timeout = self.handler.http_timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=self.handler.pool_size),
+                transport=self.transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _send(self, method: str, url: str, params: Dict = None, json_body: Dict = None) -> httpx.Response:
+        request = self._get_client().build_request(method, url, params=params, json=json_body)
+        # JSON bodies are not part of an OAuth 1.0a signature; query parameters are
+        _, headers, _ = self.oauth.sign(str(request.url), http_method=method)
+        request.headers["Authorization"] = headers["Authorization"]
+        return await self._get_client().send(request)
+
+    async def _request(self, method: str, url: str, endpoint: str, params: Dict = None,
+                       json_body: Dict = None) -> httpx.Response:
+        """Async version of TwitterHandler._request: same budget waits, 429 backoff and RateLimitError."""
+        rate_limits = self.handler.rate_limits
+        response = None
+        for attempt in range(self.handler.max_retries + 1):
+            wait = rate_limits.wait_time(endpoint)
+            if wait > self.handler.max_rate_limit_wait:
+                raise RateLimitError(endpoint, wait)
+            if wait > 0:
+                logger.info(f"Rate limit exhausted for {endpoint}; waiting {wait:.0f}s for reset")
+                await asyncio.sleep(wait)
+
+            response = await self._send(method, url, params=params, json_body=json_body)
+            rate_limits.update(endpoint, response)
+            if response.status_code != 429 or attempt == self.handler.max_retries:
+                return response
+
+            delay = self.handler._backoff_delay(attempt)
+            if max(delay, rate_limits.wait_time(endpoint)) > self.handler.max_rate_limit_wait:
+                return response
+            logger.warning(f"429 from {endpoint}; retrying in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+        return response
+
+    async def verify_credentials(self) -> bool:
+        if not self.oauth:
+            return False
+        response = await self._request("GET", "https://api.twitter.com/2/users/me", "GET /2/users/me")
+        if response.status_code == 200:
+            data = response.json().get("data", {})
+            if "id" in data:
+                self.handler.user_id = data["id"]
+            return True
+        return False
+
+    async def upload_media(self, file_path: str) -> Optional[str]:
+        return await asyncio.to_thread(self.handler.upload_media, file_path)
+
+    async def wait_for_media(self, media_id: str, timeout: float = None) -> bool:
+        return await asyncio.to_thread(self.handler.wait_for_media, media_id, timeout)
+
+    async def post_tweet(self, text: str, media_path: str = None, reply_to_id: str = None) -> Dict:
+        """
+        Post tweet using v2 API.
+        """
+        if not self.oauth:
+            raise Exception("Twitter credentials not configured")
+
+        payload = {"text": text}
+
+        if media_path:
+            media_id = await self.upload_media(media_path)
+            if media_id and await self.wait_for_media(media_id):
+                payload["media"] = {"media_ids": [media_id]}
+
+        if reply_to_id:
+            payload["reply"] = {"in_reply_to_tweet_id": reply_to_id}
+
+        try:
+            response = await self._request("POST", "https://api.twitter.com/2/tweets",
+                                           TwitterHandler.TWEETS_ENDPOINT, json_body=payload)
+            if response.status_code == 201:
+                return response.json()
+            return {"error": response.text, "status_code": response.status_code}
+        except RateLimitError as e:
+            return {"error": str(e), "status_code": 429}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _resolve_user_id(self, username: str) -> Optional[str]:
+        user_id = self.handler.username_cache.get(username)
+        if user_id:
+            return user_id
+        user_resp = await self._request("GET", f"https://api.twitter.com/2/users/by/username/{username}",
+                                        "GET /2/users/by/username")
+        return self.handler._record_user_id(username, user_resp)
+
+    async def iter_user_tweets(self, username: str, limit: int = None,
+                               resume: bool = False) -> AsyncIterator[Dict]:
+        """Async generator version of TwitterHandler.iter_user_tweets (same paging and saved cursors)."""
+        user_id = await self._resolve_user_id(username)
+        if not user_id:
+            return
+
+        tweets_url = f"https://api.twitter.com/2/users/{user_id}/tweets"
+        token = self.handler._timeline_start(username, resume)
+        yielded = 0
+        while limit is None or yielded < limit:
+            try:
+                resp = await self._request("GET", tweets_url, "GET /2/users/tweets",
+                                           params=self.handler._timeline_params(limit, yielded, token))
+            except RateLimitError as e:
+                logger.error(f"Stopped fetching tweets for {username}: {e}")
+                return
+            body = self.handler._timeline_body(resp)
+            if body is None:
+                return
+
+            for tweet in body.get("data", []):
+                if limit is not None and yielded >= limit:
+                    return
+                yield tweet
+                yielded += 1
+
+            token = self.handler._record_timeline_page(username, body, resume)
+            if not token:
+                return
+
+    async def get_user_tweets(self, username: str, count: int = 10) -> List[str]:
+        """
+        Fetch the text of a user's latest count tweets, across as many pages
+        as needed.
+        Note: Requires Basic Tier or higher for v2 user timeline.
+        """
+        return [tweet["text"] async for tweet in self.iter_user_tweets(username, limit=count)]
+
+    async def search_tweets(self, query: str, count: int = 10, incremental: bool = False) -> List[Dict]:
+        """
+        Search tweets (Requires Basic Tier). Shares the handler's page cache
+        and since_id cursors; see TwitterHandler.search_tweets.
+        """
+        params = self.handler._search_params(query, count, incremental)
+        cached = self.handler._cached_search(params)
+        if cached is not None:
+            return cached[:count]
+
+        try:
+            resp = await self._request("GET", "https://api.twitter.com/2/tweets/search/recent",
+                                       "GET /2/tweets/search/recent", params=params)
+        except RateLimitError as e:
+            logger.error(f"Search failed: {e}")
+            return []
+
+        if resp.status_code == 200:
+            return self.handler._record_search(params, resp.json())[:count]
+        logger.error(f"Search failed: {resp.text}")
+        return []
+
+    async def retweet(self, tweet_id: str) -> Dict:
+        """
+        Retweet a tweet.
+        """
+        if not self.handler.user_id:
+            me_resp = await self._request("GET", "https://api.twitter.com/2/users/me", "GET /2/users/me")
+            if me_resp.status_code != 200:
+                return {"error": "Failed to get my user ID"}
+            self.handler.user_id = me_resp.json()["data"]["id"]
+
+        try:
+            resp = await self._request("POST", f"https://api.twitter.com/2/users/{self.handler.user_id}/retweets",
+                                       "POST /2/users/retweets", json_body={"tweet_id": tweet_id})
+        except RateLimitError as e:
+            return {"error": str(e)}
+
+        if resp.status_code == 200:
+            return resp.json()
+        return {"error": resp.text}
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+DEFAULT_CURSOR_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "twitter_cursors.json")
+
+
+class CursorStore:
+    """
+    Small persistent key -> dict map for API paging state (pagination tokens,
+    since_ids), so a long fetch can resume where an earlier run stopped.
+    Stored as JSON and reloaded when another process rewrites the file.
+    """
+
+    def __init__(self, path: str = DEFAULT_CURSOR_FILE):
+        self.path = path
+        self._cursors = {}
+        self._signature = False  # not loaded yet
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        cursors = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    cursors = json.load(f).get("cursors", {})
+            except (OSError, ValueError):
+                cursors = {}
+        self._cursors = cursors
+        self._signature = signature
+
+    def _save(self):
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', delete=False, dir=os.path.dirname(self.path) or "."
+        )
+        try:
+            with temp_file as f:
+                json.dump({"cursors": self._cursors}, f, indent=2)
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        self._signature = self._file_signature()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            cursor = self._cursors.get(key)
+            return dict(cursor) if cursor else None
+
+    def set(self, key: str, cursor: Dict):
+        with self._lock:
+            self._ensure_loaded()
+            self._cursors[key] = dict(cursor)
+            self._save()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._ensure_loaded()
+            if self._cursors.pop(key, None) is not None:
+                self._save()
@@ -1,31 +1,32 @@
 import csv
 import os
-import shutil
-import tempfile
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set
+
+import draft_store
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 DRAFTS_FILE = os.path.join(DATA_DIR, "drafts.csv")
 POSTED_LOG = os.path.join(DATA_DIR, "posted_history.csv")
 POST_ATTEMPT_LOG = os.path.join(DATA_DIR, "post_log.csv")
+DRAFTS_DB_FILE = os.path.join(DATA_DIR, "drafts.db")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, backend: str = None):
         self._init_csvs()
+        # Drafts backend: "csv" (default, drafts.csv) or "sqlite" (indexed drafts.db)
+        self.backend = (backend or os.getenv("DRAFTS_BACKEND", "csv")).lower()
+        self.store = draft_store.open_store(self.backend, DRAFTS_FILE, DRAFTS_DB_FILE)
 
     def _init_csvs(self):
         if not os.path.exists(DRAFTS_FILE):
-            headers = [
-                "id", "text", "media_path", "model_used", "status", 
-                "created_at", "scheduled_time", "notes", "is_retweet", "original_tweet_id"
-            ]
             with open(DRAFTS_FILE, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(headers)
+                writer.writerow(draft_store.DRAFT_FIELDS)
         
         if not os.path.exists(POSTED_LOG):
             headers = ["id", "text", "media_path", "posted_at", "tweet_id"]
@@ -39,82 +40,73 @@ class DataManager:
                 writer = csv.writer(f)
                 writer.writerow(headers)
 
+    def _new_draft_row(self, text: str, media_path: str = None, model: str = "manual",
+                       notes: str = "", is_retweet: bool = False, original_tweet_id: str = None) -> Dict:
+        return {
+            "id": str(uuid.uuid4())[:8],
+            "text": text,
+            "media_path": media_path if media_path else "",
+            "model_used": model,
+            "status": "pending",
+            "created_at": datetime.now().isoformat(),
+            "scheduled_time": "",
+            "notes": notes,
+            "is_retweet": is_retweet,
+            "original_tweet_id": original_tweet_id if original_tweet_id else ""
+        }
+
     def add_draft(self, text: str, media_path: str = None, model: str = "manual", 
                  notes: str = "", is_retweet: bool = False, original_tweet_id: str = None) -> str:
-        draft_id = str(uuid.uuid4())[:8]
+        row = self._new_draft_row(text, media_path, model, notes, is_retweet, original_tweet_id)
+        self.store.add([row])
+        return row["id"]
 
-        # Prepare the row data preserving the column order defined in _init_csvs
-        row = [
-            draft_id,
-            text,
-            media_path if media_path else "",
-            model,
-            "pending",
-            datetime.now().isoformat(),
-            "",  # scheduled_time
-            notes,
-            is_retweet,
-            original_tweet_id if original_tweet_id else ""
-        ]
+    def add_drafts(self, drafts: List[Dict]) -> List[str]:
+        """
+        Adds several drafts with a single write to the store.
+        Each item holds add_draft's keyword arguments (text, media_path, model, ...).
+        Returns the new draft IDs in the same order.
+        """
+        rows = [self._new_draft_row(**draft) for draft in drafts]
+        if rows:
+            self.store.add(rows)
+        return [row["id"] for row in rows]
 
-        with open(DRAFTS_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+    @contextmanager
+    def write_session(self):
+        """
+        Buffers add_draft calls and writes them in one batch when the block exits,
+        even if it exits with an exception, so drafts generated so far are kept.
 
-        return draft_id
+            with data_manager.write_session() as session:
+                draft_id = session.add_draft(text="...")
+        """
+        session = DraftWriteSession(self)
+        try:
+            yield session
+        finally:
+            session.flush()
 
     def list_pending_drafts(self) -> List[Dict]:
-        if not os.path.exists(DRAFTS_FILE):
-            return []
+        return self.store.list("pending")
 
-        pending = []
-        with open(DRAFTS_FILE, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("status") == "pending":
-                    pending.append(row)
-        return pending
+    def list_drafts(self, status: str = None) -> List[Dict]:
+        """Lists drafts in insertion order, optionally filtered by status."""
+        return self.store.list(status)
 
     def get_draft(self, draft_id: str) -> Optional[Dict]:
-        if not os.path.exists(DRAFTS_FILE):
-            return None
+        return self.store.get(draft_id)
 
-        with open(DRAFTS_FILE, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("id") == draft_id:
-                    return row
-        return None
+    def drafted_tweet_ids(self) -> Set[str]:
+        """IDs of tweets that already have a retweet draft (any status)."""
+        return {d["original_tweet_id"] for d in self.store.list() if d.get("original_tweet_id")}
 
-    def update_draft_status(self, draft_id: str, status: str):
-        if not os.path.exists(DRAFTS_FILE):
-            return
-
-        # Atomic update using temp file
-        temp_file = tempfile.NamedTemporaryFile(mode='w', newline='', encoding='utf-8', delete=False, dir=DATA_DIR)
-        updated = False
+    def update_draft(self, draft_id: str, **fields) -> bool:
+        """Updates fields of a single draft. Returns False if the draft doesn't exist."""
+        return self.store.update(draft_id, fields)
 
-        try:
-            with open(DRAFTS_FILE, 'r', newline='', encoding='utf-8') as f_in, temp_file as f_out:
-                reader = csv.DictReader(f_in)
-                writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames)
-                writer.writeheader()
-
-                for row in reader:
-                    if row.get("id") == draft_id:
-                        row["status"] = status
-                        updated = True
-                    writer.writerow(row)
-
-            if updated:
-                shutil.move(temp_file.name, DRAFTS_FILE)
-            else:
-                os.unlink(temp_file.name)
-
-        except Exception as e:
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
-            raise e
+    def update_draft_status(self, draft_id: str, status: str):
+        self.update_draft(draft_id, status=status)
 
     def mark_as_posted(self, draft_id: str, tweet_id: str, text: str = None, media_path: str = None):
         """
@@ -185,25 +177,69 @@ class DataManager:
         """
         safe_file = os.path.join(DATA_DIR, "drafts_safe_export.csv")
 
-        if not os.path.exists(DRAFTS_FILE):
-             # If no file, just create empty export
-             with open(safe_file, 'w', newline='', encoding='utf-8') as f:
-                 pass # Or headers? Let's assume headers are needed if possible but DictReader handles reading.
-                 # If original doesn't exist, we can't read fieldnames.
-             return safe_file
-
-        with open(DRAFTS_FILE, 'r', newline='', encoding='utf-8') as f_in, \
-             open(safe_file, 'w', newline='', encoding='utf-8') as f_out:
-
-            reader = csv.DictReader(f_in)
-            writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames)
+        with open(safe_file, 'w', newline='', encoding='utf-8') as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=draft_store.DRAFT_FIELDS, extrasaction='ignore')
             writer.writeheader()
 
-            for row in reader:
+            for row in self.store.list():
                 safe_row = {k: self._sanitize_csv_field(v) for k, v in row.items()}
                 writer.writerow(safe_row)
 
         return safe_file
 
+    def import_drafts_csv(self, csv_path: str = None) -> int:
+        """
+        Imports drafts from a CSV (default: drafts.csv) into the active backend.
+        Drafts that already exist are skipped. Returns the number of rows read.
+        """
+        csv_path = csv_path or DRAFTS_FILE
+        if isinstance(self.store, draft_store.CSVDraftStore) and os.path.abspath(csv_path) == os.path.abspath(self.store.path):
+            return 0
+        return draft_store.import_csv(csv_path, self.store)
+
+    def export_drafts_csv(self, csv_path: str = None) -> str:
+        """
+        Writes the current drafts to a CSV (default: drafts.csv) so the
+        git-committed artifact stays in sync with the active backend.
+        """
+        csv_path = csv_path or DRAFTS_FILE
+        mirror_path = getattr(self.store, "csv_path", None) or getattr(self.store, "path", "")
+        if os.path.abspath(csv_path) == os.path.abspath(mirror_path):
+            # drafts.csv is the CSV store itself or the SQLite store's mirror:
+            # fold pending journal entries into it
+            self.store.compact()
+            return csv_path
+        return draft_store.export_csv(self.store, csv_path)
+
     def get_path_to_drafts_file(self) -> str:
         return DRAFTS_FILE
+
+    def get_storage_paths(self) -> List[str]:
+        """Files that change whenever drafts change, for watchers such as the posting daemon."""
+        if isinstance(self.store, draft_store.CSVDraftStore):
+            return [self.store.path, self.store.journal_path]
+        paths = [self.store.path, self.store.path + "-wal"]
+        if self.store.csv_path:
+            # A pulled drafts.csv is merged into the database on the next access
+            paths += [self.store.csv_path, os.path.splitext(self.store.csv_path)[0] + "_journal.csv"]
+        return paths
+
+
+class DraftWriteSession:
+    """Collects new drafts for DataManager.write_session and writes them together."""
+
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self._rows = []
+
+    def add_draft(self, text: str, media_path: str = None, model: str = "manual",
+                  notes: str = "", is_retweet: bool = False, original_tweet_id: str = None) -> str:
+        row = self.data_manager._new_draft_row(text, media_path, model, notes, is_retweet, original_tweet_id)
+        self._rows.append(row)
+        return row["id"]
+
+    def flush(self):
+        """Writes buffered drafts now; the session can keep collecting afterwards."""
+        if self._rows:
+            rows, self._rows = self._rows, []
+            self.data_manager.store.add(rows)
@@ -0,0 +1,491 @@
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: writers are only serialised within a process
+
+# Column order of drafts.csv. Every backend stores and returns drafts as
+# dicts keyed by these names with string values, exactly like csv.DictReader.
+DRAFT_FIELDS = [
+    "id", "text", "media_path", "model_used", "status",
+    "created_at", "scheduled_time", "notes", "is_retweet", "original_tweet_id"
+]
+
+
+def _to_str(value) -> str:
+    """Mirror csv.writer's conversion so every backend returns the same strings."""
+    if value is None:
+        return ""
+    return str(value)
+
+
+JOURNAL_FIELDS = ["timestamp", "draft_id", "field", "value"]
+
+
+class CSVDraftStore:
+    """
+    Drafts stored in a single CSV file (the original storage format).
+
+    Field changes (status, scheduled_time, ...) are not written into drafts.csv
+    directly. They are appended to a small journal next to it and folded into
+    the rows on read, so an update is an O(1) append instead of an O(N) rewrite.
+    Once the journal holds compact_every entries it is folded into drafts.csv
+    with an atomic replace and truncated. Replaying a journal entry is
+    idempotent, so a crash between the replace and the truncate loses nothing.
+
+    Parsed drafts are kept in memory, keyed by id and bucketed by status, and
+    revalidated with os.stat (inode, mtime_ns, size) of both files, so gets and
+    lists are dictionary lookups unless another process touched the files.
+
+    Writers in different processes (the server, the posting daemon) take an
+    flock on drafts.csv around load, append and compact, so no write lands
+    between this process's reload and its own append unseen.
+    """
+
+    def __init__(self, path: str, compact_every: int = 500):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + "_journal.csv"
+        self.compact_every = compact_every
+        self._journal_entries = 0
+
+        # Parsed view of the file, revalidated with os.stat before every access
+        # and only re-read when another process (e.g. post_scheduler.py) changed it.
+        self._lock = threading.RLock()
+        self._signature = None
+        self._by_id = {}
+        self._positions = {}
+        self._by_status = {}
+        self._unsorted_statuses = set()
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.path, self.journal_path):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_journal(self) -> List[List[str]]:
+        if not os.path.exists(self.journal_path):
+            return []
+
+        entries = []
+        with open(self.journal_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for entry in reader:
+                # A torn last line from a crash mid-append is skipped
+                if len(entry) == len(JOURNAL_FIELDS):
+                    entries.append(entry)
+        return entries
+
+    def _has_torn_tail(self) -> bool:
+        with open(self.journal_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _ensure_loaded(self):
+        """Reads drafts.csv and applies pending journal entries, unless the cached view is current."""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        rows = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r', newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self._by_id = {}
+        self._positions = {}
+        for position, row in enumerate(rows):
+            self._by_id[row.get("id")] = row
+            self._positions[row.get("id")] = position
+
+        entries = self._read_journal()
+        for _, draft_id, field, value in entries:
+            row = self._by_id.get(draft_id)
+            if row is not None and field in DRAFT_FIELDS and field != "id":
+                row[field] = value
+        self._journal_entries = len(entries)
+
+        self._by_status = {}
+        for draft_id, row in self._by_id.items():
+            self._by_status.setdefault(row.get("status"), {})[draft_id] = row
+        self._unsorted_statuses = set()
+        self._signature = signature
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive flock on drafts.csv for one write, across processes (self._lock held)."""
+        if fcntl is None or not os.path.exists(self.path):
+            yield
+            return
+        while True:
+            f = open(self.path, 'rb')
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path).st_ino == os.fstat(f.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            # compact() replaced drafts.csv while we waited; lock the new file
+            f.close()
+        try:
+            yield
+        finally:
+            f.close()
+
+    def _index_row(self, row: Dict):
+        draft_id = row.get("id")
+        self._by_id[draft_id] = row
+        self._positions[draft_id] = len(self._positions)
+        self._by_status.setdefault(row.get("status"), {})[draft_id] = row
+
+    def add(self, rows: List[Dict]):
+        with self._lock, self._write_lock():
+            self._ensure_loaded()
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerows([row.get(field, "") for field in DRAFT_FIELDS] for row in rows)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Apply our own write to the cached view instead of re-reading the file
+            for row in rows:
+                self._index_row({field: _to_str(row.get(field, "")) for field in DRAFT_FIELDS})
+            self._signature = self._file_signature()
+
+    def get(self, draft_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            row = self._by_id.get(draft_id)
+            # Copies keep callers from mutating the cached view
+            return dict(row) if row is not None else None
+
+    def list(self, status: str = None) -> List[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            if status is None:
+                return [dict(row) for row in self._by_id.values()]
+
+            bucket = self._by_status.get(status)
+            if not bucket:
+                return []
+            if status in self._unsorted_statuses:
+                # Drafts that changed status were appended to the bucket; restore file order
+                ordered = sorted(bucket, key=self._positions.__getitem__)
+                self._by_status[status] = bucket = {draft_id: bucket[draft_id] for draft_id in ordered}
+                self._unsorted_statuses.discard(status)
+            return [dict(row) for row in bucket.values()]
+
+    def update(self, draft_id: str, fields: Dict) -> bool:
+        with self._lock, self._write_lock():
+            self._ensure_loaded()
+            row = self._by_id.get(draft_id)
+            if row is None:
+                return False
+
+            new_journal = not os.path.exists(self.journal_path)
+            timestamp = datetime.now().isoformat()
+            with open(self.journal_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_journal:
+                    writer.writerow(JOURNAL_FIELDS)
+                elif self._has_torn_tail():
+                    # Terminate a partial line left by a crash so it can't swallow this entry
+                    f.write("\r\n")
+                for field, value in fields.items():
+                    writer.writerow([timestamp, draft_id, field, _to_str(value)])
+                # The journal is the only record of the change until compaction
+                f.flush()
+                os.fsync(f.fileno())
+
+            old_status = row.get("status")
+            for field, value in fields.items():
+                if field in DRAFT_FIELDS and field != "id":
+                    row[field] = _to_str(value)
+            if row.get("status") != old_status:
+                self._by_status.get(old_status, {}).pop(draft_id, None)
+                self._by_status.setdefault(row.get("status"), {})[draft_id] = row
+                self._unsorted_statuses.add(row.get("status"))
+            self._signature = self._file_signature()
+
+            self._journal_entries += len(fields)
+            if self._journal_entries >= self.compact_every:
+                self._compact()
+            return True
+
+    def compact(self):
+        """Folds the journal into drafts.csv and truncates it."""
+        with self._lock, self._write_lock():
+            self._compact()
+
+    def _compact(self):
+        # Called with both locks held
+        if not os.path.exists(self.path) or not os.path.exists(self.journal_path):
+            return
+
+        self._ensure_loaded()
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', newline='', encoding='utf-8', delete=False, dir=os.path.dirname(self.path)
+        )
+        try:
+            with temp_file as f_out:
+                writer = csv.DictWriter(f_out, fieldnames=DRAFT_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(self._by_id.values())
+                f_out.flush()
+                os.fsync(f_out.fileno())
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+
+        os.unlink(self.journal_path)
+        self._journal_entries = 0
+        self._signature = self._file_signature()
+
+
+class SQLiteDraftStore:
+    """
+    Drafts stored in SQLite (WAL mode) with indexes on id, status and
+    scheduled_time, so lookups and single-row updates don't touch every draft.
+
+    With csv_path set, drafts.csv is kept as a mirror for the CSV-backed
+    posting job: new drafts are appended to it and changes to its journal,
+    exactly as CSVDraftStore writes them, so a write stays O(1). When it
+    changes outside this store (e.g. a git pull bringing in drafts the job
+    marked posted) its rows are merged back into the database before the
+    next read or write.
+    """
+
+    def __init__(self, path: str, csv_path: str = None):
+        self.path = path
+        self.csv_path = csv_path
+        self._mirror = CSVDraftStore(csv_path) if csv_path else None
+        # Signature of drafts.csv (and its journal) as of the last sync, see _sync_from_csv
+        self._csv_signature = None
+        # One connection shared by all threads of this process, serialised by a lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{field} TEXT NOT NULL DEFAULT ''" for field in DRAFT_FIELDS[1:])
+            # seq preserves insertion order, matching the append order of drafts.csv
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS drafts ("
+                f"seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, {columns})"
+            )
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_drafts_id ON drafts(id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status, seq)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_scheduled_time ON drafts(scheduled_time)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if self.csv_path:
+            if not os.path.exists(self.csv_path):
+                with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerow(DRAFT_FIELDS)
+            with self._lock:
+                self._sync_from_csv()
+
+    def _mirror_signature(self) -> str:
+        return json.dumps(self._mirror._file_signature())
+
+    def _sync_from_csv(self):
+        """Merges drafts.csv into the database if it changed since the last sync (lock held)."""
+        signature = self._mirror_signature()
+        if signature == self._csv_signature:
+            return
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'csv_signature'").fetchone()
+        if row is None or row[0] != signature:
+            # The CSV wins for drafts in both: it carries the posting job's status changes.
+            # Drafts only in the database are kept and appended to the CSV.
+            # A database that predates the mirror is only overridden by a newer CSV.
+            rows = self._mirror.list()
+            placeholders = ", ".join("?" for _ in DRAFT_FIELDS)
+            if row is not None or self._csv_is_newer():
+                assignments = ", ".join(f"{field} = excluded.{field}" for field in DRAFT_FIELDS[1:])
+                on_conflict = f"ON CONFLICT(id) DO UPDATE SET {assignments}"
+            else:
+                on_conflict = "ON CONFLICT(id) DO NOTHING"
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO drafts ({', '.join(DRAFT_FIELDS)}) VALUES ({placeholders}) {on_conflict}",
+                    [[_to_str(r.get(field, "")) for field in DRAFT_FIELDS] for r in rows]
+                )
+            in_csv = {r.get("id") for r in rows}
+            missing = [
+                self._row_to_dict(r) for r in self._conn.execute("SELECT * FROM drafts ORDER BY seq")
+                if r["id"] not in in_csv
+            ]
+            if missing:
+                self._mirror.add(missing)
+                signature = self._mirror_signature()
+            with self._conn:
+                self._set_csv_signature(signature)
+        self._csv_signature = signature
+
+    def _csv_is_newer(self) -> bool:
+        def mtime(path):
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                return 0
+        return (max(mtime(self._mirror.path), mtime(self._mirror.journal_path))
+                >= max(mtime(self.path), mtime(self.path + "-wal")))
+
+    def _set_csv_signature(self, signature: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_signature', ?)", (signature,))
+
+    def _mirrored(self):
+        """Records the mirror's signature after this store wrote to it (lock held)."""
+        signature = self._mirror_signature()
+        with self._conn:
+            self._set_csv_signature(signature)
+        self._csv_signature = signature
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict:
+        return {field: row[field] for field in DRAFT_FIELDS}
+
+    def compact(self):
+        """Folds the mirror's journal into drafts.csv."""
+        if self._mirror:
+            with self._lock:
+                self._mirror.compact()
+                self._mirrored()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            if self.csv_path:
+                self._sync_from_csv()
+            return self._conn.execute("SELECT 1 FROM drafts LIMIT 1").fetchone() is None
+
+    def add(self, rows: List[Dict]):
+        placeholders = ", ".join("?" for _ in DRAFT_FIELDS)
+        values = [[_to_str(row.get(field, "")) for field in DRAFT_FIELDS] for row in rows]
+        with self._lock:
+            if self.csv_path:
+                self._sync_from_csv()
+            with self._conn:
+                cursor = self._conn.executemany(
+                    f"INSERT OR IGNORE INTO drafts ({', '.join(DRAFT_FIELDS)}) VALUES ({placeholders})",
+                    values
+                )
+            if self.csv_path and cursor.rowcount > 0:
+                # Every CSV draft is in the database after the sync, so rows it lacks are new
+                self._mirror.add([row for row in rows if self._mirror.get(row.get("id")) is None])
+                self._mirrored()
+
+    def get(self, draft_id: str) -> Optional[Dict]:
+        with self._lock:
+            if self.csv_path:
+                self._sync_from_csv()
+            row = self._conn.execute("SELECT * FROM drafts WHERE id = ?", (draft_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, status: str = None) -> List[Dict]:
+        with self._lock:
+            if self.csv_path:
+                self._sync_from_csv()
+            if status is None:
+                rows = self._conn.execute("SELECT * FROM drafts ORDER BY seq").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM drafts WHERE status = ? ORDER BY seq", (status,)
+                ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def update(self, draft_id: str, fields: Dict) -> bool:
+        columns = [field for field in fields if field in DRAFT_FIELDS and field != "id"]
+        if not columns:
+            return self.get(draft_id) is not None
+
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        values = [_to_str(fields[column]) for column in columns]
+        with self._lock:
+            if self.csv_path:
+                self._sync_from_csv()
+            with self._conn:
+                cursor = self._conn.execute(
+                    f"UPDATE drafts SET {assignments} WHERE id = ?", (*values, draft_id)
+                )
+            if self.csv_path and cursor.rowcount > 0:
+                self._mirror.update(draft_id, {column: fields[column] for column in columns})
+                self._mirrored()
+        return cursor.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def import_csv(csv_path: str, store) -> int:
+    """
+    One-shot import of an existing drafts CSV into a store.
+    Drafts whose id already exists in the store are left untouched.
+    Returns the number of rows read from the CSV.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    if rows:
+        store.add(rows)
+    return len(rows)
+
+
+def export_csv(store, csv_path: str) -> str:
+    """
+    Writes every draft in the store to csv_path in the drafts.csv format.
+    The file is replaced atomically so readers never see a partial export.
+    """
+    temp_file = tempfile.NamedTemporaryFile(
+        mode='w', newline='', encoding='utf-8', delete=False, dir=os.path.dirname(csv_path)
+    )
+    try:
+        with temp_file as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=DRAFT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for row in store.list():
+                writer.writerow(row)
+        shutil.move(temp_file.name, csv_path)
+    except Exception as e:
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+        raise e
+
+    return csv_path
+
+
+def open_store(backend: str, csv_path: str, db_path: str):
+    """
+    Creates the draft store for the configured backend.
+    A SQLite database keeps the drafts CSV as a two-way mirror, so the
+    CSV-backed posting job and the database see the same drafts.
+    """
+    backend = (backend or "csv").lower()
+    if backend == "csv":
+        return CSVDraftStore(csv_path)
+    if backend == "sqlite":
+        return SQLiteDraftStore(db_path, csv_path=csv_path)
+    raise ValueError(f"Unknown drafts backend: {backend}. Use 'csv' or 'sqlite'.")
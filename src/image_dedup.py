@@ -0,0 +1,116 @@
+import logging
+from typing import Callable, List, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Differing bits (of 64) at which two images still count as near-duplicates
+DEFAULT_MAX_DISTANCE = 6
+
+
+def dhash(path: str, hash_size: int = 8) -> int:
+    """
+    Difference hash: the image as a (hash_size + 1) x hash_size grayscale
+    thumbnail, one bit per pixel for whether it is brighter than its right
+    neighbour. Resizing, re-encoding and small edits change few bits.
+    """
+    with Image.open(path) as img:
+        # Lets JPEG decode at a reduced scale instead of full resolution
+        img.draft("L", (hash_size * 8, hash_size * 8))
+        small = ImageOps.exif_transpose(img).convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = small.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over hashes under Hamming distance. A search only
+    descends into children whose edge distance is within max_distance of the
+    query's distance to the node (triangle inequality), so lookups skip most
+    of the tree.
+    """
+
+    def __init__(self):
+        self._root = None  # [hash, item, {distance: child}]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item):
+        self._size += 1
+        if self._root is None:
+            self._root = [value, item, {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item, {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, object]]:
+        """(distance, item) for every entry within max_distance of value, nearest first."""
+        matches = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                matches.append((distance, node[1]))
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+def cluster_near_duplicates(paths: List[str], max_distance: int = DEFAULT_MAX_DISTANCE,
+                            hasher: Callable[[str], int] = None) -> List[List[str]]:
+    """
+    Groups paths into clusters of near-identical images, in order of first
+    appearance. The first image of each cluster is its representative;
+    every other member is within max_distance of it. Images that can't be
+    hashed get a cluster of their own.
+    """
+    if hasher is None:
+        if Image is None:
+            return [[path] for path in paths]
+        hasher = dhash
+
+    clusters = []
+    representatives = BKTree()
+    for path in paths:
+        try:
+            value = hasher(path)
+        except Exception as e:
+            logger.warning(f"Could not hash {path}: {str(e)}")
+            clusters.append([path])
+            continue
+
+        matches = representatives.search(value, max_distance)
+        if matches:
+            # Nearest representative; ties go to the earliest cluster
+            _, cluster = min(matches)
+            clusters[cluster].append(path)
+        else:
+            representatives.add(value, len(clusters))
+            clusters.append([path])
+    return clusters
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "media_cache.json")
+# Uploaded media ids expire after 24 hours unless FINALIZE says otherwise
+DEFAULT_EXPIRES_AFTER_SECS = 24 * 60 * 60
+# Stop handing out an id this long before it expires, so a post never races the expiry
+EXPIRY_MARGIN_SECS = 10 * 60
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, as hex."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MediaCache:
+    """
+    Persistent map from (content hash, media type) to an uploaded Twitter
+    media_id and when it expires, so the same image attached to several
+    drafts is uploaded once. Stored as JSON; reloaded when another process
+    rewrites the file.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE):
+        self.path = path
+        self._entries = {}
+        self._signature = False  # not loaded yet
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(digest: str, media_type: str) -> str:
+        return f"{media_type}:{digest}"
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        entries = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                entries = {}  # a corrupt cache only costs re-uploads
+        self._entries = entries
+        self._signature = signature
+
+    def _save(self):
+        now = time.time()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry["expires_at"] > now}
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', delete=False, dir=os.path.dirname(self.path) or "."
+        )
+        try:
+            with temp_file as f:
+                json.dump({"entries": self._entries}, f)
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        self._signature = self._file_signature()
+
+    def get(self, digest: str, media_type: str) -> Optional[str]:
+        """The cached media_id for this content, if it has not expired."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(self._key(digest, media_type))
+            if entry and entry["expires_at"] > time.time():
+                return entry["media_id"]
+            return None
+
+    def put(self, digest: str, media_type: str, media_id: str,
+            expires_after_secs: int = DEFAULT_EXPIRES_AFTER_SECS):
+        expires_at = time.time() + expires_after_secs - EXPIRY_MARGIN_SECS
+        with self._lock:
+            self._ensure_loaded()
+            self._entries[self._key(digest, media_type)] = {"media_id": media_id, "expires_at": expires_at}
+            self._save()
+
+    def invalidate(self, media_id: str):
+        """Drops every entry pointing at media_id (e.g. after processing failed)."""
+        with self._lock:
+            self._ensure_loaded()
+            keys = [key for key, entry in self._entries.items() if entry["media_id"] == media_id]
+            if keys:
+                for key in keys:
+                    del self._entries[key]
+                self._save()
@@ -0,0 +1,137 @@
+import logging
+import mimetypes
+import os
+import tempfile
+
+from media_cache import file_digest
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    # HEIC/HEIF support is optional
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "twitter-voice-mcp", "media")
+# Twitter's limits for photos
+MAX_DIMENSION = 4096
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+    ".mov": "video/mp4",
+}
+# Formats Twitter accepts as photos without conversion
+UPLOADABLE_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+
+def media_type_for(file_path: str) -> str:
+    """MIME type to declare in INIT, from the file extension."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in MEDIA_TYPES:
+        return MEDIA_TYPES[ext]
+    guessed, _ = mimetypes.guess_type(file_path)
+    return guessed or "image/jpeg"
+
+
+class MediaPreparer:
+    """
+    Prepares photos for upload: applies the EXIF orientation, downsizes to
+    MAX_DIMENSION, strips EXIF and other metadata, and re-encodes to JPEG
+    (PNG when the image has transparency). Prepared files are cached on disk
+    by the source's content hash, so each photo is processed once. Videos,
+    GIFs and files Pillow can't read are uploaded unchanged.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_dimension: int = MAX_DIMENSION,
+                 jpeg_quality: int = 85):
+        self.cache_dir = cache_dir
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+
+    def _cached_path(self, digest: str, ext: str) -> str:
+        # Settings are part of the name, so changing them re-prepares
+        return os.path.join(self.cache_dir, f"{digest}-{self.max_dimension}-{self.jpeg_quality}{ext}")
+
+    def prepare(self, file_path: str) -> str:
+        """Path of the file to upload in place of file_path (file_path itself if no work was needed)."""
+        media_type = media_type_for(file_path)
+        if Image is None or not media_type.startswith("image/") or media_type == "image/gif":
+            return file_path
+        try:
+            return self._prepare(file_path)
+        except Exception as e:
+            logger.warning(f"Could not prepare {file_path}, uploading it as-is: {str(e)}")
+            return file_path
+
+    def _prepare(self, file_path: str) -> str:
+        digest = file_digest(file_path)
+        for ext in (".jpg", ".png"):
+            cached = self._cached_path(digest, ext)
+            if os.path.exists(cached):
+                return cached
+
+        with Image.open(file_path) as img:
+            if img.format == "GIF" or getattr(img, "is_animated", False):
+                return file_path
+            if self._upload_as_is(file_path, img):
+                return file_path
+
+            icc_profile = img.info.get("icc_profile")
+            prepared = ImageOps.exif_transpose(img)
+            prepared.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+
+            if self._has_alpha(prepared):
+                ext, save_args = ".png", {"format": "PNG", "optimize": True}
+                if prepared.mode not in ("RGBA", "LA"):
+                    prepared = prepared.convert("RGBA")
+            else:
+                ext = ".jpg"
+                save_args = {"format": "JPEG", "quality": self.jpeg_quality, "optimize": True, "progressive": True}
+                if prepared.mode != "RGB":
+                    prepared = prepared.convert("RGB")
+            if icc_profile:
+                save_args["icc_profile"] = icc_profile
+
+            return self._save(prepared, self._cached_path(digest, ext), save_args)
+
+    def _upload_as_is(self, file_path: str, img) -> bool:
+        """Already an uploadable format, small enough and free of EXIF metadata."""
+        return (
+            img.format in UPLOADABLE_FORMATS
+            and max(img.size) <= self.max_dimension
+            and "exif" not in img.info
+            and not img.getexif()
+            and os.path.getsize(file_path) <= MAX_IMAGE_BYTES
+        )
+
+    @staticmethod
+    def _has_alpha(img) -> bool:
+        if img.mode in ("RGBA", "LA"):
+            return img.getchannel("A").getextrema()[0] < 255
+        return img.mode == "P" and "transparency" in img.info
+
+    def _save(self, img, path: str, save_args: dict) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file = tempfile.NamedTemporaryFile(delete=False, dir=self.cache_dir, suffix=".tmp")
+        try:
+            with temp_file as f:
+                img.save(f, **save_args)
+            os.replace(temp_file.name, path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        return path
@@ -0,0 +1,123 @@
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessingHandle:
+    """Pending result of Twitter's server-side processing of one uploaded media id."""
+
+    def __init__(self, media_id: str):
+        self.media_id = media_id
+        self.state = "pending"
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until processing finishes (or timeout). True only if it succeeded."""
+        self._done.wait(timeout)
+        return self.state == "succeeded"
+
+    def _finish(self, state: str, error=None):
+        self.state = state
+        self.error = error
+        self._done.set()
+
+
+class MediaProcessingTracker:
+    """
+    Polls STATUS for every media id still processing on one background
+    thread, each at the check_after_secs Twitter asked for. Uploads return
+    as soon as FINALIZE is accepted; whoever needs the media ready waits on
+    its handle, so one video processing doesn't hold up anything else.
+
+    check_status(media_id) returns the processing_info dict, or None if the
+    STATUS call failed. on_failed(media_id) is called when processing fails.
+    """
+
+    def __init__(self, check_status: Callable[[str], Optional[Dict]],
+                 on_failed: Callable[[str], None] = None, max_check_interval: float = 30):
+        self._check_status = check_status
+        self._on_failed = on_failed
+        self.max_check_interval = max_check_interval
+        self._handles = {}
+        self._queue = []  # heap of (monotonic due time, media_id)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _delay(self, processing_info: Optional[Dict]) -> float:
+        delay = (processing_info or {}).get("check_after_secs", 5)
+        if not isinstance(delay, (int, float)):
+            delay = 5
+        return min(max(0, delay), self.max_check_interval)
+
+    def track(self, media_id: str, processing_info: Dict = None) -> ProcessingHandle:
+        """Starts (or joins) background polling for media_id and returns its handle."""
+        with self._cond:
+            handle = self._handles.get(media_id)
+            if handle is not None and not handle.done:
+                return handle
+            handle = ProcessingHandle(media_id)
+            self._handles[media_id] = handle
+            heapq.heappush(self._queue, (time.monotonic() + self._delay(processing_info), media_id))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="media-processing", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return handle
+
+    def get(self, media_id: str) -> Optional[ProcessingHandle]:
+        with self._cond:
+            return self._handles.get(media_id)
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for handle in self._handles.values() if not handle.done)
+
+    def _next_due(self) -> Optional[str]:
+        """Waits for the next media id to poll; None when nothing is left (the thread then exits)."""
+        with self._cond:
+            while self._queue:
+                due, media_id = self._queue[0]
+                delay = due - time.monotonic()
+                if delay <= 0:
+                    heapq.heappop(self._queue)
+                    return media_id
+                self._cond.wait(delay)
+            self._thread = None
+            return None
+
+    def _run(self):
+        while True:
+            media_id = self._next_due()
+            if media_id is None:
+                return
+            handle = self.get(media_id)
+
+            try:
+                info = self._check_status(media_id)
+            except Exception as e:
+                logger.error(f"STATUS check failed for media {media_id}: {str(e)}")
+                info = None
+
+            state = info.get("state") if info else "failed"
+            if state == "succeeded":
+                handle._finish("succeeded")
+            elif state == "failed":
+                logger.error(f"Media processing failed for {media_id}: {info}")
+                handle._finish("failed", (info or {}).get("error"))
+                if self._on_failed:
+                    try:
+                        self._on_failed(media_id)
+                    except Exception as e:
+                        logger.error(f"Error handling failed media {media_id}: {str(e)}")
+            else:
+                with self._cond:
+                    heapq.heappush(self._queue, (time.monotonic() + self._delay(info), media_id))
@@ -2,83 +2,293 @@
 """
 Scheduled tweet posting script for GitHub Actions.
 Fetches all due scheduled tweets and posts them to Twitter.
+
+Run with --daemon to stay resident instead: the process sleeps until the next
+scheduled post or strategy slot and wakes early when the drafts change.
 """
 
+import argparse
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from scheduler import TweetScheduler
 from twitter_handler import TwitterHandler
 from data_handler import DataManager
 
-def main():
+class PostingBudget:
+    """
+    Per-endpoint call budgets for one posting pass, shared by the workers.
+    Drafts that would exceed a budget are deferred to a later run instead of
+    being sent to an endpoint that is about to answer 429.
+    """
+
+    # (budget, rate-limited endpoint, calls per post). A media post makes at
+    # least three upload calls (INIT, APPEND, FINALIZE).
+    ENDPOINTS = (("tweets", TwitterHandler.TWEETS_ENDPOINT, 1),
+                 ("media", TwitterHandler.MEDIA_UPLOAD_ENDPOINT, 3))
+
+    def __init__(self, limits: Dict[str, int] = None):
+        if limits is None:
+            limits = {
+                "tweets": int(os.getenv("POST_BUDGET_TWEETS", "100")),
+                "media": int(os.getenv("POST_BUDGET_MEDIA", "100")),
+            }
+        self._remaining = dict(limits)
+        self._lock = threading.Lock()
+        self.deferred = 0
+
+    @classmethod
+    def from_rate_limits(cls, rate_limits: Dict[str, Dict]) -> "PostingBudget":
+        """
+        Default budgets, lowered to what TwitterHandler last saw in the
+        x-rate-limit-remaining headers.
+        """
+        budget = cls()
+        for name, endpoint, calls_per_post in cls.ENDPOINTS:
+            remaining = rate_limits.get(endpoint, {}).get("remaining")
+            if isinstance(remaining, int):
+                budget._remaining[name] = min(budget._remaining[name], remaining // calls_per_post)
+        return budget
+
+    @classmethod
+    def reset_time(cls, rate_limits: Dict[str, Dict]) -> Optional[datetime]:
+        """When the first posting endpoint that can't take another post resets its window, if known."""
+        resets = []
+        for _, endpoint, calls_per_post in cls.ENDPOINTS:
+            entry = rate_limits.get(endpoint, {})
+            remaining = entry.get("remaining")
+            if isinstance(remaining, int) and remaining < calls_per_post and entry.get("reset"):
+                resets.append(entry["reset"])
+        return datetime.fromtimestamp(min(resets), timezone.utc) if resets else None
+
+    def try_acquire(self, *endpoints: str) -> bool:
+        """Reserves one call on each endpoint, all or nothing."""
+        with self._lock:
+            if any(self._remaining.get(endpoint, 1) <= 0 for endpoint in endpoints):
+                self.deferred += 1
+                return False
+            for endpoint in endpoints:
+                if endpoint in self._remaining:
+                    self._remaining[endpoint] -= 1
+            return True
+
+def _post_one(post: Dict, twitter: TwitterHandler, budget: PostingBudget) -> Optional[Dict]:
+    media_path = post["media_path"]
+    endpoints = ("tweets", "media") if media_path else ("tweets",)
+    if not budget.try_acquire(*endpoints):
+        return None
+    print(f"  Posting [{post['id']}]...")
+    return twitter.post_tweet(post["text"], media_path if media_path else None)
+
+def post_concurrently(posts: List[Dict], twitter: TwitterHandler, max_workers: int = 4,
+                      budget: PostingBudget = None) -> Iterator[Tuple[Dict, Optional[Dict], Optional[Exception]]]:
+    """
+    Posts drafts on a bounded worker pool and yields (post, result, error) as
+    each finishes. result is None when the draft was deferred by the budget.
+    """
+    budget = budget or PostingBudget()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(_post_one, post, twitter, budget): post for post in posts}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+def process_due_posts(scheduler: TweetScheduler, twitter: TwitterHandler, data_manager: DataManager,
+                      check_strategy_slot: bool = True, max_workers: int = 4,
+                      budget: PostingBudget = None):
+    """
+    Posts every due scheduled draft, plus the oldest pending draft if now is a
+    strategy slot, on up to max_workers threads. Returns (posted_count, failed_count).
+    """
+    # Get all tweets due for posting
+    due_posts = scheduler.get_due_posts()
+
+    # Check if current time is a strategy slot
+    now_utc = datetime.now(timezone.utc)
+    if check_strategy_slot and scheduler.is_strategy_slot(now_utc):
+        print(f"[{now_utc.isoformat()}] Current time is a strategy slot. Checking for pending drafts...")
+        next_draft = scheduler.get_next_pending_draft()
+        if next_draft:
+            print(f"  Found pending draft [{next_draft['id']}]. Adding to processing list.")
+            # Avoid duplicates if it was already manually scheduled (unlikely but safe)
+            if not any(p['id'] == next_draft['id'] for p in due_posts):
+                due_posts.append(next_draft)
+        else:
+            print("  No pending drafts found for this strategy slot.")
+
+    if not due_posts:
+        print(f"[{datetime.now().isoformat()}] No posts due or slots active.")
+        return 0, 0
+
+    print(f"[{datetime.now().isoformat()}] Processing {len(due_posts)} posts.")
+    if budget is None:
+        budget = PostingBudget.from_rate_limits(twitter.get_rate_limit_budgets())
+
+    posted_count = 0
+    failed_count = 0
+    deferred_count = 0
+
+    # Workers only talk to Twitter; every DataManager write happens here, on this
+    # thread, as results arrive, so the drafts files have a single writer.
+    for post, result, error in post_concurrently(due_posts, twitter, max_workers, budget):
+        draft_id = post["id"]
+        text = post["text"]
+        media_path = post["media_path"]
+
+        if error is not None:
+            error_msg = str(error)
+            print(f"  [{draft_id}] ERROR: {error_msg}")
+            data_manager.log_attempt("error", draft_id=draft_id, error=error_msg, text=text)
+            failed_count += 1
+            continue
+
+        if result is None:
+            # Left scheduled/pending; the next run picks it up
+            print(f"  [{draft_id}] Deferred: rate-limit budget exhausted.")
+            deferred_count += 1
+            continue
+
+        try:
+            if "error" in result:
+                error_msg = result['error']
+                print(f"  [{draft_id}] ERROR: {error_msg}")
+                data_manager.log_attempt("failed", draft_id=draft_id, error=error_msg, text=text)
+                failed_count += 1
+                continue
+
+            tweet_id = result.get("data", {}).get("id")
+            data_manager.mark_as_posted(draft_id, tweet_id, text, media_path)
+            data_manager.log_attempt("success", draft_id=draft_id, tweet_id=tweet_id, text=text)
+            print(f"  [{draft_id}] SUCCESS: Posted as tweet {tweet_id}")
+            posted_count += 1
+
+        except Exception as e:
+            error_msg = str(e)
+            print(f"  [{draft_id}] ERROR: {error_msg}")
+            data_manager.log_attempt("error", draft_id=draft_id, error=error_msg, text=text)
+            failed_count += 1
+
+    summary = f"Posted {posted_count}, Failed {failed_count}"
+    if deferred_count:
+        summary += f", Deferred {deferred_count}"
+    print(f"[{datetime.now().isoformat()}] {summary}")
+    return posted_count, failed_count
+
+def _files_signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+def wait_for_next_run(scheduler: TweetScheduler, data_manager: DataManager,
+                      max_sleep: float = 3600, poll_interval: float = 5,
+                      retry_at: datetime = None) -> str:
+    """
+    Sleeps until the next scheduled post or strategy slot (at most max_sleep
+    seconds), waking early if the drafts or the schedule index change on disk.
+    retry_at wakes it sooner for drafts that are already due but were deferred.
+    Returns "due" or "changed".
+    """
+    now = datetime.now(timezone.utc)
+    wake_times = [t for t in (scheduler.next_wake_time(now), retry_at) if t]
+    wake_at = min(wake_times) if wake_times else None
+    sleep_for = max_sleep if wake_at is None else min(max_sleep, (wake_at - now).total_seconds())
+    deadline = time.monotonic() + max(0.0, sleep_for)
+    if wake_at:
+        print(f"[{now.isoformat()}] Sleeping until {wake_at.isoformat()}.")
+
+    watched = data_manager.get_storage_paths() + [scheduler.schedule_index.path]
+    signature = _files_signature(watched)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return "due"
+        time.sleep(min(poll_interval, remaining))
+        if _files_signature(watched) != signature:
+            return "changed"
+
+def run_daemon(scheduler: TweetScheduler, twitter: TwitterHandler, data_manager: DataManager,
+               max_sleep: float = 3600, poll_interval: float = 5, max_workers: int = 4) -> int:
+    """Stays resident, posting whenever something becomes due."""
+    print(f"[{datetime.now().isoformat()}] Scheduler daemon started.")
+    last_slot = None
+    try:
+        while True:
+            # Serve each strategy slot once, even if we wake several times inside its window
+            now_utc = datetime.now(timezone.utc)
+            slot = scheduler.current_strategy_slot(now_utc)
+            check_slot = slot is not None and slot != last_slot
+            if check_slot:
+                last_slot = slot
+
+            retry_at = None
+            try:
+                budget = PostingBudget.from_rate_limits(twitter.get_rate_limit_budgets())
+                posted, failed = process_due_posts(scheduler, twitter, data_manager,
+                                                   check_strategy_slot=check_slot, max_workers=max_workers,
+                                                   budget=budget)
+                if posted or failed:
+                    data_manager.export_drafts_csv()
+                    scheduler.reconcile_schedule_index()
+                if budget.deferred:
+                    # Deferred drafts stay due, and next_wake_time only looks ahead: retry once the
+                    # rate limit resets, or with a fresh per-pass budget after one poll interval
+                    retry_at = (PostingBudget.reset_time(twitter.get_rate_limit_budgets())
+                                or datetime.now(timezone.utc) + timedelta(seconds=poll_interval))
+            except Exception as e:
+                print(f"[{datetime.now().isoformat()}] Error while posting: {str(e)}")
+
+            wait_for_next_run(scheduler, data_manager, max_sleep=max_sleep, poll_interval=poll_interval,
+                              retry_at=retry_at)
+    except KeyboardInterrupt:
+        print(f"[{datetime.now().isoformat()}] Scheduler daemon stopped.")
+        return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post due scheduled tweets.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and post as soon as drafts become due.")
+    parser.add_argument("--max-sleep", type=float, default=3600,
+                        help="Daemon mode: longest time to sleep between checks, in seconds.")
+    parser.add_argument("--poll-interval", type=float, default=5,
+                        help="Daemon mode: how often to check the drafts files for changes, in seconds.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("POST_WORKERS", "4")),
+                        help="Number of drafts to post concurrently.")
+    args = parser.parse_args(argv)
+
     load_dotenv()
     try:
-        scheduler = TweetScheduler()
-        twitter = TwitterHandler()
         data_manager = DataManager()
-        
-        # Get all tweets due for posting
-        due_posts = scheduler.get_due_posts()
-        
-        # Check if current time is a strategy slot
-        now_utc = datetime.now(timezone.utc)
-        if scheduler.is_strategy_slot(now_utc):
-            print(f"[{now_utc.isoformat()}] Current time is a strategy slot. Checking for pending drafts...")
-            next_draft = scheduler.get_next_pending_draft()
-            if next_draft:
-                print(f"  Found pending draft [{next_draft['id']}]. Adding to processing list.")
-                # Avoid duplicates if it was already manually scheduled (unlikely but safe)
-                if not any(p['id'] == next_draft['id'] for p in due_posts):
-                    due_posts.append(next_draft)
-            else:
-                print("  No pending drafts found for this strategy slot.")
-        
-        if not due_posts:
-            print(f"[{datetime.now().isoformat()}] No posts due or slots active.")
+        scheduler = TweetScheduler(data_manager)
+        twitter = TwitterHandler()
+
+        if args.daemon:
+            return run_daemon(scheduler, twitter, data_manager, max_sleep=args.max_sleep,
+                              poll_interval=args.poll_interval, max_workers=args.workers)
+
+        posted_count, failed_count = process_due_posts(scheduler, twitter, data_manager,
+                                                       max_workers=args.workers)
+        if not posted_count and not failed_count:
             return 0
-        
-        print(f"[{datetime.now().isoformat()}] Processing {len(due_posts)} posts.")
-        
-        posted_count = 0
-        failed_count = 0
-        
-        for post in due_posts:
-            draft_id = post["id"]
-            text = post["text"]
-            media_path = post["media_path"]
-            
-            try:
-                print(f"  Posting [{draft_id}]...")
-                
-                # Post to Twitter
-                result = twitter.post_tweet(text, media_path if media_path else None)
-                
-                if "error" in result:
-                    error_msg = result['error']
-                    print(f"    ERROR: {error_msg}")
-                    data_manager.log_attempt("failed", draft_id=draft_id, error=error_msg, text=text)
-                    failed_count += 1
-                    continue
-                
-                tweet_id = result.get("data", {}).get("id")
-                data_manager.mark_as_posted(draft_id, tweet_id, text, media_path)
-                data_manager.log_attempt("success", draft_id=draft_id, tweet_id=tweet_id, text=text)
-                print(f"    SUCCESS: Posted as tweet {tweet_id}")
-                posted_count += 1
-                
-            except Exception as e:
-                error_msg = str(e)
-                print(f"    ERROR: {error_msg}")
-                data_manager.log_attempt("error", draft_id=draft_id, error=error_msg, text=text)
-                failed_count += 1
-        
-        print(f"[{datetime.now().isoformat()}] Posted {posted_count}, Failed {failed_count}")
-        
+
+        # Bring the committed drafts.csv, and the index built from it, up to date with the changes made above
+        data_manager.export_drafts_csv()
+        scheduler.reconcile_schedule_index()
+
         # Exit with error if any failed
         return 1 if failed_count > 0 else 0
-        
+
     except Exception as e:
         print(f"[{datetime.now().isoformat()}] Fatal error: {str(e)}")
         return 1
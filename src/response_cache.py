@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache.db")
+
+
+def request_key(provider: str, model: str, prompt: str, image_digests: List[str] = None) -> str:
+    """
+    Cache key for one model call. Each prompt line is stripped, so prompts
+    that differ only in template indentation share a key.
+    """
+    normalized = "\n".join(line.strip() for line in prompt.strip().splitlines())
+    request = [provider.lower(), model, normalized, list(image_digests or [])]
+    return hashlib.sha256(json.dumps(request).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Model responses stored in SQLite by request key, so repeating a prompt
+    (same provider, model, prompt and images) costs no API call. Entries
+    expire after ttl_seconds, and the least recently used are evicted beyond
+    max_entries.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # One connection shared by all threads of this process, serialised by a lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used_at ON responses(used_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
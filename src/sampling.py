@@ -0,0 +1,36 @@
+import random
+from typing import AsyncIterable, Iterable, List
+
+
+def reservoir_sample(items: Iterable, k: int, rng: random.Random = None) -> List:
+    """
+    Uniform random sample of k items from a stream of unknown length, in one
+    pass and holding only k items (Algorithm R). Keeps stream order for the
+    items it returns when the stream has k items or fewer.
+    """
+    rng = rng or random.Random()
+    sample = []
+    for seen, item in enumerate(items):
+        if seen < k:
+            sample.append(item)
+        else:
+            j = rng.randint(0, seen)
+            if j < k:
+                sample[j] = item
+    return sample
+
+
+async def async_reservoir_sample(items: AsyncIterable, k: int, rng: random.Random = None) -> List:
+    """reservoir_sample for an async iterable."""
+    rng = rng or random.Random()
+    sample = []
+    seen = 0
+    async for item in items:
+        if seen < k:
+            sample.append(item)
+        else:
+            j = rng.randint(0, seen)
+            if j < k:
+                sample[j] = item
+        seen += 1
+    return sample
@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from media_cache import file_digest
+
+DEFAULT_MANIFEST_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "scan_manifest.json")
+
+
+class ScanManifest:
+    """
+    Images already turned into drafts by a folder scan: path -> size, mtime,
+    content hash and the draft ids created. A rescan only sends new or
+    modified images to the model. Size and mtime are checked first; the file
+    is hashed only when they changed, so a touched but identical image is
+    still skipped.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_FILE):
+        self.path = path
+        self._images = {}
+        self._signature = False  # not loaded yet
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(image_path: str) -> str:
+        return os.path.realpath(image_path)
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        images = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    images = json.load(f).get("images", {})
+            except (OSError, ValueError):
+                images = {}
+        self._images = images
+        self._signature = signature
+
+    def _save(self):
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', delete=False, dir=os.path.dirname(self.path) or "."
+        )
+        try:
+            with temp_file as f:
+                json.dump({"images": self._images}, f, indent=2)
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        self._signature = self._file_signature()
+
+    def _is_unchanged(self, key: str, st: os.stat_result) -> bool:
+        """Whether the image at key still matches its entry (called with the lock held)."""
+        entry = self._images.get(key)
+        if not entry or entry["size"] != st.st_size:
+            return False
+        if entry["mtime_ns"] == st.st_mtime_ns:
+            return True
+        try:
+            if file_digest(key) != entry["sha256"]:
+                return False
+        except OSError:
+            return False
+        entry["mtime_ns"] = st.st_mtime_ns  # persisted with the next write
+        return True
+
+    def new_or_modified(self, image_paths: List[str]) -> List[str]:
+        """The image_paths not yet scanned in their current form, in order."""
+        pending = []
+        with self._lock:
+            self._ensure_loaded()
+            for image_path in image_paths:
+                try:
+                    st = os.stat(image_path)
+                except OSError:
+                    continue
+                if not self._is_unchanged(self._key(image_path), st):
+                    pending.append(image_path)
+        return pending
+
+    def get(self, image_path: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._images.get(self._key(image_path))
+            return dict(entry) if entry else None
+
+    def record_many(self, draft_ids: Dict[str, List[str]]):
+        """
+        Records image path -> draft ids for a finished scan with a single
+        write. Images moved or deleted since they were drafted are skipped.
+        """
+        if not draft_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            for image_path, ids in draft_ids.items():
+                try:
+                    st = os.stat(image_path)
+                    sha256 = file_digest(image_path)
+                except OSError:
+                    continue
+                self._images[self._key(image_path)] = {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "sha256": sha256,
+                    "draft_ids": list(ids),
+                    "scanned_at": now,
+                }
+            self._save()
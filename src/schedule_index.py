@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+KEY_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+# Sorts after any draft id, so bisecting on [key, _MAX_ID] lands after every entry at key
+_MAX_ID = "\uffff"
+
+
+def to_utc(timestamp) -> datetime:
+    """
+    Normalizes an ISO 8601 string or datetime to an aware UTC datetime.
+    Naive times are local time, which is how scheduled_time has always been
+    compared (against datetime.now()).
+    """
+    dt = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+    return dt.astimezone(timezone.utc)
+
+
+def utc_key(timestamp) -> str:
+    """Fixed-width UTC string, so string order is time order."""
+    return to_utc(timestamp).strftime(KEY_FORMAT)
+
+
+class ScheduleIndex:
+    """
+    Scheduled drafts sorted by normalized UTC time, persisted as a small JSON
+    file next to drafts.csv. Finding due posts is a bisect over the scheduled
+    items only, instead of a scan of every draft.
+
+    Each entry also keeps the scheduled_time string it was built from, so a
+    draft can be checked for rescheduling without re-deriving its key (for a
+    naive time that depends on the machine's timezone). The index records a
+    digest of the drafts storage it reflects (source), so callers can
+    rebuild it when the drafts changed behind its back. The file is only
+    written when its contents change, so an idle posting run leaves it alone.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries = []   # sorted [utc_key, draft_id] pairs
+        self._keys = {}      # draft_id -> utc_key
+        self._times = {}     # draft_id -> scheduled_time as given
+        self._source = None
+        self._signature = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self):
+        """Re-reads the index only if another process rewrote it."""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        data = {}
+        if signature is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        entries = sorted(list(entry) for entry in data.get("entries", []))
+        self._entries = entries
+        self._keys = {draft_id: key for key, draft_id in entries}
+        self._times = data.get("times", {})
+        self._source = data.get("source")
+        self._signature = signature
+
+    def _save(self):
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', delete=False, dir=os.path.dirname(self.path)
+        )
+        try:
+            with temp_file as f:
+                json.dump({"entries": self._entries, "times": self._times, "source": self._source}, f)
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        self._signature = self._file_signature()
+
+    def _discard(self, draft_id: str) -> bool:
+        key = self._keys.pop(draft_id, None)
+        self._times.pop(draft_id, None)
+        if key is None:
+            return False
+        i = bisect_left(self._entries, [key, draft_id])
+        if i < len(self._entries) and self._entries[i] == [key, draft_id]:
+            del self._entries[i]
+        return True
+
+    def add(self, draft_id: str, scheduled_time: str):
+        """Adds or moves a draft in the index."""
+        self._ensure_loaded()
+        self._discard(draft_id)
+        key = utc_key(scheduled_time)
+        insort(self._entries, [key, draft_id])
+        self._keys[draft_id] = key
+        self._times[draft_id] = scheduled_time
+        self._save()
+
+    def remove(self, *draft_ids: str):
+        self._ensure_loaded()
+        removed = [self._discard(draft_id) for draft_id in draft_ids]
+        if any(removed):
+            self._save()
+
+    def key_for(self, draft_id: str) -> Optional[str]:
+        self._ensure_loaded()
+        return self._keys.get(draft_id)
+
+    def scheduled_time_for(self, draft_id: str) -> Optional[str]:
+        """The scheduled_time string the draft was indexed with (None for indexes written before it was kept)."""
+        self._ensure_loaded()
+        return self._times.get(draft_id)
+
+    def source(self):
+        self._ensure_loaded()
+        return self._source
+
+    def set_source(self, source):
+        """Records that the index is current as of this drafts storage signature."""
+        self._ensure_loaded()
+        if source != self._source:
+            self._source = source
+            self._save()
+
+    def due(self, now: datetime) -> List[str]:
+        """Draft IDs scheduled at or before now, oldest first."""
+        self._ensure_loaded()
+        # Entries at exactly `now` are due
+        end = bisect_right(self._entries, [utc_key(now), _MAX_ID])
+        return [draft_id for _, draft_id in self._entries[:end]]
+
+    def next_after(self, now: datetime) -> Optional[datetime]:
+        """The earliest scheduled time strictly after now, if any."""
+        self._ensure_loaded()
+        i = bisect_right(self._entries, [utc_key(now), _MAX_ID])
+        if i >= len(self._entries):
+            return None
+        return datetime.strptime(self._entries[i][0], KEY_FORMAT).replace(tzinfo=timezone.utc)
+
+    def rebuild(self, scheduled_drafts: List[Dict], source=None):
+        """
+        Replaces the index with the given scheduled drafts (e.g. when the file
+        is missing). An empty index is kept in memory rather than written out.
+        """
+        self._ensure_loaded()
+        entries = []
+        times = {}
+        for draft in scheduled_drafts:
+            try:
+                entries.append([utc_key(draft["scheduled_time"]), draft["id"]])
+            except (KeyError, TypeError, ValueError):
+                continue
+            times[draft["id"]] = draft["scheduled_time"]
+        entries.sort()
+        if self.exists():
+            if (entries, times, source) == (self._entries, self._times, self._source):
+                return
+        elif not entries:
+            self._source = source
+            return
+        self._entries = entries
+        self._keys = {draft_id: key for key, draft_id in entries}
+        self._times = times
+        self._source = source
+        self._save()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
@@ -1,61 +1,106 @@
+import hashlib
 import os
-import csv
-import shutil
-import tempfile
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from typing import Optional, List, Dict
 from data_handler import DataManager
+from media_cache import file_digest
+from schedule_index import ScheduleIndex, utc_key
+from strategy_slots import SlotCalendar
 
 class TweetScheduler:
     """Manages scheduled tweet posting via GitHub Actions or cron."""
     
-    def __init__(self):
-        self.data_manager = DataManager()
+    def __init__(self, data_manager: Optional[DataManager] = None):
+        self.data_manager = data_manager or DataManager()
         # schedule.json is legacy/unused, ignoring as per original code behavior (which ignored it in favor of drafts.csv)
-    
+
+        # Sorted index of scheduled drafts, kept next to drafts.csv
+        data_dir = os.path.dirname(self.data_manager.get_path_to_drafts_file())
+        self.schedule_index = ScheduleIndex(os.path.join(data_dir, "schedule_index.json"))
+        self._storage_digest = None  # (stat signature, digest) of the last _storage_signature
+        self.reconcile_schedule_index()
+
+        # Strategy slot rules, precomputed into a calendar of upcoming slots
+        self.slot_calendar = SlotCalendar.load(
+            os.getenv("STRATEGY_SLOTS_FILE", os.path.join(data_dir, "strategy_slots.json"))
+        )
+
+    def rebuild_schedule_index(self):
+        """Rebuilds the due-post index from the drafts marked as scheduled."""
+        source = self._storage_signature()
+        self.schedule_index.rebuild(self.data_manager.list_drafts("scheduled"), source=source)
+
+    def _storage_signature(self) -> str:
+        """
+        Digest of the drafts storage contents. The index is committed along
+        with data/, so its source must be the same on every checkout; the
+        files are only re-hashed when their os.stat changes.
+        """
+        paths = self.data_manager.get_storage_paths()
+        stats = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stats.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        if self._storage_digest and self._storage_digest[0] == stats:
+            return self._storage_digest[1]
+
+        digest = hashlib.sha256()
+        for path, st in zip(paths, stats):
+            digest.update(os.path.basename(path).encode())
+            digest.update(file_digest(path).encode() if st else b"-")
+        self._storage_digest = (stats, digest.hexdigest())
+        return self._storage_digest[1]
+
+    def reconcile_schedule_index(self):
+        """
+        Rebuilds the index if the drafts changed without going through this
+        scheduler (imports, a pulled drafts.csv, posting, another checkout),
+        or if the index file is missing.
+        """
+        # A missing index file has no source either
+        if self.schedule_index.source() != self._storage_signature():
+            self.rebuild_schedule_index()
+
+    def _is_stale(self, draft_id: str, row: Optional[Dict]) -> bool:
+        """Whether an index entry no longer matches its draft (posted, unscheduled or rescheduled)."""
+        if not row or row.get("status") != "scheduled":
+            return True
+        indexed_time = self.schedule_index.scheduled_time_for(draft_id)
+        if indexed_time is not None:
+            return row.get("scheduled_time") != indexed_time
+        # Entry from an index written before scheduled times were kept
+        try:
+            return utc_key(row.get("scheduled_time") or "") != self.schedule_index.key_for(draft_id)
+        except ValueError:
+            return True
+
     def schedule_draft(self, draft_id: str, scheduled_time: str) -> bool:
         """
         Schedule a draft for posting at a specific time.
         Format: ISO 8601 (YYYY-MM-DDTHH:MM:SS)
+        A time without a UTC offset is local time here, and is stored with
+        this machine's offset so a runner in another timezone posts it at the
+        same moment.
         """
-        drafts_file = self.data_manager.get_path_to_drafts_file()
-        if not os.path.exists(drafts_file):
-            return False
-
         try:
             # Validate ISO format
-            datetime.fromisoformat(scheduled_time)
-            
-            updated = False
-            temp_file = tempfile.NamedTemporaryFile(mode='w', newline='', encoding='utf-8', delete=False, dir=os.path.dirname(drafts_file))
-            
-            try:
-                with open(drafts_file, 'r', newline='', encoding='utf-8') as f_in, temp_file:
-                    reader = csv.DictReader(f_in)
-                    fieldnames = reader.fieldnames
-                    writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    found = False
-                    for row in reader:
-                        if row.get("id") == draft_id:
-                            row["scheduled_time"] = scheduled_time
-                            row["status"] = "scheduled"
-                            found = True
-                            updated = True
-                        writer.writerow(row)
-
-                if updated:
-                    shutil.move(temp_file.name, drafts_file)
-                    return True
-                else:
-                    os.unlink(temp_file.name)
-                    return False
-
-            except Exception as e:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
-                raise e
+            dt = datetime.fromisoformat(scheduled_time)
+            if dt.tzinfo is None:
+                scheduled_time = dt.astimezone().isoformat()
+
+            # Index first: a crash before the draft update leaves a stale entry,
+            # which get_due_posts prunes, rather than a scheduled draft that is never due
+            self.schedule_index.add(draft_id, scheduled_time)
+            if not self.data_manager.update_draft(
+                draft_id, scheduled_time=scheduled_time, status="scheduled"
+            ):
+                self.schedule_index.remove(draft_id)
+                return False
+            self.schedule_index.set_source(self._storage_signature())
+            return True
 
         except Exception as e:
             print(f"Error scheduling draft: {e}")
@@ -66,21 +111,22 @@ class TweetScheduler:
         Get all posts that are due to be posted now.
         Used by GitHub Actions or cron job.
         """
-        drafts_file = self.data_manager.get_path_to_drafts_file()
-        if not os.path.exists(drafts_file):
-            return []
-
         try:
             due_posts = []
-            now = datetime.now().isoformat()
+            stale = []
+            now = datetime.now(timezone.utc)
+            self.reconcile_schedule_index()
             
-            with open(drafts_file, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("status") == "scheduled":
-                        scheduled_time = row.get("scheduled_time")
-                        if scheduled_time and scheduled_time <= now:
-                            due_posts.append(row)
+            for draft_id in self.schedule_index.due(now):
+                row = self.data_manager.get_draft(draft_id)
+                # Drop entries for drafts that were posted, unscheduled or rescheduled elsewhere
+                if self._is_stale(draft_id, row):
+                    stale.append(draft_id)
+                    continue
+                due_posts.append(row)
+
+            if stale:
+                self.schedule_index.remove(*stale)
 
             return due_posts
         except Exception as e:
@@ -98,87 +144,47 @@ class TweetScheduler:
 
     def is_strategy_slot(self, dt_utc: datetime) -> bool:
         """
-        Check if the given UTC time matches a strategy slot.
-        Vampire Mode (CST): Mon/Tue/Fri at 00:00, 01:00, 02:00
-        Growth Mode (CST): Everyday at 08:00, 14:00
-        CST is UTC-6.
+        Check if the given UTC time falls inside a strategy slot window.
+        Slots come from data/strategy_slots.json (or the built-in defaults):
+        Vampire Mode (US Central): Mon/Tue/Fri at 00:00, 01:00, 02:00
+        Growth Mode (US Central): Everyday at 08:00, 14:00
         """
-        # Convert UTC to CST (UTC-6)
-        cst_time = dt_utc - timedelta(hours=6)
-        
-        hour = cst_time.hour
-        minute = cst_time.minute
-        weekday = cst_time.weekday() # 0 is Monday
-        
-        # Only check at the top of the hour (allowing for some drift, e.g., first 5 mins)
-        if minute >= 5:
-            return False
-            
-        # Growth Mode: Everyday at 08:00 and 14:00 CST
-        if hour in [8, 14]:
-            return True
-            
-        # Vampire Mode: Mon(0), Tue(1), Fri(4) at 00:00, 01:00, 02:00 CST
-        if weekday in [0, 1, 4] and hour in [0, 1, 2]:
-            return True
-            
-        return False
+        return self.slot_calendar.slot_at(dt_utc) is not None
+
+    def current_strategy_slot(self, dt_utc: datetime) -> Optional[datetime]:
+        """Start of the strategy slot whose window contains dt_utc, if any."""
+        return self.slot_calendar.slot_at(dt_utc)
+
+    def next_strategy_slot(self, dt_utc: datetime) -> Optional[datetime]:
+        """Start of the first strategy slot strictly after dt_utc."""
+        return self.slot_calendar.next_slot_after(dt_utc)
+
+    def strategy_slots_between(self, start_utc: datetime, end_utc: datetime) -> List[datetime]:
+        """Starts of all strategy slots with start_utc <= slot < end_utc."""
+        return self.slot_calendar.slots_between(start_utc, end_utc)
+
+    def next_wake_time(self, dt_utc: datetime) -> Optional[datetime]:
+        """The next time anything may become due: a scheduled post or a strategy slot."""
+        self.reconcile_schedule_index()
+        times = [t for t in (self.schedule_index.next_after(dt_utc), self.next_strategy_slot(dt_utc)) if t]
+        return min(times) if times else None
     
     def list_scheduled(self) -> List[dict]:
         """List all scheduled posts."""
-        drafts_file = self.data_manager.get_path_to_drafts_file()
-        if not os.path.exists(drafts_file):
-            return []
-
         try:
-            scheduled = []
-            with open(drafts_file, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get("status") == "scheduled":
-                        scheduled.append(row)
-            return scheduled
+            return self.data_manager.list_drafts("scheduled")
         except Exception as e:
             print(f"Error listing scheduled: {e}")
             return []
     
     def unschedule_draft(self, draft_id: str) -> bool:
         """Unschedule a draft, returning it to pending status."""
-        drafts_file = self.data_manager.get_path_to_drafts_file()
-        if not os.path.exists(drafts_file):
-            return False
-            
         try:
-            updated = False
-            temp_file = tempfile.NamedTemporaryFile(mode='w', newline='', encoding='utf-8', delete=False, dir=os.path.dirname(drafts_file))
-            
-            try:
-                with open(drafts_file, 'r', newline='', encoding='utf-8') as f_in, temp_file:
-                    reader = csv.DictReader(f_in)
-                    fieldnames = reader.fieldnames
-                    writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    found = False
-                    for row in reader:
-                        if row.get("id") == draft_id:
-                            row["scheduled_time"] = ""
-                            row["status"] = "pending"
-                            found = True
-                            updated = True
-                        writer.writerow(row)
-
-                if updated:
-                    shutil.move(temp_file.name, drafts_file)
-                    return True
-                else:
-                    os.unlink(temp_file.name)
-                    return False
-
-            except Exception as e:
-                if os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
-                raise e
+            if not self.data_manager.update_draft(draft_id, scheduled_time="", status="pending"):
+                return False
+            self.schedule_index.remove(draft_id)
+            self.schedule_index.set_source(self._storage_signature())
+            return True
 
         except Exception as e:
             print(f"Error unscheduling draft: {e}")
@@ -1,7 +1,8 @@
 from mcp.server.fastmcp import FastMCP
 from typing import List, Optional
+import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
 from dotenv import load_dotenv
 
@@ -10,16 +11,26 @@ load_dotenv()
 
 from ai_handler import AIHandler
 from twitter_handler import TwitterHandler
+from async_twitter_handler import AsyncTwitterHandler
 from data_handler import DataManager
 from scheduler import TweetScheduler
+from sampling import async_reservoir_sample
+from scan_manifest import DEFAULT_MANIFEST_FILE, ScanManifest
+from image_dedup import DEFAULT_MAX_DISTANCE, cluster_near_duplicates
 
 mcp = FastMCP("twitter-voice-mcp")
 
 # Initialize handlers
 ai_handler = AIHandler()
 twitter = TwitterHandler()
+# Tools that wait on the Twitter API are async and use this, so they don't block the event loop
+async_twitter = AsyncTwitterHandler(twitter)
 data_manager = DataManager()
-scheduler = TweetScheduler()
+scheduler = TweetScheduler(data_manager)
+# Images already drafted by folder scans, so rescans only process new or changed ones
+scan_manifest = ScanManifest(os.getenv("SCAN_MANIFEST_FILE", DEFAULT_MANIFEST_FILE))
+# Perceptual-hash bits (of 64) within which scanned images count as near-duplicates
+IMAGE_DEDUP_DISTANCE = int(os.getenv("IMAGE_DEDUP_DISTANCE", str(DEFAULT_MAX_DISTANCE)))
 
 # Define safe directory for file operations
 SAFE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
@@ -56,10 +67,28 @@ def configure_ai_model(provider: str, model: str = None) -> str:
     return f"Configured AI provider to {provider} with model {ai_handler.model}"
 
 @mcp.tool()
-def analyze_my_voice(username: str, sample_count: int = 20, manual_tweets: List[str] = None) -> str:
+def get_ai_setup_stats() -> str:
+    """
+    Report the AI client setup overhead: how many Gemini models were built, how long
+    that took, and the time saved by reusing them across calls.
+    """
+    stats = ai_handler.get_setup_stats()
+    return (
+        f"Models built: {stats['models_built']} ({stats['avg_build_ms']:.1f} ms each, "
+        f"{stats['build_seconds']:.2f}s total)\n"
+        f"Models reused: {stats['models_reused']}\n"
+        f"Setup time saved: {stats['saved_seconds']:.2f}s"
+    )
+
+@mcp.tool()
+async def analyze_my_voice(username: str, sample_count: int = 20, manual_tweets: List[str] = None,
+                           scan_count: int = 0, resume: bool = False) -> str:
     """
     Analyze the voice/style of a user based on their recent tweets.
     If Twitter API fails (Free Tier limits), you can provide 'manual_tweets' list.
+    Set 'scan_count' above 'sample_count' to pick 'sample_count' tweets at random from that many
+    recent tweets (up to 3200) instead of the latest ones. 'resume' continues paging from where
+    the previous resumed scan stopped (e.g. after hitting a rate limit).
     """
     tweets = []
     if manual_tweets:
@@ -68,14 +97,21 @@ def analyze_my_voice(username: str, sample_count: int = 20, manual_tweets: List[
         try:
             if not twitter.session:
                  return "Error: Twitter API credentials not configured. Please provide 'manual_tweets' or use 'analyze_from_file'."
-            tweets = twitter.get_user_tweets(username, count=sample_count)
+            if scan_count > sample_count:
+                # Streams the timeline page by page; only the sample is kept in memory
+                sampled = await async_reservoir_sample(
+                    async_twitter.iter_user_tweets(username, limit=scan_count, resume=resume), sample_count
+                )
+                tweets = [t["text"] for t in sampled]
+            else:
+                tweets = await async_twitter.get_user_tweets(username, count=sample_count)
         except Exception as e:
             return f"Error fetching tweets: {str(e)}. Try providing manual_tweets."
             
     if not tweets:
         return "No tweets found to analyze. Please check username or permissions."
         
-    profile = ai_handler.analyze_style(tweets)
+    profile = await asyncio.to_thread(ai_handler.analyze_style, tweets)
     return f"Voice analysis complete. Profile saved.\n\nSummary:\n{profile[:200]}..."
 
 @mcp.tool()
@@ -119,9 +155,10 @@ def analyze_from_file(file_path: str) -> str:
         return f"Error analyzing file: {str(e)}"
 
 @mcp.tool()
-def generate_draft_tweets(topic: str, count: int = 3, media_path: str = None) -> str:
+def generate_draft_tweets(topic: str, count: int = 3, media_path: str = None, fresh: bool = False) -> str:
     """
     Generate new tweets in your voice about a topic and save them as drafts.
+    Set fresh to get new wording instead of a cached answer for a repeated topic.
     """
     try:
         if media_path:
@@ -130,52 +167,75 @@ def generate_draft_tweets(topic: str, count: int = 3, media_path: str = None) ->
             except ValueError as e:
                 return f"Error: {str(e)}"
 
-        tweets = ai_handler.generate_tweet(topic, count)
-        draft_ids = []
-        for text in tweets:
-            draft_id = data_manager.add_draft(
-                text=text,
-                media_path=media_path,
-                model=f"{ai_handler.provider}:{ai_handler.model}",
-                notes=f"Generated for topic: {topic}"
-            )
-            draft_ids.append(draft_id)
+        tweets = ai_handler.generate_tweet(topic, count, fresh=fresh)
+        draft_ids = data_manager.add_drafts([
+            {
+                "text": text,
+                "media_path": media_path,
+                "model": f"{ai_handler.provider}:{ai_handler.model}",
+                "notes": f"Generated for topic: {topic}"
+            }
+            for text in tweets
+        ])
             
         return f"Generated {len(draft_ids)} drafts. IDs: {', '.join(draft_ids)}. Use list_pending_drafts to view."
     except Exception as e:
         return f"Error generating tweets: {str(e)}"
 
 @mcp.tool()
-def generate_retweet_drafts(query: str, count: int = 5) -> str:
+async def generate_retweet_drafts(query: str, count: int = 5, incremental: bool = True) -> str:
     """
     Search for tweets matching a query, generate voice-aligned comments, and save as drafts.
+    With 'incremental' (the default), only tweets newer than the last ones handled for the
+    same query are fetched. Tweets that already have a draft are skipped either way.
     Note: Requires Twitter Basic Tier or higher for search.
     """
     try:
-        found_tweets = twitter.search_tweets(query, count)
+        found_tweets = await async_twitter.search_tweets(query, count, incremental=incremental)
         if not found_tweets:
             return "No tweets found matching query (or API limit reached)."
+
+        newest_id = max((t["id"] for t in found_tweets), key=int)
+        drafted = data_manager.drafted_tweet_ids()
+        found_tweets = [t for t in found_tweets if t["id"] not in drafted]
+        if not found_tweets:
+            if incremental:
+                twitter.advance_search_cursor(query, newest_id)
+            return "No new tweets found: every match already has a draft."
             
         generated_count = 0
-        for t in found_tweets:
-            tweet_id = t["id"]
-            text = t["text"]
-            author_id = t["author_id"]
-            
-            # Generate comment
-            comment = ai_handler.generate_retweet_comment(text)
-            
-            # Save draft
-            data_manager.add_draft(
-                text=comment, # The comment is the text of the Quote Tweet
-                model=f"{ai_handler.provider}:{ai_handler.model}",
-                is_retweet=True,
-                original_tweet_id=tweet_id,
-                notes=f"Retweet of {author_id}: {text[:30]}..."
-            )
-            generated_count += 1
-            
-        return f"Generated {generated_count} retweet drafts."
+        failed_count = 0
+        with data_manager.write_session() as session:
+            for t in found_tweets:
+                tweet_id = t["id"]
+                text = t["text"]
+                author_id = t["author_id"]
+                
+                # Generate comment
+                comment = await asyncio.to_thread(ai_handler.generate_retweet_comment, text)
+                if comment.startswith("Error"):
+                    failed_count += 1
+                    continue
+                
+                # Save draft
+                session.add_draft(
+                    text=comment, # The comment is the text of the Quote Tweet
+                    model=f"{ai_handler.provider}:{ai_handler.model}",
+                    is_retweet=True,
+                    original_tweet_id=tweet_id,
+                    notes=f"Retweet of {author_id}: {text[:30]}..."
+                )
+                generated_count += 1
+
+        # Only once the drafts are saved. After a failure the cursor stays put so the
+        # tweet is fetched again; the drafted_tweet_ids filter skips the others.
+        if incremental and not failed_count:
+            twitter.advance_search_cursor(query, newest_id)
+
+        result = f"Generated {generated_count} retweet drafts."
+        if failed_count:
+            result += f" Failed to generate {failed_count} comments; they will be retried."
+        return result
     except Exception as e:
         return f"Error generating retweet drafts: {str(e)}"
 
@@ -195,7 +255,7 @@ def list_pending_drafts() -> str:
     return output
 
 @mcp.tool()
-def approve_and_post_draft(draft_id: str) -> str:
+async def approve_and_post_draft(draft_id: str) -> str:
     """
     Approve a draft and post it to Twitter immediately.
     """
@@ -245,14 +305,14 @@ def approve_and_post_draft(draft_id: str) -> str:
             
             # Re-reading handler: I only have ID.
             # I'll post text.
-            result = twitter.post_tweet(draft["text"], draft["media_path"]) # Just post the comment?
+            result = await async_twitter.post_tweet(draft["text"], draft["media_path"]) # Just post the comment?
             # User wanted "Retweet with comment".
             # I should really use `quote_tweet_id` if I want it to be a real quote tweet.
             # I'll just modify the text to include the link if I can find the username, but I don't have it easily.
             # I'll assume `post_tweet` handles it or I just post the text.
             pass
         else:
-            result = twitter.post_tweet(draft["text"], draft["media_path"])
+            result = await async_twitter.post_tweet(draft["text"], draft["media_path"])
             
         if "error" in result:
             return f"Failed to post: {result['error']}"
@@ -296,9 +356,12 @@ def export_drafts_csv() -> str:
     return data_manager.export_safe_drafts()
 
 @mcp.tool()
-def scan_and_draft_tweets_from_images(folder_path: str) -> str:
+async def scan_and_draft_tweets_from_images(folder_path: str, rescan: bool = False, dedupe: bool = True) -> str:
     """
     Scan a folder for images, generate tweets for them using the voice profile, and save as drafts.
+    Images are sent to the model concurrently (AI_IMAGE_WORKERS, capped per provider).
+    Images drafted by an earlier scan are skipped unless they changed; set rescan to redo them.
+    Near-duplicate shots are grouped and drafted once; set dedupe to False to draft each one.
     Supported extensions: .jpg, .jpeg, .png, .webp, .heic
     """
     try:
@@ -318,23 +381,51 @@ def scan_and_draft_tweets_from_images(folder_path: str) -> str:
     if not images:
         return f"No images found in {folder_path}."
         
-    results = []
-    for img_file in images:
-        full_path = os.path.join(folder_path, img_file)
-        # Generate 3 tweet options
-        generated_tweets = ai_handler.generate_tweet_from_image(full_path, count=3)
-        
-        if generated_tweets and not generated_tweets[0].startswith("Error"):
-            for i, tweet_text in enumerate(generated_tweets):
-                draft_id = data_manager.add_draft(
-                    text=tweet_text,
-                    media_path=full_path,
-                    model=f"{ai_handler.provider}:{ai_handler.model}",
-                    notes=f"Option {i+1} generated from image: {img_file}"
-                )
-                results.append(f"Created draft {draft_id} (Option {i+1}) for {img_file}")
-        else:
-            results.append(f"Failed to generate for {img_file}: {generated_tweets[0] if generated_tweets else 'Unknown error'}")
+    paths = [os.path.join(folder_path, img_file) for img_file in images]
+    if not rescan:
+        paths = await asyncio.to_thread(scan_manifest.new_or_modified, paths)
+    skipped = len(images) - len(paths)
+    if not paths:
+        return f"No new or modified images in {folder_path} ({skipped} already scanned)."
+
+    # Only one image per group of near-duplicates goes to the model
+    if dedupe:
+        clusters = await asyncio.to_thread(cluster_near_duplicates, paths, IMAGE_DEDUP_DISTANCE)
+    else:
+        clusters = [[path] for path in paths]
+    duplicates = {cluster[0]: cluster[1:] for cluster in clusters}
+
+    # Generate 3 tweet options per image, off the event loop
+    generated = await asyncio.to_thread(
+        lambda: list(ai_handler.generate_tweets_from_images(list(duplicates), count=3))
+    )
+
+    results = [f"Skipped {skipped} unchanged images already scanned."] if skipped else []
+    scanned = {}
+    with data_manager.write_session() as session:
+        for full_path, generated_tweets in generated:
+            img_file = os.path.basename(full_path)
+            if generated_tweets and not generated_tweets[0].startswith("Error"):
+                scanned[full_path] = []
+                for i, tweet_text in enumerate(generated_tweets):
+                    draft_id = session.add_draft(
+                        text=tweet_text,
+                        media_path=full_path,
+                        model=f"{ai_handler.provider}:{ai_handler.model}",
+                        notes=f"Option {i+1} generated from image: {img_file}"
+                    )
+                    scanned[full_path].append(draft_id)
+                    results.append(f"Created draft {draft_id} (Option {i+1}) for {img_file}")
+                if duplicates[full_path]:
+                    # The drafts cover the near-duplicates too, so rescans skip them as well
+                    for duplicate in duplicates[full_path]:
+                        scanned[duplicate] = scanned[full_path]
+                    names = ", ".join(os.path.basename(duplicate) for duplicate in duplicates[full_path])
+                    results.append(f"Skipped near-duplicates of {img_file}: {names}")
+            else:
+                results.append(f"Failed to generate for {img_file}: {generated_tweets[0] if generated_tweets else 'Unknown error'}")
+    # Failed images aren't recorded, so the next scan retries them
+    await asyncio.to_thread(scan_manifest.record_many, scanned)
             
     return "\n".join(results)
 
@@ -364,6 +455,21 @@ def list_scheduled_drafts() -> str:
         output += f"[{s['id']}] {s['text'][:50]}... (Scheduled: {s['scheduled_time']})\n"
     return output
 
+@mcp.tool()
+def list_strategy_slots(days: int = 7) -> str:
+    """
+    List the upcoming strategy slots (times when the oldest pending draft is auto-posted).
+    """
+    now = datetime.now(timezone.utc)
+    slots = scheduler.strategy_slots_between(now, now + timedelta(days=days))
+    if not slots:
+        return f"No strategy slots in the next {days} days."
+
+    output = "Upcoming Strategy Slots (UTC):\n"
+    for slot in slots:
+        output += f"{slot.strftime('%a %Y-%m-%d %H:%M')}\n"
+    return output
+
 @mcp.tool()
 def unschedule_draft(draft_id: str) -> str:
     """
@@ -0,0 +1,137 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# Used when no strategy_slots.json exists. Matches the original hardcoded slots:
+# Growth Mode every day at 08:00 and 14:00, Vampire Mode Mon/Tue/Fri at 00:00-02:00 (US Central).
+DEFAULT_SLOT_CONFIG = {
+    "timezone": "America/Chicago",
+    "window_minutes": 5,
+    "rules": [
+        {"name": "growth", "weekdays": "*", "hours": [8, 14]},
+        {"name": "vampire", "weekdays": ["mon", "tue", "fri"], "hours": [0, 1, 2]},
+    ],
+}
+
+
+class SlotRule:
+    """Posting slots on the given weekdays (0 is Monday) at the given local hours and minutes."""
+
+    def __init__(self, name: str, weekdays: List[int], hours: List[int], minutes: List[int] = None):
+        self.name = name
+        self.weekdays = set(weekdays)
+        self.times = sorted(time(hour, minute) for hour in hours for minute in (minutes or [0]))
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SlotRule":
+        weekdays = config.get("weekdays", "*")
+        if weekdays == "*":
+            weekdays = list(range(7))
+        else:
+            weekdays = [
+                WEEKDAY_NAMES.index(day.lower()[:3]) if isinstance(day, str) else int(day)
+                for day in weekdays
+            ]
+        if any(day not in range(7) for day in weekdays):
+            raise ValueError(f"Invalid weekdays in slot rule: {config}")
+        return cls(config.get("name", ""), weekdays, config["hours"], config.get("minutes"))
+
+
+class SlotCalendar:
+    """
+    Precomputed, sorted calendar of upcoming strategy slots (as UTC datetimes)
+    generated from weekday/hour rules in an IANA timezone, so DST changes are
+    handled by the timezone database. Lookups are bisects over the calendar,
+    which is extended on demand when a query falls outside the computed range.
+    """
+
+    def __init__(self, rules: List[SlotRule], tz: str = "UTC", window_minutes: int = 5,
+                 horizon_days: int = 14):
+        self.rules = rules
+        self.tz = ZoneInfo(tz)
+        self.window = timedelta(minutes=window_minutes)
+        self.horizon = timedelta(days=horizon_days)
+        self._slots = []
+        self._first_day = None  # first local date covered
+        self._last_day = None   # last local date covered
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SlotCalendar":
+        return cls(
+            [SlotRule.from_config(rule) for rule in config.get("rules", [])],
+            tz=config.get("timezone", "UTC"),
+            window_minutes=config.get("window_minutes", 5),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SlotCalendar":
+        """Builds the calendar from a JSON config file, or the defaults if it doesn't exist."""
+        if not os.path.exists(path):
+            return cls.from_config(DEFAULT_SLOT_CONFIG)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_config(json.load(f))
+
+    def _slots_for_day(self, day: date) -> List[datetime]:
+        slots = set()
+        for rule in self.rules:
+            if day.weekday() in rule.weekdays:
+                for slot_time in rule.times:
+                    local = datetime.combine(day, slot_time, tzinfo=self.tz)
+                    slots.add(local.astimezone(timezone.utc))
+        return sorted(slots)
+
+    def _cover(self, start: datetime, end: datetime):
+        """Makes sure every slot between start and end (UTC) is in the calendar."""
+        # One day of margin on each side covers slots that cross midnight in UTC
+        first = start.astimezone(self.tz).date() - timedelta(days=1)
+        last = end.astimezone(self.tz).date() + timedelta(days=1)
+
+        if self._first_day is None:
+            self._first_day, self._last_day = first, first - timedelta(days=1)
+
+        if first < self._first_day:
+            earlier = []
+            day = first
+            while day < self._first_day:
+                earlier.extend(self._slots_for_day(day))
+                day += timedelta(days=1)
+            self._slots = earlier + self._slots
+            self._first_day = first
+
+        if last > self._last_day:
+            # Extend past the request too, so the next few lookups need no work
+            last = max(last, start.astimezone(self.tz).date() + self.horizon)
+            day = self._last_day + timedelta(days=1)
+            while day <= last:
+                self._slots.extend(self._slots_for_day(day))
+                day += timedelta(days=1)
+            self._last_day = last
+
+    def next_slot_after(self, dt: datetime) -> Optional[datetime]:
+        """Start of the first slot strictly after dt, or None if the rules define no slots."""
+        if not any(rule.weekdays and rule.times for rule in self.rules):
+            return None
+        # Any non-empty rule set produces a slot within a week
+        self._cover(dt, dt + timedelta(days=8))
+        i = bisect_right(self._slots, dt)
+        return self._slots[i] if i < len(self._slots) else None
+
+    def slots_between(self, start: datetime, end: datetime) -> List[datetime]:
+        """All slot starts with start <= slot < end."""
+        if end <= start:
+            return []
+        self._cover(start, end)
+        return self._slots[bisect_left(self._slots, start):bisect_left(self._slots, end)]
+
+    def slot_at(self, dt: datetime) -> Optional[datetime]:
+        """Start of the slot whose window contains dt, if any."""
+        self._cover(dt - self.window, dt)
+        i = bisect_right(self._slots, dt)
+        if i and dt - self._slots[i - 1] < self.window:
+            return self._slots[i - 1]
+        return None
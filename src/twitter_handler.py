@@ -1,25 +1,223 @@
 import os
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
 import requests
+from collections.abc import Mapping
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
 from requests_oauthlib import OAuth1Session
+import hashlib
 import json
 import logging
 import time
 import tempfile
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
+from cursor_store import DEFAULT_CURSOR_FILE, CursorStore
+from user_cache import DEFAULT_USER_CACHE_FILE, UserIdCache
+from upload_stream import MultipartStream, mapped_chunks
+from media_cache import DEFAULT_CACHE_FILE, DEFAULT_EXPIRES_AFTER_SECS, MediaCache, file_digest
+from media_prep import DEFAULT_CACHE_DIR as MEDIA_PREP_CACHE_DIR, MediaPreparer, media_type_for
+from media_processing import MediaProcessingTracker
 
 logger = logging.getLogger(__name__)
 
+class RateLimitError(Exception):
+    """Raised when an endpoint's budget is exhausted for longer than we are willing to wait."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Rate limit exhausted for {endpoint}; resets in {int(retry_after)}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+class RateLimitTracker:
+    """
+    Per-endpoint budgets recorded from the x-rate-limit-limit/-remaining/-reset
+    response headers, so callers can wait for a reset instead of burning a 429.
+    """
+
+    def __init__(self):
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def update(self, endpoint: str, response):
+        headers = getattr(response, "headers", None)
+        if not isinstance(headers, Mapping):
+            return
+
+        def header_int(name):
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        remaining = header_int("x-rate-limit-remaining")
+        reset = header_int("x-rate-limit-reset")
+        if getattr(response, "status_code", None) == 429 and remaining is None:
+            remaining = 0
+        if remaining is None and reset is None:
+            return
+
+        with self._lock:
+            entry = self._limits.setdefault(endpoint, {"limit": None, "remaining": None, "reset": None})
+            limit = header_int("x-rate-limit-limit")
+            if limit is not None:
+                entry["limit"] = limit
+            if remaining is not None:
+                entry["remaining"] = remaining
+            if reset is not None:
+                entry["reset"] = reset
+
+    def wait_time(self, endpoint: str) -> float:
+        """Seconds until the endpoint has budget again (0 if it has budget now)."""
+        with self._lock:
+            entry = self._limits.get(endpoint)
+            if not entry or entry["remaining"] is None or entry["remaining"] > 0 or entry["reset"] is None:
+                return 0.0
+            # One second of margin for clock skew against the API servers
+            return max(0.0, entry["reset"] - time.time() + 1)
+
+    def budgets(self) -> Dict[str, Dict]:
+        """Current known budgets: {endpoint: {"limit", "remaining", "reset"}}. Expired windows are dropped."""
+        now = time.time()
+        with self._lock:
+            return {
+                endpoint: dict(entry) for endpoint, entry in self._limits.items()
+                if entry["reset"] is None or entry["reset"] > now
+            }
+
+class ConnectionStats:
+    """Thread-safe per-host counts of requests sent and TCP/TLS connections opened."""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, host: str) -> Dict[str, int]:
+        return self._hosts.setdefault(host, {"requests": 0, "connections_opened": 0})
+
+    def record_request(self, host: str):
+        with self._lock:
+            self._entry(host)["requests"] += 1
+
+    def record_connection(self, host: str):
+        with self._lock:
+            self._entry(host)["connections_opened"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """{host: {"requests", "connections_opened", "connections_reused"}}"""
+        with self._lock:
+            return {
+                host: dict(entry, connections_reused=max(0, entry["requests"] - entry["connections_opened"]))
+                for host, entry in self._hosts.items()
+            }
+
+def _counting_pool_classes(stats: ConnectionStats) -> Dict[str, type]:
+    """urllib3 pool classes whose connections report every (re)connect to stats."""
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            super().connect()
+            stats.record_connection(self.host)
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            super().connect()
+            stats.record_connection(self.host)
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with an explicit keep-alive pool size, a default timeout and
+    connection/request counting. Requests without a timeout get the default.
+    """
+
+    def __init__(self, stats: ConnectionStats, pool_maxsize: int = 10, timeout=(5, 30),
+                 max_retries=None):
+        self.stats = stats
+        self.timeout = timeout
+        super().__init__(pool_connections=4, pool_maxsize=pool_maxsize,
+                         max_retries=max_retries if max_retries is not None else 0)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        self.stats.record_request(urlparse(request.url).hostname or "")
+        return super().send(request, **kwargs)
+
+def _transport_retry() -> Retry:
+    """
+    Retries connection failures and 5xx on idempotent requests. 429 is left to
+    TwitterHandler._request, and POSTs are never replayed after a response so a
+    tweet can't be posted twice.
+    """
+    return Retry(
+        total=3, connect=3, read=0, backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+
 class TwitterHandler:
+    # Endpoint keys used for rate-limit tracking
+    TWEETS_ENDPOINT = "POST /2/tweets"
+    MEDIA_UPLOAD_ENDPOINT = "POST /1.1/media/upload"
+    UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+
     def __init__(self):
         self.consumer_key = os.getenv("TWITTER_CONSUMER_KEY")
         self.consumer_secret = os.getenv("TWITTER_CONSUMER_SECRET")
         self.access_token = os.getenv("TWITTER_ACCESS_TOKEN")
         self.access_token_secret = os.getenv("TWITTER_ACCESS_TOKEN_SECRET")
         
-        # Cache for authenticated user ID (avoid repeated /users/me calls)
-        self.user_id = None
-        # Cache for username -> user_id lookups
-        self.username_cache = {}
+        # Cache for username -> user_id lookups, and the authenticated user's ID
+        # (avoids repeated /users/me calls), shared across processes on disk
+        self.username_cache = UserIdCache(os.getenv("TWITTER_USER_CACHE_FILE", DEFAULT_USER_CACHE_FILE))
+        self._user_id = None
+        # Saved paging state for resumable fetches
+        self.cursors = CursorStore(os.getenv("TWITTER_CURSOR_FILE", DEFAULT_CURSOR_FILE))
+        # Recent search pages, so a repeated search within the TTL costs no request
+        self.search_cache_ttl = float(os.getenv("TWITTER_SEARCH_CACHE_TTL", "60"))
+        self._search_cache = {}
+        self._search_cache_lock = threading.Lock()
+
+        # Rate-limit budgets per endpoint, and how long a call may wait for a reset
+        self.rate_limits = RateLimitTracker()
+        self.max_retries = int(os.getenv("TWITTER_MAX_RETRIES", "3"))
+        self.max_rate_limit_wait = float(os.getenv("TWITTER_MAX_RATE_LIMIT_WAIT", "60"))
+
+        # Keep-alive pools sized for concurrent posting, shared by every request
+        self.pool_size = int(os.getenv("TWITTER_POOL_SIZE", "10"))
+        self.http_timeout = (5, float(os.getenv("TWITTER_HTTP_TIMEOUT", "30")))
+        self.connection_stats = ConnectionStats()
+
+        # Chunked media uploads: segment size, segments in flight, and retries per segment
+        self.upload_chunk_size = int(float(os.getenv("TWITTER_UPLOAD_CHUNK_MB", "4")) * 1024 * 1024)
+        self.upload_workers = int(os.getenv("TWITTER_UPLOAD_WORKERS", "4"))
+        self.upload_segment_retries = int(os.getenv("TWITTER_UPLOAD_SEGMENT_RETRIES", "2"))
+
+        # Uploaded media ids by content hash; set to None to always upload
+        self.media_cache = MediaCache(os.getenv("MEDIA_CACHE_FILE", DEFAULT_CACHE_FILE))
+        # Photos are resized, re-encoded and stripped of metadata before upload; None uploads originals
+        self.media_preparer = MediaPreparer(os.getenv("MEDIA_PREP_CACHE_DIR", MEDIA_PREP_CACHE_DIR))
+        # Background STATUS polling for media still processing after FINALIZE
+        self.media_processing = MediaProcessingTracker(self._media_status, on_failed=self._forget_media)
+        self.media_processing_timeout = float(os.getenv("TWITTER_MEDIA_PROCESSING_TIMEOUT", "600"))
+
         self.session = None
         if self.consumer_key and self.access_token:
             self.session = OAuth1Session(
@@ -28,13 +226,80 @@ class TwitterHandler:
                 resource_owner_key=self.access_token,
                 resource_owner_secret=self.access_token_secret,
             )
+            for host in ("api.twitter.com", "upload.twitter.com"):
+                self.session.mount(f"https://{host}/", self._new_adapter())
+
+        # Unauthenticated session for downloading media from its origin servers
+        self.download_session = requests.Session()
+        for prefix in ("https://", "http://"):
+            self.download_session.mount(prefix, self._new_adapter())
+
+    @property
+    def user_id(self) -> Optional[str]:
+        """The authenticated user's ID, if known (from this process or the shared cache)."""
+        if self._user_id is None and self.access_token:
+            self._user_id = self.username_cache.get_me(self.access_token)
+        return self._user_id
+
+    @user_id.setter
+    def user_id(self, value: Optional[str]):
+        self._user_id = value
+        if value and self.access_token:
+            self.username_cache.set_me(self.access_token, value)
+
+    def _new_adapter(self) -> PooledHTTPAdapter:
+        return PooledHTTPAdapter(self.connection_stats, pool_maxsize=max(self.pool_size, self.upload_workers),
+                                 timeout=self.http_timeout, max_retries=_transport_retry())
+
+    def get_connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host request and connection counts, e.g. {"api.twitter.com": {"requests": 12, "connections_opened": 1, "connections_reused": 11}}."""
+        return self.connection_stats.snapshot()
+
+    def get_rate_limit_budgets(self) -> Dict[str, Dict]:
+        """Known per-endpoint budgets, e.g. {"POST /2/tweets": {"limit": 100, "remaining": 42, "reset": 1700000000}}."""
+        return self.rate_limits.budgets()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff: ~1s, 2s, 4s, ... capped at 60s."""
+        return min(60.0, 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _request(self, method: str, url: str, endpoint: str, **kwargs):
+        """
+        Sends a request through the OAuth session, waiting for the endpoint's
+        budget to reset when it is exhausted and retrying 429 responses with
+        jittered exponential backoff. Raises RateLimitError when the budget
+        resets later than max_rate_limit_wait.
+        """
+        send = self.session.get if method == "GET" else self.session.post
+        for attempt in range(self.max_retries + 1):
+            wait = self.rate_limits.wait_time(endpoint)
+            if wait > self.max_rate_limit_wait:
+                raise RateLimitError(endpoint, wait)
+            if wait > 0:
+                logger.info(f"Rate limit exhausted for {endpoint}; waiting {wait:.0f}s for reset")
+                time.sleep(wait)
+
+            # Stream bodies are read to the end by each attempt
+            if hasattr(kwargs.get("data"), "seek"):
+                kwargs["data"].seek(0)
+            response = send(url, **kwargs)
+            self.rate_limits.update(endpoint, response)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            delay = self._backoff_delay(attempt)
+            if max(delay, self.rate_limits.wait_time(endpoint)) > self.max_rate_limit_wait:
+                return response
+            logger.warning(f"429 from {endpoint}; retrying in {delay:.1f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+        return response
 
     def verify_credentials(self) -> bool:
         if not self.session:
             return False
         # v2 'me' endpoint
         url = "https://api.twitter.com/2/users/me"
-        response = self.session.get(url)
+        response = self._request("GET", url, "GET /2/users/me")
         if response.status_code == 200:
             # Cache user_id from the response
             data = response.json().get("data", {})
@@ -56,11 +321,21 @@ class TwitterHandler:
             # Handle URL
             if file_path.startswith(('http://', 'https://')):
                 logger.info(f"Downloading media from URL: {file_path}")
-                response = requests.get(file_path, stream=True)
+                response = self.download_session.get(file_path, stream=True)
                 if response.status_code != 200:
                     logger.error(f"Failed to download media: {response.text}")
                     return None
-                
+
+                # With a known size, upload while downloading instead of going through disk.
+                # Photos that will be prepared need the whole file first.
+                total_bytes = self._streamable_length(response)
+                needs_prep = self.media_preparer is not None and media_type_for(urlparse(file_path).path).startswith("image/")
+                if total_bytes and not needs_prep:
+                    try:
+                        return self._stream_upload(response, total_bytes, file_path)
+                    finally:
+                        response.close()
+
                 # Use a specific extension if possible
                 ext = os.path.splitext(file_path)[1].split('?')[0]
                 if not ext: ext = ".tmp"
@@ -73,7 +348,10 @@ class TwitterHandler:
 
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Media file not found: {file_path}")
-            
+
+            if self.media_preparer is not None:
+                file_path = self.media_preparer.prepare(file_path)
+
             # Use chunked upload for all files (reliable for large images/videos)
             return self._chunked_upload(file_path)
             
@@ -87,88 +365,218 @@ class TwitterHandler:
                 except:
                     pass
 
-    def _chunked_upload(self, file_path: str) -> Optional[str]:
-        """
-        Performs a chunked media upload (v1.1).
-        """
-        url = "https://upload.twitter.com/1.1/media/upload.json"
-        
-        file_size = os.path.getsize(file_path)
-        # Determine media type
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext in ['.mp4', '.mov']: media_type = 'video/mp4'
-        elif ext == '.gif': media_type = 'image/gif'
-        else: media_type = 'image/jpeg' # Default
-        
-        # 1. INIT
+    def _upload_init(self, total_bytes: int, media_type: str) -> Optional[str]:
         params = {
             "command": "INIT",
-            "total_bytes": file_size,
+            "total_bytes": total_bytes,
             "media_type": media_type,
         }
-        resp = self.session.post(url, data=params)
+        resp = self._request("POST", self.UPLOAD_URL, self.MEDIA_UPLOAD_ENDPOINT, data=params)
         if resp.status_code != 202:
             logger.error(f"INIT failed: {resp.text}")
             return None
-        
-        media_id = resp.json().get('media_id_string')
-        
-        # 2. APPEND
-        segment_id = 0
-        with open(file_path, 'rb') as f:
-            while True:
-                chunk = f.read(1024 * 1024 * 4) # 4MB chunks
-                if not chunk:
+        return resp.json().get('media_id_string')
+
+    def _upload_append(self, media_id: str, segment_index: int, chunk) -> bool:
+        """
+        Sends one APPEND segment, retrying connection errors and 5xx responses
+        up to upload_segment_retries times. Segments are independent, so a retry
+        only resends this one. The chunk (bytes or a memoryview) is streamed in
+        a multipart body without being copied; the form fields travel in the
+        body too, which OAuth 1.0a leaves out of the signature.
+        """
+        params = {
+            "command": "APPEND",
+            "media_id": media_id,
+            "segment_index": segment_index
+        }
+        for attempt in range(self.upload_segment_retries + 1):
+            body = MultipartStream(params, "media", chunk)
+            try:
+                resp = self._request("POST", self.UPLOAD_URL, self.MEDIA_UPLOAD_ENDPOINT,
+                                     data=body, headers={"Content-Type": body.content_type})
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if 200 <= resp.status_code <= 299:
+                    return True
+                error = resp.text
+                if resp.status_code < 500:
                     break
-                
-                params = {
-                    "command": "APPEND",
-                    "media_id": media_id,
-                    "segment_index": segment_id
-                }
-                files = {"media": chunk}
-                resp = self.session.post(url, data=params, files=files)
-                if resp.status_code < 200 or resp.status_code > 299:
-                    logger.error(f"APPEND failed segment {segment_id}: {resp.text}")
-                    return None
-                segment_id += 1
-                
-        # 3. FINALIZE
+            if attempt < self.upload_segment_retries:
+                logger.warning(f"APPEND segment {segment_index} failed, retrying: {error}")
+                time.sleep(self._backoff_delay(attempt))
+        logger.error(f"APPEND failed segment {segment_index}: {error}")
+        return False
+
+    def _upload_finalize(self, media_id: str) -> Optional[Dict]:
+        """Sends FINALIZE and returns its response body, or None if it failed."""
         params = {
             "command": "FINALIZE",
             "media_id": media_id
         }
-        resp = self.session.post(url, data=params)
+        resp = self._request("POST", self.UPLOAD_URL, self.MEDIA_UPLOAD_ENDPOINT, data=params)
         if resp.status_code != 200:
             logger.error(f"FINALIZE failed: {resp.text}")
             return None
-            
-        # 4. STATUS (Optional but recommended for video)
-        if media_type.startswith('video'):
-            check_url = url
-            while True:
-                params = {
-                    "command": "STATUS",
-                    "media_id": media_id
-                }
-                resp = self.session.get(check_url, params=params)
-                if resp.status_code != 200:
-                    logger.error(f"STATUS check failed: {resp.text}")
-                    return None
-                
-                status_data = resp.json()
-                state = status_data.get('processing_info', {}).get('state')
-                if state == 'succeeded':
-                    break
-                if state == 'failed':
-                    logger.error(f"Media processing failed: {status_data}")
-                    return None
-                
-                wait = status_data.get('processing_info', {}).get('check_after_secs', 5)
-                time.sleep(wait)
-                
+        try:
+            result = resp.json()
+        except ValueError:
+            result = None
+        return result if isinstance(result, dict) else {}
+
+    def _media_status(self, media_id: str) -> Optional[Dict]:
+        """processing_info from STATUS ({"state": "succeeded"} if there is none), or None if the call failed."""
+        params = {
+            "command": "STATUS",
+            "media_id": media_id
+        }
+        resp = self._request("GET", self.UPLOAD_URL, "GET /1.1/media/upload", params=params)
+        if resp.status_code != 200:
+            logger.error(f"STATUS check failed: {resp.text}")
+            return None
+        return resp.json().get('processing_info') or {"state": "succeeded"}
+
+    def _forget_media(self, media_id: str):
+        if self.media_cache is not None:
+            self.media_cache.invalidate(media_id)
+
+    def wait_for_media(self, media_id: str, timeout: float = None) -> bool:
+        """
+        Blocks until media_id has finished processing. True if it is ready (or
+        never needed processing), False if processing failed or took longer
+        than timeout (default media_processing_timeout).
+        """
+        handle = self.media_processing.get(media_id)
+        if handle is None:
+            return True
+        if timeout is None:
+            timeout = self.media_processing_timeout
+        return handle.wait(timeout)
+
+    def _append_segments(self, media_id: str, chunks) -> bool:
+        """
+        APPENDs the chunks with up to upload_workers segments in flight. Chunks
+        are pulled from the iterator only as the window frees up, so at most
+        upload_workers chunks are held in memory.
+        """
+        if self.upload_workers <= 1:
+            return all(self._upload_append(media_id, i, chunk) for i, chunk in enumerate(chunks))
+
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as pool:
+            in_flight = set()
+            for segment_index, chunk in enumerate(chunks):
+                if len(in_flight) >= self.upload_workers:
+                    done, in_flight = wait_futures(in_flight, return_when=FIRST_COMPLETED)
+                    if not all(future.result() for future in done):
+                        for future in in_flight:
+                            future.cancel()
+                        return False
+                in_flight.add(pool.submit(self._upload_append, media_id, segment_index, chunk))
+            return all(future.result() for future in in_flight)
+
+    def _chunked_upload(self, file_path: str) -> Optional[str]:
+        """
+        Performs a chunked media upload (v1.1): INIT, APPEND segments
+        (concurrently, see _append_segments) and FINALIZE. Media that needs
+        processing is returned straight away and tracked in the background.
+        """
+        file_size = os.path.getsize(file_path)
+        if file_size == 0:
+            logger.error(f"Media file is empty: {file_path}")
+            return None
+        media_type = media_type_for(file_path)
+
+        # Same bytes uploaded earlier and not expired yet: reuse that media_id
+        digest = None
+        if self.media_cache is not None:
+            digest = file_digest(file_path)
+            cached_id = self.media_cache.get(digest, media_type)
+            if cached_id:
+                logger.info(f"Reusing uploaded media {cached_id} for {file_path}")
+                return cached_id
+
+        # 1. INIT
+        media_id = self._upload_init(file_size, media_type)
+        if not media_id:
+            return None
+
+        # 2. APPEND, straight from a memory map of the file
+        with mapped_chunks(file_path, self.upload_chunk_size) as chunks:
+            if not self._append_segments(media_id, chunks):
+                return None
+
+        return self._finish_upload(media_id, media_type, digest)
+
+    def _finish_upload(self, media_id: str, media_type: str, digest: str = None) -> Optional[str]:
+        # 3. FINALIZE
+        finalized = self._upload_finalize(media_id)
+        if finalized is None:
+            return None
+
+        processing_info = finalized.get("processing_info")
+        if isinstance(processing_info, dict) and processing_info.get("state") == "failed":
+            logger.error(f"Media processing failed: {finalized}")
+            return None
+
+        if digest and self.media_cache is not None:
+            expires_after = finalized.get("expires_after_secs")
+            if not isinstance(expires_after, int):
+                expires_after = DEFAULT_EXPIRES_AFTER_SECS
+            self.media_cache.put(digest, media_type, media_id, expires_after)
+
+        # 4. STATUS: videos and GIFs are processed server-side. Poll in the
+        # background and return now; post_tweet waits via wait_for_media.
+        if isinstance(processing_info, dict) and processing_info.get("state") != "succeeded":
+            self.media_processing.track(media_id, processing_info)
+
         return media_id
 
+    def _streamable_length(self, response) -> Optional[int]:
+        """
+        Byte count of a download that can be streamed into APPEND segments:
+        its Content-Length, unless the body is content-encoded (then the
+        decoded size is unknown). None means it has to be buffered first.
+        """
+        headers = getattr(response, "headers", None)
+        if not isinstance(headers, Mapping) or headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        try:
+            length = int(headers.get("Content-Length"))
+        except (TypeError, ValueError):
+            return None
+        return length if length > 0 else None
+
+    def _stream_upload(self, response, total_bytes: int, source_url: str) -> Optional[str]:
+        """
+        Chunked upload fed directly from a streaming download. INIT goes out
+        before the first byte is read, and each upload_chunk_size block of the
+        download becomes an APPEND segment as soon as it arrives, so the
+        download overlaps the uploads of earlier segments.
+        """
+        media_type = media_type_for(urlparse(source_url).path)
+        media_id = self._upload_init(total_bytes, media_type)
+        if not media_id:
+            return None
+
+        received = 0
+        digest = hashlib.sha256()
+        def chunks():
+            nonlocal received
+            for chunk in response.iter_content(chunk_size=self.upload_chunk_size):
+                received += len(chunk)
+                digest.update(chunk)
+                yield chunk
+
+        if not self._append_segments(media_id, chunks()):
+            return None
+        if received != total_bytes:
+            logger.error(f"Media download from {source_url} ended after {received} of {total_bytes} bytes")
+            return None
+
+        # Cached by content, so a later local copy of the same file is not uploaded again
+        return self._finish_upload(media_id, media_type, digest.hexdigest())
+
     def post_tweet(self, text: str, media_path: str = None, reply_to_id: str = None) -> Dict:
         """
         Post tweet using v2 API.
@@ -181,15 +589,17 @@ class TwitterHandler:
         
         if media_path:
             media_id = self.upload_media(media_path)
-            if media_id:
+            if media_id and self.wait_for_media(media_id):
                 payload["media"] = {"media_ids": [media_id]}
                 
         if reply_to_id:
             payload["reply"] = {"in_reply_to_tweet_id": reply_to_id}
             
         try:
-            response = self.session.post(
+            response = self._request(
+                "POST",
                 url,
+                self.TWEETS_ENDPOINT,
                 json=payload,
                 headers={"Content-Type": "application/json"}
             )
@@ -198,68 +608,227 @@ class TwitterHandler:
                 return response.json()
             else:
                 return {"error": response.text, "status_code": response.status_code}
+        except RateLimitError as e:
+            return {"error": str(e), "status_code": 429}
         except Exception as e:
             return {"error": str(e)}
 
-    def get_user_tweets(self, username: str, count: int = 10) -> List[str]:
+    def _resolve_user_id(self, username: str) -> Optional[str]:
+        # Check cache first
+        user_id = self.username_cache.get(username)
+        if user_id:
+            return user_id
+
+        user_url = f"https://api.twitter.com/2/users/by/username/{username}"
+        user_resp = self._request("GET", user_url, "GET /2/users/by/username")
+        return self._record_user_id(username, user_resp)
+
+    def _record_user_id(self, username: str, user_resp) -> Optional[str]:
+        """Reads the user ID from a /2/users/by/username response and caches it (shared with AsyncTwitterHandler)."""
+        if user_resp.status_code != 200:
+            logger.error(f"Failed to get user ID: {user_resp.text}")
+            return None
+
+        data = user_resp.json().get("data")
+        if not data:
+            logger.error(f"No user data in response: {user_resp.text}")
+            return None
+
+        user_id = data.get("id")
+        if not user_id:
+            logger.error(f"No user ID in data: {data}")
+            return None
+
+        # Cache it
+        self.username_cache[username] = user_id
+        return user_id
+
+    def resolve_user_ids(self, usernames: List[str]) -> Dict[str, str]:
+        """
+        Resolves many usernames to user IDs: cached ones from the cache, the
+        rest with the multi-user lookup endpoint, 100 per request. Returns
+        {username: user_id} for the ones that exist; unknown users are left out.
+        """
+        resolved = {}
+        missing = []
+        for username in dict.fromkeys(usernames):
+            user_id = self.username_cache.get(username)
+            if user_id:
+                resolved[username] = user_id
+            else:
+                missing.append(username)
+
+        for start in range(0, len(missing), 100):
+            batch = missing[start:start + 100]
+            params = {"usernames": ",".join(name.lstrip("@") for name in batch)}
+            try:
+                resp = self._request("GET", "https://api.twitter.com/2/users/by", "GET /2/users/by", params=params)
+            except RateLimitError as e:
+                logger.error(f"User lookup stopped: {e}")
+                break
+            if resp.status_code != 200:
+                logger.error(f"Failed to look up users: {resp.text}")
+                continue
+
+            by_name = {user["username"].lower(): user["id"] for user in resp.json().get("data", [])}
+            found = {}
+            for username in batch:
+                user_id = by_name.get(username.lstrip("@").lower())
+                if user_id:
+                    found[username] = user_id
+            if found:
+                self.username_cache.set_many(found)
+                resolved.update(found)
+        return resolved
+
+    def iter_user_tweets(self, username: str, limit: int = None, resume: bool = False) -> Iterator[Dict]:
         """
-        Fetch tweets from a user. 
+        Yields a user's tweets (newest first, retweets and replies excluded)
+        page by page, following pagination_token until limit tweets, the end
+        of the timeline (the API serves the latest 3200) or an exhausted rate
+        limit. Only the current page is held in memory.
+
+        With resume=True, paging starts from the cursor saved by an earlier
+        resumed fetch for this user, and the cursor is saved after each page.
         Note: Requires Basic Tier or higher for v2 user timeline.
-        If Free Tier, this might fail.
         """
-        # Check cache first
-        if username in self.username_cache:
-            user_id = self.username_cache[username]
-        else:
-            # First get user ID
-            user_url = f"https://api.twitter.com/2/users/by/username/{username}"
-            user_resp = self.session.get(user_url)
-            
-            if user_resp.status_code != 200:
-                logger.error(f"Failed to get user ID: {user_resp.text}")
-                return []
-                
-            data = user_resp.json().get("data")
-            if not data:
-                logger.error(f"No user data in response: {user_resp.text}")
-                return []
-            
-            user_id = data.get("id")
-            if not user_id:
-                logger.error(f"No user ID in data: {data}")
-                return []
-            
-            # Cache it
-            self.username_cache[username] = user_id
-        
-        # Get tweets
+        user_id = self._resolve_user_id(username)
+        if not user_id:
+            return
+
         tweets_url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-        params = {"max_results": min(count, 100), "exclude": "retweets,replies"}
-        
-        tweets_resp = self.session.get(tweets_url, params=params)
-        
-        if tweets_resp.status_code == 200:
-            data = tweets_resp.json().get("data", [])
-            return [t["text"] for t in data]
-        else:
-            logger.error(f"Failed to get tweets: {tweets_resp.text}")
-            return []
+        token = self._timeline_start(username, resume)
+        yielded = 0
+        while limit is None or yielded < limit:
+            try:
+                resp = self._request("GET", tweets_url, "GET /2/users/tweets",
+                                     params=self._timeline_params(limit, yielded, token))
+            except RateLimitError as e:
+                logger.error(f"Stopped fetching tweets for {username}: {e}")
+                return
+            body = self._timeline_body(resp)
+            if body is None:
+                return
+
+            for tweet in body.get("data", []):
+                if limit is not None and yielded >= limit:
+                    return
+                yield tweet
+                yielded += 1
+
+            token = self._record_timeline_page(username, body, resume)
+            if not token:
+                return
+
+    # Timeline paging steps, shared with AsyncTwitterHandler.iter_user_tweets
+
+    def _timeline_start(self, username: str, resume: bool) -> Optional[str]:
+        """The pagination_token to start from: the saved cursor when resuming, else the newest page."""
+        if not resume:
+            return None
+        return (self.cursors.get(f"timeline:{username.lower()}") or {}).get("pagination_token")
+
+    @staticmethod
+    def _timeline_params(limit: Optional[int], yielded: int, token: Optional[str]) -> Dict:
+        # The endpoint accepts 5-100 results per page
+        page_size = 100 if limit is None else max(5, min(100, limit - yielded))
+        params = {"max_results": page_size, "exclude": "retweets,replies"}
+        if token:
+            params["pagination_token"] = token
+        return params
+
+    @staticmethod
+    def _timeline_body(resp) -> Optional[Dict]:
+        if resp.status_code != 200:
+            logger.error(f"Failed to get tweets: {resp.text}")
+            return None
+        return resp.json()
+
+    def _record_timeline_page(self, username: str, body: Dict, resume: bool) -> Optional[str]:
+        """Returns the next page's token, saving it as the user's cursor when resuming."""
+        token = body.get("meta", {}).get("next_token")
+        if resume:
+            cursor_key = f"timeline:{username.lower()}"
+            if token:
+                self.cursors.set(cursor_key, {"pagination_token": token})
+            else:
+                self.cursors.delete(cursor_key)
+        return token
 
-    def search_tweets(self, query: str, count: int = 10) -> List[Dict]:
+    def get_user_tweets(self, username: str, count: int = 10) -> List[str]:
         """
-        Search tweets (Requires Basic Tier).
+        Fetch the text of a user's latest count tweets, across as many pages
+        as needed.
+        Note: Requires Basic Tier or higher for v2 user timeline.
+        If Free Tier, this might fail.
         """
-        url = "https://api.twitter.com/2/tweets/search/recent"
+        return [tweet["text"] for tweet in self.iter_user_tweets(username, limit=count)]
+
+    def _search_params(self, query: str, count: int, incremental: bool) -> Dict:
         params = {
             "query": query,
-            "max_results": min(count, 100),
+            # The endpoint accepts 10-100 results per request
+            "max_results": max(10, min(count, 100)),
             "tweet.fields": "author_id,created_at,public_metrics"
         }
-        
-        resp = self.session.get(url, params=params)
+        if incremental:
+            since_id = (self.cursors.get(f"search:{query}") or {}).get("since_id")
+            if since_id:
+                params["since_id"] = since_id
+        return params
+
+    def _cached_search(self, params: Dict) -> Optional[List[Dict]]:
+        key = tuple(sorted(params.items()))
+        with self._search_cache_lock:
+            entry = self._search_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def _record_search(self, params: Dict, body: Dict) -> List[Dict]:
+        """Caches a search page."""
+        results = body.get("data", [])
+        now = time.monotonic()
+        with self._search_cache_lock:
+            self._search_cache = {k: v for k, v in self._search_cache.items() if v[0] > now}
+            self._search_cache[tuple(sorted(params.items()))] = (now + self.search_cache_ttl, results)
+        return results
+
+    def advance_search_cursor(self, query: str, since_id: str):
+        """
+        Marks every tweet up to since_id as handled for incremental searches
+        of query. Never moves the cursor backwards. Search returns the newest
+        matches first, so advancing to the newest tweet of a result set also
+        passes any older matches that didn't fit in it.
+        """
+        key = f"search:{query}"
+        current = (self.cursors.get(key) or {}).get("since_id")
+        if current is None or int(since_id) > int(current):
+            self.cursors.set(key, {"since_id": str(since_id)})
+
+    def search_tweets(self, query: str, count: int = 10, incremental: bool = False) -> List[Dict]:
+        """
+        Search tweets (Requires Basic Tier).
+        Identical searches within search_cache_ttl seconds are served from
+        memory. With incremental=True only tweets newer than the query's
+        cursor are returned; the caller moves the cursor with
+        advance_search_cursor once it has handled them.
+        """
+        url = "https://api.twitter.com/2/tweets/search/recent"
+        params = self._search_params(query, count, incremental)
+
+        cached = self._cached_search(params)
+        if cached is not None:
+            return cached[:count]
+
+        try:
+            resp = self._request("GET", url, "GET /2/tweets/search/recent", params=params)
+        except RateLimitError as e:
+            logger.error(f"Search failed: {e}")
+            return []
         
         if resp.status_code == 200:
-            return resp.json().get("data", [])
+            return self._record_search(params, resp.json())[:count]
         else:
             logger.error(f"Search failed: {resp.text}")
             return []
@@ -270,7 +839,7 @@ class TwitterHandler:
         """
         # Use cached user_id if available
         if not self.user_id:
-            me_resp = self.session.get("https://api.twitter.com/2/users/me")
+            me_resp = self._request("GET", "https://api.twitter.com/2/users/me", "GET /2/users/me")
             if me_resp.status_code != 200:
                 return {"error": "Failed to get my user ID"}
             self.user_id = me_resp.json()["data"]["id"]
@@ -280,7 +849,11 @@ class TwitterHandler:
         url = f"https://api.twitter.com/2/users/{my_id}/retweets"
         payload = {"tweet_id": tweet_id}
         
-        resp = self.session.post(url, json=payload, headers={"Content-Type": "application/json"})
+        try:
+            resp = self._request("POST", url, "POST /2/users/retweets", json=payload,
+                                 headers={"Content-Type": "application/json"})
+        except RateLimitError as e:
+            return {"error": str(e)}
         
         if resp.status_code == 200:
             return resp.json()
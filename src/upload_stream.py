@@ -0,0 +1,108 @@
+import io
+import mmap
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+class MultipartStream:
+    """
+    Read-only multipart/form-data request body around a single binary part.
+    The form fields are encoded up front (they are a few bytes); the payload
+    is handed to the socket as slices of the caller's buffer, never copied,
+    so a memoryview over an mmap goes straight from the page cache to the wire.
+    """
+
+    def __init__(self, fields: Dict, name: str, payload, filename: str = None, boundary: str = None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.fields = dict(fields)
+        self.payload = memoryview(payload)
+
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in self.fields.items()
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename or name}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{self.boundary}--\r\n'.encode()
+
+        self._parts = [memoryview(head), self.payload, memoryview(tail)]
+        self._length = sum(part.nbytes for part in self._parts)
+        self._position = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._position = min(max(0, offset), self._length)
+        return self._position
+
+    def read(self, size: int = -1):
+        """
+        Returns the next bytes of the body. With a size, this is a slice of
+        one part (possibly shorter than size, empty at the end); without one,
+        the rest of the body is joined into a new bytes object.
+        """
+        if size is None or size < 0:
+            rest = b"".join(self._slices(self._length))
+            self._position = self._length
+            return rest
+        for piece in self._slices(size):
+            self._position += piece.nbytes
+            return piece
+        return b""
+
+    def _slices(self, size: int) -> Iterator[memoryview]:
+        offset = self._position
+        for part in self._parts:
+            if offset >= part.nbytes:
+                offset -= part.nbytes
+                continue
+            piece = part[offset:offset + size]
+            size -= piece.nbytes
+            offset = 0
+            yield piece
+            if size <= 0:
+                return
+
+@contextmanager
+def mapped_chunks(path: str, chunk_size: int):
+    """
+    Yields an iterator of memoryview slices, chunk_size bytes each, over a
+    read-only mmap of the file. The slices share the mapping, so no segment
+    is copied into a bytes object. The mapping is closed on exit.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # mmap can't map an empty file
+            yield iter(())
+            return
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mapped)
+        try:
+            yield (view[offset:offset + chunk_size] for offset in range(0, size, chunk_size))
+        finally:
+            view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                # A slice is still referenced somewhere; the mapping is
+                # unmapped when the last one is garbage collected.
+                pass
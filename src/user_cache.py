@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_USER_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "user_cache.json")
+
+
+class UserIdCache:
+    """
+    username -> user id lookups shared by every process through a JSON file,
+    so the scheduler and the server don't each pay for /users/by/username.
+    Entries expire after ttl_seconds, and the least recently used are
+    evicted beyond max_entries. Usernames are case-insensitive.
+
+    Supports the dict operations TwitterHandler.username_cache has always
+    been used with (in, [], get, assignment).
+    """
+
+    def __init__(self, path: str = DEFAULT_USER_CACHE_FILE, ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._signature = False  # not loaded yet
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return username.lstrip("@").lower()
+
+    @staticmethod
+    def _me_key(access_token: str) -> str:
+        # The authenticated account, keyed by a hash of its token (never the token itself)
+        return "me:" + hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        entries = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get("users", {})
+            except (OSError, ValueError):
+                entries = {}
+        self._entries = entries
+        self._signature = signature
+
+    def _save(self):
+        now = time.time()
+        entries = {k: e for k, e in self._entries.items() if now - e["fetched_at"] < self.ttl_seconds}
+        if len(entries) > self.max_entries:
+            keep = sorted(entries, key=lambda k: entries[k]["used_at"], reverse=True)[:self.max_entries]
+            entries = {k: entries[k] for k in keep}
+        self._entries = entries
+
+        temp_file = tempfile.NamedTemporaryFile(
+            mode='w', encoding='utf-8', delete=False, dir=os.path.dirname(self.path) or "."
+        )
+        try:
+            with temp_file as f:
+                json.dump({"users": self._entries}, f)
+            os.replace(temp_file.name, self.path)
+        except Exception as e:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+            raise e
+        self._signature = self._file_signature()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if not entry or time.time() - entry["fetched_at"] >= self.ttl_seconds:
+                return None
+            # Recency is persisted with the next write
+            entry["used_at"] = time.time()
+            return entry["id"]
+
+    def _set_many(self, ids: Dict[str, str]):
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            for key, user_id in ids.items():
+                self._entries[key] = {"id": str(user_id), "fetched_at": now, "used_at": now}
+            self._save()
+
+    def get(self, username: str, default=None) -> Optional[str]:
+        user_id = self._get(self._key(username))
+        return default if user_id is None else user_id
+
+    def set(self, username: str, user_id: str):
+        self._set_many({self._key(username): user_id})
+
+    def set_many(self, ids: Dict[str, str]):
+        """Stores several username -> id pairs with a single write."""
+        self._set_many({self._key(username): user_id for username, user_id in ids.items()})
+
+    def get_me(self, access_token: str) -> Optional[str]:
+        return self._get(self._me_key(access_token))
+
+    def set_me(self, access_token: str, user_id: str):
+        self._set_many({self._me_key(access_token): user_id})
+
+    def __contains__(self, username: str) -> bool:
+        return self.get(username) is not None
+
+    def __getitem__(self, username: str) -> str:
+        user_id = self.get(username)
+        if user_id is None:
+            raise KeyError(username)
+        return user_id
+
+    def __setitem__(self, username: str, user_id: str):
+        self.set(username, user_id)
@@ -84,5 +84,29 @@ class TestAIHandlerLazy(unittest.TestCase):
                 self.assertEqual(response, "Generated content")
                 mock_genai.GenerativeModel.assert_called()
 
+    def test_gemini_model_reused_until_reconfigure(self):
+        with patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}, clear=True):
+            mock_google = MagicMock()
+            mock_genai = MagicMock()
+            mock_google.generativeai = mock_genai
+            mock_genai.GenerativeModel.return_value.generate_content.return_value.text = "Generated content"
+
+            with patch.dict(sys.modules, {'google': mock_google, 'google.generativeai': mock_genai}):
+                from ai_handler import AIHandler
+                handler = AIHandler()
+                handler._call_model("first prompt")
+                handler._call_model("second prompt")
+
+                # Built once in configure, then reused by both calls
+                self.assertEqual(mock_genai.GenerativeModel.call_count, 1)
+                stats = handler.get_setup_stats()
+                self.assertEqual(stats["models_built"], 1)
+                self.assertEqual(stats["models_reused"], 2)
+
+                handler.configure("gemini", "other_key", "gemini-1.5-pro")
+                handler._call_model("third prompt")
+                self.assertEqual(mock_genai.GenerativeModel.call_count, 2)
+                mock_genai.GenerativeModel.assert_called_with("gemini-1.5-pro")
+
 if __name__ == "__main__":
     unittest.main()
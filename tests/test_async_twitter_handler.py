@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from twitter_handler import TwitterHandler
+from async_twitter_handler import AsyncTwitterHandler
+
+class TestAsyncTwitterHandler(unittest.TestCase):
+    def setUp(self):
+        # Keep the on-disk user ID cache out of data/ and separate per test
+        self.user_cache_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.user_cache_dir, "user_cache.json"),
+            "TWITTER_CONSUMER_KEY": "fake_key",
+            "TWITTER_CONSUMER_SECRET": "fake_secret",
+            "TWITTER_ACCESS_TOKEN": "fake_token",
+            "TWITTER_ACCESS_TOKEN_SECRET": "fake_token_secret"
+        })
+        self.env_patcher.start()
+        self.requests = []
+        self.responses = []
+        def handle(request):
+            self.requests.append(request)
+            return self.responses.pop(0)
+        self.handler = TwitterHandler()
+        self.async_handler = AsyncTwitterHandler(self.handler, transport=httpx.MockTransport(handle))
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        shutil.rmtree(self.user_cache_dir)
+
+    def test_post_tweet_signed(self):
+        self.responses = [httpx.Response(201, json={"data": {"id": "5"}},
+                                         headers={"x-rate-limit-remaining": "9", "x-rate-limit-reset": str(int(time.time()) + 900)})]
+
+        result = asyncio.run(self.async_handler.post_tweet("hello", reply_to_id="4"))
+
+        self.assertEqual(result, {"data": {"id": "5"}})
+        request = self.requests[0]
+        self.assertEqual(request.method, "POST")
+        self.assertTrue(request.headers["Authorization"].startswith("OAuth "))
+        self.assertIn('oauth_consumer_key="fake_key"', request.headers["Authorization"])
+        self.assertEqual(json.loads(request.content), {"text": "hello", "reply": {"in_reply_to_tweet_id": "4"}})
+        # Budgets are shared with the sync handler
+        self.assertEqual(self.handler.get_rate_limit_budgets()["POST /2/tweets"]["remaining"], 9)
+
+    def test_search_retries_429(self):
+        self.responses = [
+            httpx.Response(429),
+            httpx.Response(200, json={"data": [{"id": "1", "text": "hi", "author_id": "2"}]}),
+        ]
+        with patch("async_twitter_handler.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            results = asyncio.run(self.async_handler.search_tweets("cats dogs", count=5))
+
+        self.assertEqual(results, [{"id": "1", "text": "hi", "author_id": "2"}])
+        self.assertEqual(len(self.requests), 2)
+        mock_sleep.assert_awaited_once()
+        self.assertEqual(self.requests[1].url.params["query"], "cats dogs")
+
+    def test_concurrent_calls(self):
+        self.handler.username_cache["someone"] = "42"
+        self.responses = [httpx.Response(200, json={"data": [{"text": f"t{i}"}]}) for i in range(3)]
+
+        async def fetch_all():
+            return await asyncio.gather(*(self.async_handler.get_user_tweets("someone", 5) for _ in range(3)))
+
+        results = asyncio.run(fetch_all())
+        self.assertEqual(sorted(r[0] for r in results), ["t0", "t1", "t2"])
+
+    def test_media_upload_runs_sync_pipeline(self):
+        self.handler.upload_media = MagicMock(return_value="m1")
+        self.responses = [httpx.Response(201, json={"data": {"id": "6"}})]
+
+        asyncio.run(self.async_handler.post_tweet("pic", media_path="/tmp/pic.jpg"))
+
+        self.handler.upload_media.assert_called_once_with("/tmp/pic.jpg")
+        self.assertEqual(json.loads(self.requests[0].content)["media"], {"media_ids": ["m1"]})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from twitter_handler import TwitterHandler, PooledHTTPAdapter
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestConnectionPooling(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/media.jpg"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_download_session_reuses_connection(self):
+        handler = TwitterHandler()
+        for _ in range(3):
+            response = handler.download_session.get(self.url)
+            self.assertEqual(response.content, b"ok")
+
+        stats = handler.get_connection_stats()["127.0.0.1"]
+        self.assertEqual(stats, {"requests": 3, "connections_opened": 1, "connections_reused": 2})
+        handler.download_session.close()
+
+    def test_adapter_settings(self):
+        handler = TwitterHandler()
+        adapter = handler.download_session.get_adapter(self.url)
+        self.assertIsInstance(adapter, PooledHTTPAdapter)
+        self.assertEqual(adapter.timeout, handler.http_timeout)
+        self.assertEqual(adapter.max_retries.status_forcelist, (500, 502, 503, 504))
+        self.assertNotIn(429, adapter.max_retries.status_forcelist)
+        self.assertNotIn("POST", adapter.max_retries.allowed_methods)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ import tempfile
 import csv
 import sys
 import importlib
+from unittest.mock import patch
 
 # Add src to path
 sys.path.append(os.path.abspath("src"))
@@ -81,5 +82,33 @@ class TestDataManager(unittest.TestCase):
         self.assertEqual(rows[0]["text"], "Test Tweet 2")
         self.assertEqual(rows[0]["media_path"], "media2.jpg")
 
+    def test_add_drafts_single_write(self):
+        drafts = [
+            {"text": "Bulk 1", "media_path": "a.jpg", "notes": "Option 1"},
+            {"text": "Bulk 2", "media_path": "a.jpg", "notes": "Option 2"},
+        ]
+        with patch.object(self.data_manager.store, "add", wraps=self.data_manager.store.add) as store_add:
+            draft_ids = self.data_manager.add_drafts(drafts)
+
+        store_add.assert_called_once()
+        self.assertEqual(len(draft_ids), 2)
+        pending = self.data_manager.list_pending_drafts()
+        self.assertEqual([d["id"] for d in pending], draft_ids)
+        self.assertEqual(pending[1]["notes"], "Option 2")
+
+    def test_write_session_flushes_on_error(self):
+        with patch.object(self.data_manager.store, "add", wraps=self.data_manager.store.add) as store_add:
+            with self.assertRaises(RuntimeError):
+                with self.data_manager.write_session() as session:
+                    first = session.add_draft("Session 1")
+                    second = session.add_draft("Session 2", is_retweet=True, original_tweet_id="42")
+                    # Nothing is written until the session ends
+                    self.assertIsNone(self.data_manager.get_draft(first))
+                    raise RuntimeError("generation failed")
+
+        store_add.assert_called_once()
+        self.assertEqual(self.data_manager.get_draft(first)["text"], "Session 1")
+        self.assertEqual(self.data_manager.get_draft(second)["original_tweet_id"], "42")
+
 if __name__ == "__main__":
     unittest.main()
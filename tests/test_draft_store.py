@@ -0,0 +1,282 @@
+import unittest
+import os
+import shutil
+import tempfile
+import csv
+import sys
+import threading
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+import data_handler
+import draft_store
+from scheduler import TweetScheduler
+
+class TestSQLiteDraftStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+        # Save original paths
+        self.original_drafts_file = data_handler.DRAFTS_FILE
+        self.original_posted_log = data_handler.POSTED_LOG
+        self.original_db_file = data_handler.DRAFTS_DB_FILE
+
+        # Update paths to use temp dir
+        data_handler.DRAFTS_FILE = os.path.join(self.test_dir, "drafts.csv")
+        data_handler.POSTED_LOG = os.path.join(self.test_dir, "posted_history.csv")
+        data_handler.DRAFTS_DB_FILE = os.path.join(self.test_dir, "drafts.db")
+
+    def tearDown(self):
+        data_handler.DRAFTS_FILE = self.original_drafts_file
+        data_handler.POSTED_LOG = self.original_posted_log
+        data_handler.DRAFTS_DB_FILE = self.original_db_file
+
+        shutil.rmtree(self.test_dir)
+
+    def test_sqlite_backend_matches_csv_api(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        draft_id = dm.add_draft("SQLite tweet", "media.jpg", is_retweet=True)
+
+        draft = dm.get_draft(draft_id)
+        self.assertEqual(draft["text"], "SQLite tweet")
+        self.assertEqual(draft["status"], "pending")
+        # Values are strings, as csv.DictReader would return them
+        self.assertEqual(draft["is_retweet"], "True")
+        self.assertEqual(draft["scheduled_time"], "")
+
+        self.assertEqual([d["id"] for d in dm.list_pending_drafts()], [draft_id])
+
+        dm.mark_as_posted(draft_id, "111")
+        self.assertEqual(dm.get_draft(draft_id)["status"], "posted")
+        self.assertEqual(dm.list_pending_drafts(), [])
+        self.assertIsNone(dm.get_draft("missing"))
+
+    def test_sqlite_imports_existing_csv_once(self):
+        csv_dm = data_handler.DataManager(backend="csv")
+        first = csv_dm.add_draft("First")
+        second = csv_dm.add_draft("Second")
+
+        sqlite_dm = data_handler.DataManager(backend="sqlite")
+        self.assertEqual([d["id"] for d in sqlite_dm.list_pending_drafts()], [first, second])
+
+        # Re-opening an existing database must not import again
+        sqlite_dm.update_draft_status(first, "rejected")
+        reopened = data_handler.DataManager(backend="sqlite")
+        self.assertEqual(reopened.get_draft(first)["status"], "rejected")
+        self.assertEqual(len(reopened.list_drafts()), 2)
+
+    def test_export_drafts_csv(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        draft_id = dm.add_draft("Exported", notes="=1+1")
+        dm.update_draft_status(draft_id, "approved")
+
+        path = dm.export_drafts_csv()
+        self.assertEqual(path, data_handler.DRAFTS_FILE)
+
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], draft_id)
+        self.assertEqual(rows[0]["status"], "approved")
+        # The main export keeps raw values; only export_safe_drafts sanitizes
+        self.assertEqual(rows[0]["notes"], "=1+1")
+
+    def test_sqlite_writes_are_mirrored_to_csv(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        draft_id = dm.add_draft("Mirrored")
+        dm.update_draft(draft_id, status="scheduled", scheduled_time="2030-01-01T00:00:00")
+
+        # The CSV-backed posting job sees the change without an explicit export
+        csv_store = draft_store.CSVDraftStore(data_handler.DRAFTS_FILE)
+        self.assertEqual(csv_store.get(draft_id)["status"], "scheduled")
+
+    def test_sqlite_update_does_not_rewrite_csv(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        draft_id = dm.add_draft("Mirrored")
+        before = os.stat(data_handler.DRAFTS_FILE)
+
+        dm.update_draft_status(draft_id, "approved")
+
+        # The change goes to the journal, like the CSV backend's updates
+        after = os.stat(data_handler.DRAFTS_FILE)
+        self.assertEqual((after.st_ino, after.st_mtime_ns, after.st_size),
+                         (before.st_ino, before.st_mtime_ns, before.st_size))
+        journal = draft_store.CSVDraftStore(data_handler.DRAFTS_FILE).journal_path
+        with open(journal, 'r', newline='', encoding='utf-8') as f:
+            self.assertEqual(list(csv.reader(f))[-1][1:], [draft_id, "status", "approved"])
+
+    def test_csv_changes_flow_back_into_sqlite(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        posted_id = dm.add_draft("Posted by the job")
+        local_id = dm.add_draft("Only local")
+
+        # The posting job (CSV backend) marks a draft posted, and drafts.csv is pulled back
+        job = draft_store.CSVDraftStore(data_handler.DRAFTS_FILE)
+        job.update(posted_id, {"status": "posted"})
+        job.add([{"id": "job1", "text": "Added by the job", "status": "pending"}])
+
+        self.assertEqual(dm.get_draft(posted_id)["status"], "posted")
+        self.assertEqual([d["id"] for d in dm.list_pending_drafts()], [local_id, "job1"])
+        # Another process opening the database sees the same
+        reopened = data_handler.DataManager(backend="sqlite")
+        self.assertEqual(reopened.get_draft(posted_id)["status"], "posted")
+
+        dm.update_draft_status(local_id, "approved")
+        rows = {d["id"]: d for d in draft_store.CSVDraftStore(data_handler.DRAFTS_FILE).list()}
+        self.assertEqual(rows[posted_id]["status"], "posted")
+        self.assertEqual(rows[local_id]["status"], "approved")
+        self.assertIn("job1", rows)
+
+    def test_scheduler_uses_backend(self):
+        dm = data_handler.DataManager(backend="sqlite")
+        scheduler = TweetScheduler(dm)
+        draft_id = dm.add_draft("Scheduled")
+
+        self.assertTrue(scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00"))
+        self.assertFalse(scheduler.schedule_draft("missing", "2000-01-01T00:00:00"))
+        self.assertEqual([d["id"] for d in scheduler.get_due_posts()], [draft_id])
+
+        self.assertTrue(scheduler.unschedule_draft(draft_id))
+        draft = dm.get_draft(draft_id)
+        self.assertEqual(draft["status"], "pending")
+        self.assertEqual(draft["scheduled_time"], "")
+        self.assertEqual(scheduler.list_scheduled(), [])
+
+class TestCSVDraftJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.drafts_file = os.path.join(self.test_dir, "drafts.csv")
+        with open(self.drafts_file, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(draft_store.DRAFT_FIELDS)
+        self.store = draft_store.CSVDraftStore(self.drafts_file, compact_every=4)
+        self.store.add([
+            {"id": "a1", "text": "First", "status": "pending"},
+            {"id": "b2", "text": "Second", "status": "pending"},
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read_drafts_file(self):
+        with open(self.drafts_file, 'r', newline='', encoding='utf-8') as f:
+            return {row["id"]: row for row in csv.DictReader(f)}
+
+    def test_update_appends_to_journal(self):
+        with open(self.drafts_file, 'rb') as f:
+            before = f.read()
+
+        self.assertTrue(self.store.update("a1", {"status": "posted"}))
+        self.assertFalse(self.store.update("missing", {"status": "posted"}))
+
+        # drafts.csv is untouched; the change lives in the journal
+        with open(self.drafts_file, 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assertTrue(os.path.exists(self.store.journal_path))
+
+        self.assertEqual(self.store.get("a1")["status"], "posted")
+        self.assertEqual([row["id"] for row in self.store.list("pending")], ["b2"])
+
+        # A fresh store (e.g. another process) sees the same state
+        other = draft_store.CSVDraftStore(self.drafts_file)
+        self.assertEqual(other.get("a1")["status"], "posted")
+
+    def test_compaction_folds_journal(self):
+        self.store.update("a1", {"status": "scheduled", "scheduled_time": "2030-01-01T00:00:00"})
+        self.store.update("a1", {"status": "pending", "scheduled_time": ""})
+
+        # Four journal entries reached compact_every
+        self.assertFalse(os.path.exists(self.store.journal_path))
+        rows = self.read_drafts_file()
+        self.assertEqual(rows["a1"]["status"], "pending")
+        self.assertEqual(rows["a1"]["scheduled_time"], "")
+        self.assertEqual(rows["b2"]["text"], "Second")
+
+    def test_replay_after_crash_is_idempotent(self):
+        self.store.update("b2", {"status": "posted"})
+        with open(self.store.journal_path, 'r', encoding='utf-8') as f:
+            journal = f.read()
+
+        # Simulate a crash after drafts.csv was replaced but before the journal was removed,
+        # plus a torn final line
+        self.store.compact()
+        with open(self.store.journal_path, 'w', encoding='utf-8') as f:
+            f.write(journal + "2030-01-01T00:00:00,a1,sta")
+
+        store = draft_store.CSVDraftStore(self.drafts_file)
+        self.assertEqual(store.get("b2")["status"], "posted")
+        self.assertEqual(store.get("a1")["status"], "pending")
+
+        # The next append starts on a fresh line instead of extending the torn one
+        store.update("a1", {"status": "rejected"})
+        self.assertEqual(draft_store.CSVDraftStore(self.drafts_file).get("a1")["status"], "rejected")
+
+    def test_concurrent_writer_is_not_lost(self):
+        self.store.update("a1", {"status": "scheduled"})
+        other = draft_store.CSVDraftStore(self.drafts_file)
+        other_done = threading.Event()
+
+        def other_process_writes(*args):
+            # Another process (e.g. the posting daemon) marks a draft posted while we are mid-write
+            threading.Thread(target=lambda: (other.update("b2", {"status": "posted"}), other_done.set())).start()
+            other_done.wait(0.2)
+            return False
+
+        with patch.object(self.store, "_has_torn_tail", side_effect=other_process_writes):
+            self.store.update("a1", {"status": "approved"})
+        self.assertTrue(other_done.wait(5))
+
+        # Compacting our view must keep the other process's change
+        self.store.compact()
+        store = draft_store.CSVDraftStore(self.drafts_file)
+        self.assertEqual(store.get("a1")["status"], "approved")
+        self.assertEqual(store.get("b2")["status"], "posted")
+
+class TestCSVDraftCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.drafts_file = os.path.join(self.test_dir, "drafts.csv")
+        with open(self.drafts_file, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(draft_store.DRAFT_FIELDS)
+        self.store = draft_store.CSVDraftStore(self.drafts_file)
+        self.store.add([{"id": "a1", "text": "First", "status": "pending"}])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_reads_served_from_memory(self):
+        self.store.list("pending")
+        with patch("draft_store.csv.DictReader", wraps=csv.DictReader) as reader:
+            self.store.add([{"id": "b2", "text": "Second", "status": "pending"}])
+            self.store.update("a1", {"status": "posted"})
+            self.assertEqual(self.store.get("a1")["status"], "posted")
+            self.assertEqual([row["id"] for row in self.store.list("pending")], ["b2"])
+            reader.assert_not_called()
+
+    def test_reload_after_external_change(self):
+        self.assertEqual(len(self.store.list()), 1)
+
+        # Another process appends a draft and updates one
+        other = draft_store.CSVDraftStore(self.drafts_file)
+        other.add([{"id": "c3", "text": "Third", "status": "pending"}])
+        other.update("a1", {"status": "scheduled"})
+
+        self.assertEqual(self.store.get("a1")["status"], "scheduled")
+        self.assertEqual([row["id"] for row in self.store.list("pending")], ["c3"])
+
+    def test_status_buckets_keep_file_order(self):
+        self.store.add([{"id": "b2", "text": "Second", "status": "pending"}])
+        self.store.update("a1", {"status": "scheduled"})
+        self.store.update("a1", {"status": "pending"})
+
+        # a1 is still the oldest pending draft
+        self.assertEqual([row["id"] for row in self.store.list("pending")], ["a1", "b2"])
+
+    def test_returned_rows_are_copies(self):
+        self.store.get("a1")["text"] = "Mutated"
+        self.assertEqual(self.store.get("a1")["text"], "First")
+
+if __name__ == "__main__":
+    unittest.main()
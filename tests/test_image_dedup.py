@@ -0,0 +1,83 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from image_dedup import BKTree, cluster_near_duplicates, dhash, hamming
+
+
+def _gradient(size, flip=False):
+    img = Image.new("L", size)
+    width, height = size
+    img.putdata([
+        ((width - 1 - x if flip else x) * 255 // width + y * 64 // height) % 256
+        for y in range(height) for x in range(width)
+    ])
+    return img.convert("RGB")
+
+
+class TestBKTree(unittest.TestCase):
+    def test_search_matches_brute_force(self):
+        rng = random.Random(7)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        # A few near copies so there is something to find
+        values += [v ^ (1 << rng.randrange(64)) for v in values[:20]]
+        tree = BKTree()
+        for index, value in enumerate(values):
+            tree.add(value, index)
+        self.assertEqual(len(tree), len(values))
+
+        for query in values[:30]:
+            expected = sorted((hamming(query, v), i) for i, v in enumerate(values) if hamming(query, v) <= 4)
+            self.assertEqual(sorted(tree.search(query, 4)), expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(BKTree().search(0, 10), [])
+
+
+class TestImageDedup(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _save(self, name, img, **kwargs):
+        path = os.path.join(self.temp_dir, name)
+        img.save(path, **kwargs)
+        return path
+
+    def test_dhash_survives_resize_and_reencode(self):
+        original = self._save("a.png", _gradient((400, 300)))
+        resized = self._save("a_small.jpg", _gradient((400, 300)).resize((200, 150)), quality=70)
+        different = self._save("b.png", _gradient((400, 300), flip=True))
+
+        self.assertLessEqual(hamming(dhash(original), dhash(resized)), 6)
+        self.assertGreater(hamming(dhash(original), dhash(different)), 6)
+
+    def test_near_duplicates_share_a_cluster(self):
+        a = self._save("a.png", _gradient((400, 300)))
+        b = self._save("b.png", _gradient((400, 300), flip=True))
+        a_copy = self._save("a_copy.jpg", _gradient((400, 300)), quality=80)
+        broken = os.path.join(self.temp_dir, "broken.jpg")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+
+        clusters = cluster_near_duplicates([a, b, a_copy, broken])
+
+        self.assertEqual(clusters, [[a, a_copy], [b], [broken]])
+
+    def test_nearest_representative_wins(self):
+        hashes = {"x": 0b0000, "y": 0b1111, "z": 0b0111}
+        clusters = cluster_near_duplicates(list(hashes), max_distance=1, hasher=hashes.get)
+        self.assertEqual(clusters, [["x"], ["y", "z"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+with patch.dict(sys.modules, {'google': MagicMock(), 'google.generativeai': MagicMock()}):
+    from ai_handler import AIHandler
+
+
+class TestConcurrentImageDrafting(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(8):
+            path = os.path.join(self.temp_dir, f"img{i}.png")
+            Image.new("RGB", (4, 4), (i * 30, 0, 0)).save(path)
+            self.paths.append(path)
+
+        with patch.dict(os.environ, {"GEMINI_MAX_CONCURRENCY": "2"}, clear=True):
+            self.handler = AIHandler()
+            self.handler.provider = "gemini"
+            self.handler._voice_profile_cache = "Test voice profile"
+            self.handler._provider_slot("gemini")
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _generate(self, prompt, images):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later images finish first, so completion order differs from input order
+        name = os.path.basename(images[0].filename)
+        time.sleep(0.05 - int(name[3]) * 0.005)
+        with self.lock:
+            self.in_flight -= 1
+        return f"Tweet about {name}"
+
+    def test_results_follow_input_order(self):
+        self.handler._generate = self._generate
+        results = list(self.handler.generate_tweets_from_images(self.paths, count=1, max_workers=8))
+
+        self.assertEqual([path for path, _ in results], self.paths)
+        self.assertEqual(
+            [tweets for _, tweets in results],
+            [[f"Tweet about img{i}.png"] for i in range(8)]
+        )
+
+    def test_provider_limit_caps_calls_in_flight(self):
+        self.handler._generate = self._generate
+        list(self.handler.generate_tweets_from_images(self.paths, count=1, max_workers=8))
+
+        self.assertEqual(self.max_in_flight, 2)
+
+    def test_failures_stay_with_their_image(self):
+        self.handler._generate = MagicMock(side_effect=[Exception("boom")] + ["A tweet"] * 7)
+        results = list(self.handler.generate_tweets_from_images(self.paths[:3], count=1, max_workers=1))
+
+        self.assertTrue(results[0][1][0].startswith("Error"))
+        self.assertEqual(results[1][1], ["A tweet"])
+
+
+if __name__ == '__main__':
+    unittest.main()
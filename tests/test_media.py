@@ -1,5 +1,8 @@
 import sys
 import os
+import shutil
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -7,18 +10,22 @@ from unittest.mock import MagicMock, patch
 sys.path.append(os.path.abspath("src"))
 
 from twitter_handler import TwitterHandler
+from media_cache import MediaCache, file_digest
 
 class TestMediaSupport(unittest.TestCase):
-    @patch('requests.get')
-    def test_url_detection(self, mock_get):
+    def test_url_detection(self):
         # Mock successful download
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.iter_content.return_value = [b'fake_data']
-        mock_get.return_value = mock_response
 
         handler = TwitterHandler()
         handler.session = MagicMock()
+        handler.media_cache = None
+        # Downloads go through the handler's pooled download session
+        handler.download_session = MagicMock()
+        mock_get = handler.download_session.get
+        mock_get.return_value = mock_response
         # Mock _chunked_upload to avoid actual API call
         handler._chunked_upload = MagicMock(return_value="media_id_123")
         
@@ -32,6 +39,7 @@ class TestMediaSupport(unittest.TestCase):
     def test_chunked_upload_logic(self):
         handler = TwitterHandler()
         handler.session = MagicMock()
+        handler.media_cache = None
         
         # Mock INIT
         mock_init = MagicMock()
@@ -60,5 +68,205 @@ class TestMediaSupport(unittest.TestCase):
             if os.path.exists('test_tmp.jpg'):
                 os.remove('test_tmp.jpg')
 
+    def test_url_streamed_without_temp_file(self):
+        events = []
+        def iter_content(chunk_size):
+            for chunk in (b"abc", b"def", b"g"):
+                events.append("download")
+                yield chunk
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Length": "7", "Content-Type": "video/mp4"}
+        mock_response.iter_content.side_effect = iter_content
+
+        handler = TwitterHandler()
+        handler.session = MagicMock()
+        handler.media_cache = None
+        handler.download_session = MagicMock()
+        handler.download_session.get.return_value = mock_response
+
+        segments = {}
+        def post(url, data=None, **kwargs):
+            response = MagicMock()
+            fields = getattr(data, "fields", data)
+            events.append(fields["command"])
+            if fields["command"] == "INIT":
+                self.assertEqual(fields["total_bytes"], 7)
+                response.status_code = 202
+                response.json.return_value = {"media_id_string": "77"}
+            elif fields["command"] == "APPEND":
+                segments[fields["segment_index"]] = bytes(data.payload)
+                response.status_code = 204
+            else:
+                response.status_code = 200
+            return response
+        handler.session.post.side_effect = post
+
+        with patch("twitter_handler.tempfile.NamedTemporaryFile") as mock_temp:
+            media_id = handler.upload_media("https://example.com/clip.mp4?quality=hd")
+
+        self.assertEqual(media_id, "77")
+        mock_temp.assert_not_called()
+        self.assertEqual(segments, {0: b"abc", 1: b"def", 2: b"g"})
+        # INIT is sent before any of the body is downloaded
+        self.assertEqual(events[0], "INIT")
+        self.assertEqual(events[-1], "FINALIZE")
+
+    def test_url_stream_short_download_fails(self):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Length": "100"}
+        mock_response.iter_content.return_value = [b"abc"]
+
+        handler = TwitterHandler()
+        handler.session = MagicMock()
+        handler.media_cache = None
+        handler.download_session = MagicMock()
+        handler.download_session.get.return_value = mock_response
+        init = MagicMock(status_code=202)
+        init.json.return_value = {"media_id_string": "77"}
+        handler.session.post.side_effect = [init, MagicMock(status_code=204)]
+
+        self.assertIsNone(handler.upload_media("https://example.com/clip.mp4"))
+        self.assertEqual(handler.session.post.call_count, 2)  # no FINALIZE
+
+class TestParallelAppend(unittest.TestCase):
+    def setUp(self):
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.handler.media_cache = None
+        self.handler.upload_chunk_size = 3
+        self.handler.upload_workers = 2
+        fd, self.path = tempfile.mkstemp(suffix=".jpg")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"abcdefghij")  # 4 segments: abc def ghi j
+        self.sleep_patcher = patch("twitter_handler.time.sleep")
+        self.sleep_patcher.start()
+
+    def tearDown(self):
+        self.sleep_patcher.stop()
+        os.remove(self.path)
+
+    def make_post(self, append_status):
+        self.segments = {}
+        self.lock = threading.Lock()
+        def post(url, data=None, **kwargs):
+            response = MagicMock()
+            # APPEND bodies are MultipartStreams carrying the form fields
+            fields = getattr(data, "fields", data)
+            command = fields["command"]
+            if command == "INIT":
+                response.status_code = 202
+                response.json.return_value = {"media_id_string": "42"}
+            elif command == "APPEND":
+                with self.lock:
+                    index = fields["segment_index"]
+                    response.status_code = append_status(index)
+                    if response.status_code == 204:
+                        self.segments[index] = bytes(data.payload)
+            else:
+                response.status_code = 200
+            return response
+        return post
+
+    def test_segments_uploaded_concurrently(self):
+        # Segments 0 and 1 only finish once both are in flight
+        barrier = threading.Barrier(2, timeout=5)
+        def append_status(index):
+            return 204
+        post = self.make_post(append_status)
+        def concurrent_post(url, **kwargs):
+            fields = getattr(kwargs["data"], "fields", kwargs["data"])
+            if fields["command"] == "APPEND" and fields["segment_index"] < 2:
+                barrier.wait()
+            return post(url, **kwargs)
+        self.handler.session.post.side_effect = concurrent_post
+
+        self.assertEqual(self.handler._chunked_upload(self.path), "42")
+        self.assertEqual(self.segments, {0: b"abc", 1: b"def", 2: b"ghi", 3: b"j"})
+        commands = [getattr(c.kwargs["data"], "fields", c.kwargs["data"])["command"]
+                    for c in self.handler.session.post.call_args_list]
+        self.assertEqual(commands[0], "INIT")
+        self.assertEqual(commands[-1], "FINALIZE")
+
+    def test_segment_retry(self):
+        failures = {2: 1}
+        def append_status(index):
+            if failures.get(index):
+                failures[index] -= 1
+                return 503
+            return 204
+        self.handler.session.post.side_effect = self.make_post(append_status)
+
+        self.assertEqual(self.handler._chunked_upload(self.path), "42")
+        self.assertEqual(len(self.segments), 4)
+        self.assertEqual(self.handler.session.post.call_count, 1 + 5 + 1)
+
+    def test_client_error_aborts_upload(self):
+        self.handler.session.post.side_effect = self.make_post(lambda index: 400 if index == 1 else 204)
+
+        self.assertIsNone(self.handler._chunked_upload(self.path))
+        commands = [getattr(c.kwargs["data"], "fields", c.kwargs["data"])["command"]
+                    for c in self.handler.session.post.call_args_list]
+        self.assertNotIn("FINALIZE", commands)
+
+    def test_empty_file_is_rejected(self):
+        with open(self.path, 'wb'):
+            pass
+        self.assertIsNone(self.handler._chunked_upload(self.path))
+        self.handler.session.post.assert_not_called()
+
+class TestMediaCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "photo.jpg")
+        with open(self.path, 'wb') as f:
+            f.write(b"same image bytes")
+
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.handler.media_cache = MediaCache(os.path.join(self.test_dir, "media_cache.json"))
+
+        def post(url, data=None, **kwargs):
+            response = MagicMock()
+            command = getattr(data, "fields", data)["command"]
+            if command == "INIT":
+                response.status_code = 202
+                response.json.return_value = {"media_id_string": str(self.handler.session.post.call_count)}
+            elif command == "APPEND":
+                response.status_code = 204
+            else:
+                response.status_code = 200
+                response.json.return_value = {"expires_after_secs": 86400}
+            return response
+        self.handler.session.post.side_effect = post
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_same_content_uploaded_once(self):
+        first = self.handler.upload_media(self.path)
+        calls = self.handler.session.post.call_count
+
+        copy_path = os.path.join(self.test_dir, "copy.jpg")
+        shutil.copy(self.path, copy_path)
+        self.assertEqual(self.handler.upload_media(copy_path), first)
+        self.assertEqual(self.handler.session.post.call_count, calls)
+
+        # Persisted for other processes
+        other = MediaCache(self.handler.media_cache.path)
+        self.assertEqual(other.get(file_digest(self.path), "image/jpeg"), first)
+
+    def test_expired_and_invalidated_entries_reupload(self):
+        first = self.handler.upload_media(self.path)
+        self.handler.media_cache.invalidate(first)
+        second = self.handler.upload_media(self.path)
+        self.assertNotEqual(second, first)
+
+        digest = file_digest(self.path)
+        self.handler.media_cache.put(digest, "image/jpeg", "old", expires_after_secs=0)
+        self.assertIsNone(self.handler.media_cache.get(digest, "image/jpeg"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+import media_prep
+from media_prep import MediaPreparer, media_type_for
+
+class TestMediaPrep(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.preparer = MediaPreparer(os.path.join(self.test_dir, "cache"), max_dimension=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def test_media_types(self):
+        self.assertEqual(media_type_for("a.PNG"), "image/png")
+        self.assertEqual(media_type_for("a.webp"), "image/webp")
+        self.assertEqual(media_type_for("a.jpeg"), "image/jpeg")
+        self.assertEqual(media_type_for("a.mov"), "video/mp4")
+        self.assertEqual(media_type_for("a.gif"), "image/gif")
+
+    def test_downsizes_rotates_and_strips_exif(self):
+        source = self.path("photo.png")
+        img = Image.new("RGB", (400, 200), "red")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 CW
+        exif[0x010F] = "Camera Maker"
+        img.save(source, exif=exif)
+
+        prepared = self.preparer.prepare(source)
+
+        self.assertNotEqual(prepared, source)
+        self.assertEqual(media_type_for(prepared), "image/jpeg")
+        with Image.open(prepared) as out:
+            self.assertEqual(out.format, "JPEG")
+            self.assertEqual(out.size, (50, 100))  # rotated, then fitted into 100x100
+            self.assertEqual(len(out.getexif()), 0)
+
+    def test_transparency_kept_as_png(self):
+        source = self.path("logo.webp")
+        img = Image.new("RGBA", (300, 300), (0, 0, 0, 0))
+        img.save(source)
+
+        prepared = self.preparer.prepare(source)
+        self.assertEqual(media_type_for(prepared), "image/png")
+        with Image.open(prepared) as out:
+            self.assertEqual(out.mode, "RGBA")
+            self.assertEqual(out.size, (100, 100))
+
+    def test_prepared_once_per_content(self):
+        source = self.path("photo.jpg")
+        Image.new("RGB", (300, 300), "blue").save(source)
+
+        first = self.preparer.prepare(source)
+        with patch.object(media_prep.Image, "open") as mock_open:
+            second = self.preparer.prepare(source)
+        self.assertEqual(first, second)
+        mock_open.assert_not_called()
+
+    def test_small_clean_image_uploaded_as_is(self):
+        source = self.path("small.jpg")
+        Image.new("RGB", (50, 50), "green").save(source)
+        self.assertEqual(self.preparer.prepare(source), source)
+
+    def test_unreadable_and_video_files_unchanged(self):
+        broken = self.path("broken.jpg")
+        video = self.path("clip.mp4")
+        for path in (broken, video):
+            with open(path, 'wb') as f:
+                f.write(b"not an image")
+        self.assertEqual(self.preparer.prepare(broken), broken)
+        self.assertEqual(self.preparer.prepare(video), video)
+
+if __name__ == "__main__":
+    unittest.main()
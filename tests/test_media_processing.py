@@ -0,0 +1,110 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from media_processing import MediaProcessingTracker
+from media_cache import MediaCache, file_digest
+from twitter_handler import TwitterHandler
+
+class TestMediaProcessingTracker(unittest.TestCase):
+    def test_polls_all_media_on_one_thread(self):
+        states = {
+            "a": [{"state": "in_progress", "check_after_secs": 0}, {"state": "succeeded"}],
+            "b": [{"state": "failed", "error": {"message": "bad codec"}}],
+        }
+        threads = set()
+        def check_status(media_id):
+            threads.add(threading.current_thread())
+            return states[media_id].pop(0)
+        failed = []
+
+        tracker = MediaProcessingTracker(check_status, on_failed=failed.append)
+        a = tracker.track("a", {"state": "pending", "check_after_secs": 0})
+        b = tracker.track("b", {"state": "pending", "check_after_secs": 0})
+
+        self.assertTrue(a.wait(5))
+        self.assertFalse(b.wait(5))
+        self.assertEqual(b.error, {"message": "bad codec"})
+        self.assertEqual(failed, ["b"])
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(tracker.pending(), 0)
+
+    def test_track_returns_immediately(self):
+        release = threading.Event()
+        def check_status(media_id):
+            release.wait(5)
+            return {"state": "succeeded"}
+
+        tracker = MediaProcessingTracker(check_status)
+        handle = tracker.track("slow", {"check_after_secs": 0})
+        self.assertFalse(handle.wait(0.05))
+        self.assertIs(tracker.track("slow"), handle)
+        release.set()
+        self.assertTrue(handle.wait(5))
+
+class TestPostTweetWaitsForVideo(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.video = os.path.join(self.test_dir, "clip.mp4")
+        with open(self.video, 'wb') as f:
+            f.write(b"video bytes")
+
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.handler.media_cache = MediaCache(os.path.join(self.test_dir, "media_cache.json"))
+
+        self.statuses = []
+        def get(url, params=None, **kwargs):
+            response = MagicMock(status_code=200)
+            response.json.return_value = {"processing_info": self.statuses.pop(0)}
+            return response
+        self.handler.session.get.side_effect = get
+
+        self.tweets = []
+        def post(url, data=None, json=None, **kwargs):
+            response = MagicMock()
+            if json is not None:
+                self.tweets.append(json)
+                response.status_code = 201
+                response.json.return_value = {"data": {"id": "1"}}
+                return response
+            command = getattr(data, "fields", data)["command"]
+            response.status_code = {"INIT": 202, "APPEND": 204}.get(command, 200)
+            response.json.return_value = {
+                "media_id_string": "vid",
+                "processing_info": {"state": "pending", "check_after_secs": 0},
+            }
+            return response
+        self.handler.session.post.side_effect = post
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_upload_returns_before_processing(self):
+        self.statuses = [{"state": "succeeded"}]
+        media_id = self.handler.upload_media(self.video)
+        self.assertEqual(media_id, "vid")
+        self.assertIsNotNone(self.handler.media_processing.get("vid"))
+        self.assertTrue(self.handler.wait_for_media("vid", timeout=5))
+
+    def test_post_waits_for_processing(self):
+        self.statuses = [{"state": "in_progress", "check_after_secs": 0}, {"state": "succeeded"}]
+        self.handler.post_tweet("Watch this", self.video)
+        self.assertEqual(self.tweets[-1]["media"], {"media_ids": ["vid"]})
+
+    def test_failed_processing_is_not_attached_or_cached(self):
+        self.statuses = [{"state": "failed"}]
+        self.handler.post_tweet("Watch this", self.video)
+        self.assertNotIn("media", self.tweets[-1])
+        self.assertIsNone(self.handler.media_cache.get(file_digest(self.video), "video/mp4"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,8 +16,13 @@ from data_handler import DataManager
 
 class TestScheduleLogic(unittest.TestCase):
     def setUp(self):
-        self.scheduler = TweetScheduler()
         self.test_dir = tempfile.mkdtemp()
+        # Keep the schedule index out of the real data/ directory
+        data_manager = MagicMock()
+        data_manager.get_path_to_drafts_file.return_value = os.path.join(self.test_dir, "drafts.csv")
+        data_manager.list_drafts.return_value = []
+        data_manager.get_storage_paths.return_value = []
+        self.scheduler = TweetScheduler(data_manager)
         self.post_log = os.path.join(self.test_dir, "post_log.csv")
 
         # Initialize post log with headers
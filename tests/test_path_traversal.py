@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
@@ -13,7 +14,7 @@ class TestPathTraversal(unittest.TestCase):
         """Set up mocks before any tests in this class run."""
         # Save original modules
         cls._original_modules = {}
-        for mod_name in ["mcp.server.fastmcp", "ai_handler", "twitter_handler", "data_handler", "scheduler"]:
+        for mod_name in ["mcp.server.fastmcp", "ai_handler", "twitter_handler", "async_twitter_handler", "data_handler", "scheduler"]:
             cls._original_modules[mod_name] = sys.modules.get(mod_name)
 
         # Mock mcp.server.fastmcp before importing server
@@ -36,6 +37,7 @@ class TestPathTraversal(unittest.TestCase):
         # Mock other modules
         sys.modules["ai_handler"] = MagicMock()
         sys.modules["twitter_handler"] = MagicMock()
+        sys.modules["async_twitter_handler"] = MagicMock()
         sys.modules["data_handler"] = MagicMock()
         sys.modules["scheduler"] = MagicMock()
 
@@ -67,10 +69,11 @@ class TestPathTraversal(unittest.TestCase):
         self.server.ai_handler.reset_mock()
         self.server.data_manager.reset_mock()
         self.server.twitter.reset_mock()
+        self.server.async_twitter.reset_mock()
 
         # Setup default mock behaviors
         self.server.ai_handler.generate_tweet.return_value = ["Tweet 1"]
-        self.server.data_manager.add_draft.return_value = "draft_123"
+        self.server.data_manager.add_drafts.return_value = ["draft_123"]
 
     def test_generate_draft_tweets_rejects_bad_path(self):
         dangerous_path = "/etc/passwd"
@@ -81,8 +84,8 @@ class TestPathTraversal(unittest.TestCase):
         # Check for error message indicating failure/access denied
         self.assertTrue("Access denied" in result or "Error" in result, f"Result should be an error, got: {result}")
 
-        # Verify add_draft was NOT called
-        self.server.data_manager.add_draft.assert_not_called()
+        # Verify add_drafts was NOT called
+        self.server.data_manager.add_drafts.assert_not_called()
 
     def test_generate_draft_tweets_accepts_good_path(self):
         # Construct a path that is guaranteed to be inside SAFE_DIR
@@ -91,11 +94,11 @@ class TestPathTraversal(unittest.TestCase):
         result = self.server.generate_draft_tweets("topic", 1, media_path=safe_path)
 
         self.assertIn("Generated 1 drafts", result)
-        self.server.data_manager.add_draft.assert_called_once()
+        self.server.data_manager.add_drafts.assert_called_once()
 
-        # Verify the path passed to add_draft is correct (absolute path)
-        args, kwargs = self.server.data_manager.add_draft.call_args
-        self.assertEqual(kwargs.get("media_path"), safe_path)
+        # Verify the path passed to add_drafts is correct (absolute path)
+        args, kwargs = self.server.data_manager.add_drafts.call_args
+        self.assertEqual(args[0][0].get("media_path"), safe_path)
 
     def test_approve_and_post_draft_rejects_bad_path_in_draft(self):
         # Simulate a draft that has a bad path
@@ -108,10 +111,11 @@ class TestPathTraversal(unittest.TestCase):
             "is_retweet": False
         }
 
-        result = self.server.approve_and_post_draft(draft_id)
+        result = asyncio.run(self.server.approve_and_post_draft(draft_id))
 
         self.assertTrue("Access denied" in result or "Error" in result or "Security Error" in result, f"Result should be an error, got: {result}")
         self.server.twitter.post_tweet.assert_not_called()
+        self.server.async_twitter.post_tweet.assert_not_called()
 
 if __name__ == "__main__":
     unittest.main()
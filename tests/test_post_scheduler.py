@@ -0,0 +1,163 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import threading
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+import data_handler
+import post_scheduler
+from scheduler import TweetScheduler
+
+class TestPostSchedulerDaemon(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.originals = (data_handler.DRAFTS_FILE, data_handler.POSTED_LOG, data_handler.POST_ATTEMPT_LOG)
+        data_handler.DRAFTS_FILE = os.path.join(self.test_dir, "drafts.csv")
+        data_handler.POSTED_LOG = os.path.join(self.test_dir, "posted_history.csv")
+        data_handler.POST_ATTEMPT_LOG = os.path.join(self.test_dir, "post_log.csv")
+
+        self.dm = data_handler.DataManager()
+        self.scheduler = TweetScheduler(self.dm)
+        self.twitter = MagicMock()
+        self.twitter.post_tweet.return_value = {"data": {"id": "999"}}
+        self.twitter.get_rate_limit_budgets.return_value = {}
+
+    def tearDown(self):
+        data_handler.DRAFTS_FILE, data_handler.POSTED_LOG, data_handler.POST_ATTEMPT_LOG = self.originals
+        shutil.rmtree(self.test_dir)
+
+    def test_process_due_posts(self):
+        draft_id = self.dm.add_draft("Due now")
+        self.scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00+00:00")
+
+        posted, failed = post_scheduler.process_due_posts(
+            self.scheduler, self.twitter, self.dm, check_strategy_slot=False
+        )
+
+        self.assertEqual((posted, failed), (1, 0))
+        self.twitter.post_tweet.assert_called_once_with("Due now", None)
+        self.assertEqual(self.dm.get_draft(draft_id)["status"], "posted")
+
+    def test_next_wake_time(self):
+        now = datetime(2026, 2, 4, 10, 30, tzinfo=timezone.utc)
+        # Next slot is 08:00 CST = 14:00 UTC
+        self.assertEqual(self.scheduler.next_wake_time(now), datetime(2026, 2, 4, 14, 0, tzinfo=timezone.utc))
+
+        draft_id = self.dm.add_draft("Scheduled")
+        self.scheduler.schedule_draft(draft_id, "2026-02-04T11:15:00+00:00")
+        self.assertEqual(self.scheduler.next_wake_time(now), datetime(2026, 2, 4, 11, 15, tzinfo=timezone.utc))
+
+    def test_wait_wakes_on_drafts_change(self):
+        def add_draft_while_sleeping(seconds):
+            self.dm.add_draft("New draft")
+
+        with patch("post_scheduler.time.sleep", side_effect=add_draft_while_sleeping):
+            result = post_scheduler.wait_for_next_run(self.scheduler, self.dm, max_sleep=60, poll_interval=1)
+
+        self.assertEqual(result, "changed")
+
+    def test_wait_until_due(self):
+        draft_id = self.dm.add_draft("Soon")
+        soon = datetime.now(timezone.utc) + timedelta(milliseconds=50)
+        self.scheduler.schedule_draft(draft_id, soon.isoformat())
+
+        result = post_scheduler.wait_for_next_run(self.scheduler, self.dm, max_sleep=60, poll_interval=0.01)
+
+        self.assertEqual(result, "due")
+        self.assertEqual([d["id"] for d in self.scheduler.get_due_posts()], [draft_id])
+
+    def test_daemon_serves_strategy_slot_once(self):
+        self.dm.add_draft("Pending 1")
+        self.dm.add_draft("Pending 2")
+        slot_time = datetime(2026, 2, 4, 14, 1, tzinfo=timezone.utc)
+
+        # Wake twice inside the same slot window, then stop
+        waits = MagicMock(side_effect=["changed", KeyboardInterrupt])
+        with patch("post_scheduler.datetime") as mock_datetime, \
+             patch("post_scheduler.wait_for_next_run", waits):
+            mock_datetime.now.return_value = slot_time
+            result = post_scheduler.run_daemon(self.scheduler, self.twitter, self.dm)
+
+        self.assertEqual(result, 0)
+        self.twitter.post_tweet.assert_called_once_with("Pending 1", None)
+
+    def test_posts_concurrently_with_single_writer(self):
+        draft_ids = [self.dm.add_draft(f"Draft {i}") for i in range(3)]
+        for draft_id in draft_ids:
+            self.scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00+00:00")
+
+        # Each post waits for the other two, so this only completes if all three run at once
+        barrier = threading.Barrier(3, timeout=5)
+        def post_tweet(text, media_path=None):
+            barrier.wait()
+            return {"data": {"id": text}}
+        self.twitter.post_tweet.side_effect = post_tweet
+
+        writer_threads = set()
+        original_mark = self.dm.mark_as_posted
+        def mark_as_posted(*args, **kwargs):
+            writer_threads.add(threading.current_thread())
+            return original_mark(*args, **kwargs)
+
+        with patch.object(self.dm, "mark_as_posted", side_effect=mark_as_posted):
+            posted, failed = post_scheduler.process_due_posts(
+                self.scheduler, self.twitter, self.dm, check_strategy_slot=False, max_workers=3
+            )
+
+        self.assertEqual((posted, failed), (3, 0))
+        self.assertEqual(writer_threads, {threading.current_thread()})
+        self.assertEqual(self.dm.list_drafts("scheduled"), [])
+
+    def test_budget_defers_posts(self):
+        text_id = self.dm.add_draft("Text only")
+        media_id = self.dm.add_draft("With media", "image.jpg")
+        for draft_id in (text_id, media_id):
+            self.scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00+00:00")
+
+        budget = post_scheduler.PostingBudget({"tweets": 5, "media": 0})
+        posted, failed = post_scheduler.process_due_posts(
+            self.scheduler, self.twitter, self.dm, check_strategy_slot=False, budget=budget
+        )
+
+        self.assertEqual((posted, failed), (1, 0))
+        self.twitter.post_tweet.assert_called_once_with("Text only", None)
+        # The deferred draft stays scheduled for the next run
+        self.assertEqual(self.dm.get_draft(media_id)["status"], "scheduled")
+
+    def test_daemon_retries_deferred_posts_at_rate_limit_reset(self):
+        draft_id = self.dm.add_draft("Deferred")
+        self.scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00+00:00")
+        reset = int(datetime.now(timezone.utc).timestamp()) + 120
+        self.twitter.get_rate_limit_budgets.return_value = {
+            "POST /2/tweets": {"limit": 100, "remaining": 0, "reset": reset},
+        }
+
+        waits = MagicMock(side_effect=KeyboardInterrupt)
+        with patch("post_scheduler.wait_for_next_run", waits):
+            post_scheduler.run_daemon(self.scheduler, self.twitter, self.dm)
+
+        self.twitter.post_tweet.assert_not_called()
+        self.assertEqual(waits.call_args.kwargs["retry_at"], datetime.fromtimestamp(reset, timezone.utc))
+
+    def test_wait_until_retry(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(milliseconds=50)
+        result = post_scheduler.wait_for_next_run(self.scheduler, self.dm, max_sleep=60, poll_interval=0.01,
+                                                  retry_at=retry_at)
+        self.assertEqual(result, "due")
+
+    def test_budget_from_rate_limits(self):
+        budget = post_scheduler.PostingBudget.from_rate_limits({
+            "POST /2/tweets": {"limit": 100, "remaining": 1, "reset": 0},
+            "POST /1.1/media/upload": {"limit": 500, "remaining": 400, "reset": 0},
+        })
+        self.assertTrue(budget.try_acquire("tweets", "media"))
+        self.assertFalse(budget.try_acquire("tweets"))
+
+if __name__ == "__main__":
+    unittest.main()
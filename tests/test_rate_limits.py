@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from twitter_handler import TwitterHandler, RateLimitError
+
+def make_response(status_code, remaining=None, reset=None, limit=None, json_data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    headers = {}
+    if limit is not None:
+        headers["x-rate-limit-limit"] = str(limit)
+    if remaining is not None:
+        headers["x-rate-limit-remaining"] = str(remaining)
+    if reset is not None:
+        headers["x-rate-limit-reset"] = str(reset)
+    response.headers = headers
+    response.json.return_value = json_data or {}
+    return response
+
+class TestRateLimits(unittest.TestCase):
+    def setUp(self):
+        # Keep the on-disk user ID cache out of data/ and separate per test
+        self.user_cache_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.user_cache_dir, "user_cache.json"),
+            "TWITTER_CONSUMER_KEY": "fake_key",
+            "TWITTER_CONSUMER_SECRET": "fake_secret",
+            "TWITTER_ACCESS_TOKEN": "fake_token",
+            "TWITTER_ACCESS_TOKEN_SECRET": "fake_token_secret"
+        })
+        self.env_patcher.start()
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.sleep_patcher = patch("twitter_handler.time.sleep")
+        self.mock_sleep = self.sleep_patcher.start()
+
+    def tearDown(self):
+        self.sleep_patcher.stop()
+        self.env_patcher.stop()
+        shutil.rmtree(self.user_cache_dir)
+
+    def test_records_budgets_from_headers(self):
+        reset = int(time.time()) + 600
+        self.handler.session.post.return_value = make_response(
+            201, remaining=41, reset=reset, limit=100, json_data={"data": {"id": "1"}}
+        )
+
+        self.handler.post_tweet("hello")
+
+        budgets = self.handler.get_rate_limit_budgets()
+        self.assertEqual(budgets["POST /2/tweets"], {"limit": 100, "remaining": 41, "reset": reset})
+
+    def test_retries_429_with_backoff(self):
+        self.handler.session.get.side_effect = [
+            make_response(429),
+            make_response(200, remaining=10, reset=int(time.time()) + 900, json_data={"data": [{"id": "1"}]}),
+        ]
+
+        results = self.handler.search_tweets("query")
+
+        self.assertEqual(results, [{"id": "1"}])
+        self.assertEqual(self.handler.session.get.call_count, 2)
+        self.mock_sleep.assert_called_once()
+
+    def test_waits_for_reset_when_exhausted(self):
+        self.handler.rate_limits.update("POST /2/tweets", make_response(201, remaining=0, reset=int(time.time()) + 10))
+        self.handler.session.post.return_value = make_response(201, json_data={"data": {"id": "2"}})
+
+        result = self.handler.post_tweet("hello")
+
+        self.assertEqual(result, {"data": {"id": "2"}})
+        waited = self.mock_sleep.call_args[0][0]
+        self.assertTrue(9 <= waited <= 12, waited)
+
+    def test_does_not_call_when_reset_too_far(self):
+        self.handler.rate_limits.update("POST /2/tweets", make_response(201, remaining=0, reset=int(time.time()) + 3600))
+
+        result = self.handler.post_tweet("hello")
+
+        self.assertEqual(result["status_code"], 429)
+        self.handler.session.post.assert_not_called()
+        with self.assertRaises(RateLimitError):
+            self.handler._request("POST", "https://api.twitter.com/2/tweets", "POST /2/tweets")
+
+    def test_gives_up_after_max_retries(self):
+        self.handler.max_retries = 2
+        self.handler.session.post.return_value = make_response(429)
+
+        result = self.handler.post_tweet("hello")
+
+        self.assertEqual(result["status_code"], 429)
+        self.assertEqual(self.handler.session.post.call_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
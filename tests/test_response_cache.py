@@ -0,0 +1,104 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+with patch.dict(sys.modules, {'google': MagicMock(), 'google.generativeai': MagicMock()}):
+    from ai_handler import AIHandler
+from response_cache import ResponseCache, request_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(os.path.join(self.temp_dir, "llm_cache.db"), max_entries=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_ignores_template_indentation(self):
+        self.assertEqual(
+            request_key("gemini", "m", "\n        Hello\n        World\n    "),
+            request_key("gemini", "m", "Hello\nWorld")
+        )
+        self.assertNotEqual(request_key("gemini", "m", "Hello"), request_key("openai", "m", "Hello"))
+        self.assertNotEqual(request_key("gemini", "m", "Hello", ["a"]), request_key("gemini", "m", "Hello", ["b"]))
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", "response")
+        self.assertEqual(self.cache.get("k"), "response")
+
+    def test_expired_entries_are_misses(self):
+        self.cache.put("k", "response")
+        self.cache.ttl_seconds = 0
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put("a", "1")
+        time.sleep(0.01)
+        self.cache.put("b", "2")
+        time.sleep(0.01)
+        self.cache.get("a")
+        time.sleep(0.01)
+        self.cache.put("c", "3")
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get("a"), "1")
+        self.assertIsNone(self.cache.get("b"))
+
+
+class TestAIHandlerResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        env = {"LLM_CACHE": "1", "LLM_CACHE_FILE": os.path.join(self.temp_dir, "llm_cache.db")}
+        with patch.dict(os.environ, env, clear=True):
+            self.handler = AIHandler()
+        self.handler.provider = "openai"
+        self.handler.model = "gpt-4o-mini"
+        self.handler.client = MagicMock()
+        self.create = self.handler.client.chat.completions.create
+        self.create.return_value.choices = [MagicMock()]
+        self.create.return_value.choices[0].message.content = "A tweet"
+
+    def tearDown(self):
+        self.handler.response_cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(AIHandler().response_cache)
+
+    def test_repeated_prompt_is_served_from_cache(self):
+        self.assertEqual(self.handler._call_model("prompt"), "A tweet")
+        self.assertEqual(self.handler._call_model("prompt"), "A tweet")
+        self.assertEqual(self.create.call_count, 1)
+
+        self.handler._call_model("another prompt")
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_fresh_bypasses_cache_and_refreshes_it(self):
+        self.handler._call_model("prompt")
+        self.create.return_value.choices[0].message.content = "A new tweet"
+
+        self.assertEqual(self.handler._call_model("prompt", fresh=True), "A new tweet")
+        self.assertEqual(self.handler._call_model("prompt"), "A new tweet")
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.create.side_effect = Exception("quota exceeded")
+        self.assertTrue(self.handler._call_model("prompt").startswith("Error generating content"))
+
+        self.create.side_effect = None
+        self.assertEqual(self.handler._call_model("prompt"), "A tweet")
+        self.assertEqual(self.create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
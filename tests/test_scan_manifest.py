@@ -0,0 +1,85 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from scan_manifest import ScanManifest
+
+
+class TestScanManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.temp_dir, "scan_manifest.json")
+        self.manifest = ScanManifest(self.manifest_path)
+        self.images = []
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "wb") as f:
+                f.write(name.encode() * 10)
+            self.images.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _set_mtime(self, path, offset):
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset))
+
+    def test_scanned_images_are_skipped(self):
+        self.assertEqual(self.manifest.new_or_modified(self.images), self.images)
+
+        self.manifest.record_many({self.images[0]: ["d1", "d2"]})
+
+        self.assertEqual(self.manifest.new_or_modified(self.images), self.images[1:])
+        self.assertEqual(self.manifest.get(self.images[0])["draft_ids"], ["d1", "d2"])
+
+    def test_unchanged_images_are_not_hashed(self):
+        self.manifest.record_many({path: ["d"] for path in self.images})
+        with patch("scan_manifest.file_digest") as digest:
+            self.assertEqual(self.manifest.new_or_modified(self.images), [])
+        digest.assert_not_called()
+
+    def test_touched_but_identical_image_is_skipped(self):
+        self.manifest.record_many({self.images[0]: ["d"]})
+        self._set_mtime(self.images[0], 5 * 10**9)
+
+        self.assertEqual(self.manifest.new_or_modified(self.images[:1]), [])
+
+    def test_modified_image_is_rescanned(self):
+        self.manifest.record_many({self.images[0]: ["d"], self.images[1]: ["e"]})
+        # Same size, new content
+        with open(self.images[0], "wb") as f:
+            f.write(b"x" * len("a.jpg" * 10))
+        self._set_mtime(self.images[0], 5 * 10**9)
+        # New size
+        with open(self.images[1], "ab") as f:
+            f.write(b"more")
+
+        self.assertEqual(self.manifest.new_or_modified(self.images[:2]), self.images[:2])
+
+    def test_manifest_is_shared_through_the_file(self):
+        self.manifest.record_many({self.images[0]: ["d"]})
+
+        other = ScanManifest(self.manifest_path)
+        self.assertEqual(other.new_or_modified(self.images), self.images[1:])
+
+    def test_missing_images_are_ignored(self):
+        missing = os.path.join(self.temp_dir, "gone.jpg")
+        self.assertEqual(self.manifest.new_or_modified([missing, self.images[0]]), [self.images[0]])
+
+
+    def test_images_removed_before_recording_are_skipped(self):
+        os.remove(self.images[1])
+
+        self.manifest.record_many({path: ["d"] for path in self.images})
+
+        self.assertIsNone(self.manifest.get(self.images[1]))
+        self.assertEqual(self.manifest.new_or_modified([self.images[0], self.images[2]]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
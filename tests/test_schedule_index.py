@@ -0,0 +1,153 @@
+import unittest
+import os
+import shutil
+import tempfile
+import sys
+import time
+from unittest.mock import patch
+from datetime import datetime, timezone, timedelta
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+import data_handler
+from schedule_index import ScheduleIndex, utc_key
+from scheduler import TweetScheduler
+
+class TestScheduleIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index = ScheduleIndex(os.path.join(self.test_dir, "schedule_index.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_offsets_compare_in_utc(self):
+        # 10:00 at UTC-6 is 16:00 UTC, later than 15:00 UTC even though "10:00" < "15:00" as strings
+        self.index.add("later", "2030-01-01T10:00:00-06:00")
+        self.index.add("earlier", "2030-01-01T15:00:00+00:00")
+
+        now = datetime(2030, 1, 1, 15, 30, tzinfo=timezone.utc)
+        self.assertEqual(self.index.due(now), ["earlier"])
+        self.assertEqual(self.index.next_after(now), datetime(2030, 1, 1, 16, 0, tzinfo=timezone.utc))
+        self.assertEqual(self.index.due(now + timedelta(hours=1)), ["earlier", "later"])
+
+    def test_naive_times_are_local(self):
+        local = datetime(2030, 1, 1, 12, 0)
+        self.assertEqual(utc_key(local.isoformat()), utc_key(local.astimezone()))
+
+    def test_add_moves_and_remove(self):
+        self.index.add("a", "2030-01-01T00:00:00+00:00")
+        self.index.add("a", "2030-06-01T00:00:00+00:00")
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.due(datetime(2030, 2, 1, tzinfo=timezone.utc)), [])
+
+        self.index.remove("a", "unknown")
+        self.assertEqual(len(self.index), 0)
+
+    def test_persisted_across_instances(self):
+        self.index.add("a", "2030-01-01T00:00:00+00:00")
+        other = ScheduleIndex(self.index.path)
+        self.assertEqual(other.due(datetime(2031, 1, 1, tzinfo=timezone.utc)), ["a"])
+
+        # Changes made by another instance are picked up
+        other.remove("a")
+        self.assertEqual(len(self.index), 0)
+
+class TestSchedulerDuePosts(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.original_drafts_file = data_handler.DRAFTS_FILE
+        self.original_posted_log = data_handler.POSTED_LOG
+        data_handler.DRAFTS_FILE = os.path.join(self.test_dir, "drafts.csv")
+        data_handler.POSTED_LOG = os.path.join(self.test_dir, "posted_history.csv")
+
+        self.dm = data_handler.DataManager()
+        self.scheduler = TweetScheduler(self.dm)
+
+    def tearDown(self):
+        data_handler.DRAFTS_FILE = self.original_drafts_file
+        data_handler.POSTED_LOG = self.original_posted_log
+        shutil.rmtree(self.test_dir)
+
+    def test_due_posts_use_index(self):
+        past = self.dm.add_draft("Past")
+        future = self.dm.add_draft("Future")
+        self.assertTrue(self.scheduler.schedule_draft(past, "2000-01-01T00:00:00+00:00"))
+        self.assertTrue(self.scheduler.schedule_draft(future, "2999-01-01T00:00:00+00:00"))
+        self.assertFalse(self.scheduler.schedule_draft("missing", "2000-01-01T00:00:00"))
+        self.assertEqual(len(self.scheduler.schedule_index), 2)
+
+        self.assertEqual([d["id"] for d in self.scheduler.get_due_posts()], [past])
+
+        # Posting the draft leaves a stale entry that get_due_posts prunes
+        self.dm.mark_as_posted(past, "123")
+        self.assertEqual(self.scheduler.get_due_posts(), [])
+        self.assertEqual(len(self.scheduler.schedule_index), 1)
+
+        self.assertTrue(self.scheduler.unschedule_draft(future))
+        self.assertEqual(len(self.scheduler.schedule_index), 0)
+
+    def test_index_rebuilt_when_missing(self):
+        draft_id = self.dm.add_draft("Scheduled")
+        self.scheduler.schedule_draft(draft_id, "2000-01-01T00:00:00")
+        os.remove(self.scheduler.schedule_index.path)
+
+        scheduler = TweetScheduler(self.dm)
+        self.assertEqual([d["id"] for d in scheduler.get_due_posts()], [draft_id])
+
+    def test_runner_in_another_timezone_posts_naive_time(self):
+        draft_id = self.dm.add_draft("Scheduled in Chicago")
+        try:
+            with patch.dict(os.environ, {"TZ": "America/Chicago"}):
+                time.tzset()
+                self.assertTrue(self.scheduler.schedule_draft(draft_id, "2001-01-01T14:30:00"))
+            self.assertEqual(self.dm.get_draft(draft_id)["scheduled_time"], "2001-01-01T14:30:00-06:00")
+
+            # The posting job runs on a UTC machine
+            with patch.dict(os.environ, {"TZ": "UTC"}):
+                time.tzset()
+                scheduler = TweetScheduler(self.dm)
+                self.assertEqual([d["id"] for d in scheduler.get_due_posts()], [draft_id])
+                self.assertEqual(len(scheduler.schedule_index), 1)
+        finally:
+            time.tzset()
+
+    def test_drafts_scheduled_outside_the_scheduler_are_indexed(self):
+        scheduled = self.dm.add_draft("Scheduled")
+        self.scheduler.schedule_draft(scheduled, "2000-01-01T00:00:00+00:00")
+
+        # E.g. an imported drafts CSV or an older checkout writes the draft directly
+        imported = self.dm.add_draft("Imported")
+        self.dm.update_draft(imported, status="scheduled", scheduled_time="2000-01-02T00:00:00+00:00")
+
+        self.assertEqual([d["id"] for d in self.scheduler.get_due_posts()], [scheduled, imported])
+
+    def test_fresh_checkout_reuses_index_without_writing_it(self):
+        draft_id = self.dm.add_draft("Scheduled")
+        self.scheduler.schedule_draft(draft_id, "2999-01-01T00:00:00+00:00")
+
+        # A fresh clone: same contents, new inodes and mtimes
+        clone_dir = os.path.join(self.test_dir, "clone")
+        os.makedirs(clone_dir)
+        for name in os.listdir(self.test_dir):
+            if name != "clone":
+                shutil.copy(os.path.join(self.test_dir, name), clone_dir)
+        data_handler.DRAFTS_FILE = os.path.join(clone_dir, "drafts.csv")
+        index_path = os.path.join(clone_dir, "schedule_index.json")
+        before = os.stat(index_path)
+
+        with patch.object(TweetScheduler, "rebuild_schedule_index") as rebuild:
+            scheduler = TweetScheduler(data_handler.DataManager())
+            self.assertEqual(scheduler.get_due_posts(), [])
+        rebuild.assert_not_called()
+        self.assertEqual(os.stat(index_path).st_mtime_ns, before.st_mtime_ns)
+
+    def test_idle_run_without_scheduled_drafts_creates_no_index(self):
+        self.dm.add_draft("Pending")
+        scheduler = TweetScheduler(self.dm)
+        self.assertEqual(scheduler.get_due_posts(), [])
+        self.assertFalse(scheduler.schedule_index.exists())
+
+if __name__ == "__main__":
+    unittest.main()
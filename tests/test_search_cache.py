@@ -0,0 +1,102 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+import data_handler
+from twitter_handler import TwitterHandler
+from cursor_store import CursorStore
+
+def search_response(ids):
+    response = MagicMock(status_code=200)
+    body = {"data": [{"id": i, "text": f"tweet {i}", "author_id": "1"} for i in ids], "meta": {}}
+    if ids:
+        body["meta"]["newest_id"] = max(ids, key=int)
+    response.json.return_value = body
+    return response
+
+class TestIncrementalSearch(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.test_dir, "user_cache.json"),
+            "TWITTER_CONSUMER_KEY": "fake_key",
+            "TWITTER_ACCESS_TOKEN": "fake_token",
+        })
+        self.env_patcher.start()
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.handler.cursors = CursorStore(os.path.join(self.test_dir, "cursors.json"))
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_repeat_search_served_from_cache(self):
+        self.handler.session.get.return_value = search_response(["1", "2"])
+        first = self.handler.search_tweets("python", 5)
+        second = self.handler.search_tweets("python", 5)
+        self.assertEqual(first, second)
+        self.assertEqual(self.handler.session.get.call_count, 1)
+        # The API minimum page size is 10
+        self.assertEqual(self.handler.session.get.call_args.kwargs["params"]["max_results"], 10)
+
+        # Expired pages are fetched again
+        with patch("twitter_handler.time.monotonic", return_value=10**9):
+            self.handler.search_tweets("python", 5)
+        self.assertEqual(self.handler.session.get.call_count, 2)
+
+    def test_incremental_uses_since_id(self):
+        self.handler.session.get.return_value = search_response(["9", "10"])
+        self.handler.search_tweets("python", 5, incremental=True)
+        self.assertNotIn("since_id", self.handler.session.get.call_args.kwargs["params"])
+        # Searching alone doesn't move the cursor; the caller does once the tweets are handled
+        self.assertIsNone(self.handler.cursors.get("search:python"))
+
+        self.handler.advance_search_cursor("python", "10")
+        self.handler.session.get.return_value = search_response([])
+        results = self.handler.search_tweets("python", 5, incremental=True)
+        self.assertEqual(results, [])
+        self.assertEqual(self.handler.session.get.call_args.kwargs["params"]["since_id"], "10")
+
+        # The cursor never moves backwards
+        self.handler.advance_search_cursor("python", "9")
+        self.assertEqual(self.handler.cursors.get("search:python"), {"since_id": "10"})
+
+    def test_count_smaller_than_page(self):
+        # Search returns the newest tweets first; the API minimum page is 10
+        self.handler.session.get.return_value = search_response([str(i) for i in range(10, 0, -1)])
+        results = self.handler.search_tweets("python", 5, incremental=True)
+        self.assertEqual(self.handler.session.get.call_args.kwargs["params"]["max_results"], 10)
+        self.assertEqual([t["id"] for t in results], ["10", "9", "8", "7", "6"])
+        self.assertIsNone(self.handler.cursors.get("search:python"))
+
+        # Once handled, the next search only asks for tweets newer than the ones returned
+        self.handler.advance_search_cursor("python", max((t["id"] for t in results), key=int))
+        self.handler.session.get.return_value = search_response(["11"])
+        self.assertEqual([t["id"] for t in self.handler.search_tweets("python", 5, incremental=True)], ["11"])
+        self.assertEqual(self.handler.session.get.call_args.kwargs["params"]["since_id"], "10")
+
+class TestDraftedTweetIds(unittest.TestCase):
+    def test_drafted_tweet_ids(self):
+        test_dir = tempfile.mkdtemp()
+        originals = (data_handler.DRAFTS_FILE, data_handler.POSTED_LOG, data_handler.POST_ATTEMPT_LOG)
+        try:
+            data_handler.DRAFTS_FILE = os.path.join(test_dir, "drafts.csv")
+            data_handler.POSTED_LOG = os.path.join(test_dir, "posted_history.csv")
+            data_handler.POST_ATTEMPT_LOG = os.path.join(test_dir, "post_log.csv")
+            dm = data_handler.DataManager()
+            dm.add_draft("Comment", is_retweet=True, original_tweet_id="123")
+            dm.add_draft("Plain tweet")
+            self.assertEqual(dm.drafted_tweet_ids(), {"123"})
+        finally:
+            data_handler.DRAFTS_FILE, data_handler.POSTED_LOG, data_handler.POST_ATTEMPT_LOG = originals
+            shutil.rmtree(test_dir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import sys
+from datetime import datetime, timezone, timedelta
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from strategy_slots import SlotCalendar, DEFAULT_SLOT_CONFIG
+
+class TestSlotCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = SlotCalendar.from_config(DEFAULT_SLOT_CONFIG)
+
+    def test_next_slot_after(self):
+        # Wed Feb 4 2026, 10:30 UTC -> next is 08:00 CST = 14:00 UTC
+        now = datetime(2026, 2, 4, 10, 30, tzinfo=timezone.utc)
+        self.assertEqual(self.calendar.next_slot_after(now), datetime(2026, 2, 4, 14, 0, tzinfo=timezone.utc))
+
+        # Strictly after: a slot start itself returns the following slot
+        slot = datetime(2026, 2, 4, 14, 0, tzinfo=timezone.utc)
+        self.assertEqual(self.calendar.next_slot_after(slot), datetime(2026, 2, 4, 20, 0, tzinfo=timezone.utc))
+
+    def test_dst_uses_local_time(self):
+        # In July Chicago is on CDT (UTC-5), so 08:00 local is 13:00 UTC
+        july = datetime(2026, 7, 15, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(self.calendar.next_slot_after(july), datetime(2026, 7, 15, 13, 0, tzinfo=timezone.utc))
+        self.assertIsNotNone(self.calendar.slot_at(datetime(2026, 7, 15, 13, 3, tzinfo=timezone.utc)))
+        self.assertIsNone(self.calendar.slot_at(datetime(2026, 7, 15, 14, 0, tzinfo=timezone.utc)))
+
+    def test_slots_between(self):
+        # One week: 2 growth slots per day, 3 vampire slots on Mon, Tue and Fri
+        start = datetime(2026, 2, 2, 6, 0, tzinfo=timezone.utc)  # Mon 00:00 CST
+        slots = self.calendar.slots_between(start, start + timedelta(days=7))
+        self.assertEqual(len(slots), 7 * 2 + 3 * 3)
+        self.assertEqual(slots[0], start)
+        self.assertEqual(slots, sorted(slots))
+
+    def test_slot_at_extends_backwards(self):
+        self.calendar.next_slot_after(datetime(2026, 2, 4, tzinfo=timezone.utc))
+        earlier = datetime(2025, 12, 1, 14, 4, tzinfo=timezone.utc)
+        self.assertEqual(self.calendar.slot_at(earlier), datetime(2025, 12, 1, 14, 0, tzinfo=timezone.utc))
+
+    def test_load_config_file(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, "strategy_slots.json")
+            with open(path, 'w') as f:
+                json.dump({
+                    "timezone": "Europe/London",
+                    "window_minutes": 10,
+                    "rules": [{"name": "lunch", "weekdays": ["sat"], "hours": [12], "minutes": [30]}],
+                }, f)
+
+            calendar = SlotCalendar.load(path)
+            fri = datetime(2026, 2, 6, tzinfo=timezone.utc)
+            self.assertEqual(calendar.next_slot_after(fri), datetime(2026, 2, 7, 12, 30, tzinfo=timezone.utc))
+            self.assertIsNotNone(calendar.slot_at(datetime(2026, 2, 7, 12, 39, tzinfo=timezone.utc)))
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_no_rules(self):
+        calendar = SlotCalendar([])
+        now = datetime(2026, 2, 4, tzinfo=timezone.utc)
+        self.assertIsNone(calendar.next_slot_after(now))
+        self.assertFalse(calendar.slot_at(now))
+
+if __name__ == "__main__":
+    unittest.main()
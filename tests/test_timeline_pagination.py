@@ -0,0 +1,109 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from twitter_handler import TwitterHandler
+from cursor_store import CursorStore
+from sampling import reservoir_sample
+
+def page(tweets, next_token=None, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    body = {"data": [{"id": str(i), "text": f"tweet {i}"} for i in tweets], "meta": {}}
+    if next_token:
+        body["meta"]["next_token"] = next_token
+    response.json.return_value = body
+    return response
+
+class TestTimelinePagination(unittest.TestCase):
+    def setUp(self):
+        # Keep the on-disk user ID cache out of data/ and separate per test
+        self.user_cache_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.user_cache_dir, "user_cache.json"),
+            "TWITTER_CONSUMER_KEY": "fake_key",
+            "TWITTER_ACCESS_TOKEN": "fake_token",
+        })
+        self.env_patcher.start()
+        self.test_dir = tempfile.mkdtemp()
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+        self.handler.cursors = CursorStore(os.path.join(self.test_dir, "cursors.json"))
+        self.handler.username_cache["writer"] = "7"
+
+        # Three pages of 100: 0-99, 100-199, 200-249
+        self.pages = {None: page(range(100), "p2"), "p2": page(range(100, 200), "p3"), "p3": page(range(200, 250))}
+        self.tokens = []
+        def get(url, params=None, **kwargs):
+            token = params.get("pagination_token")
+            self.tokens.append(token)
+            return self.pages[token]
+        self.handler.session.get.side_effect = get
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        shutil.rmtree(self.user_cache_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_follows_pagination_tokens(self):
+        tweets = self.handler.get_user_tweets("writer", count=1000)
+        self.assertEqual(len(tweets), 250)
+        self.assertEqual(tweets[-1], "tweet 249")
+        self.assertEqual(self.tokens, [None, "p2", "p3"])
+
+    def test_stops_at_limit(self):
+        tweets = self.handler.iter_user_tweets("writer", limit=150)
+        self.assertEqual([t["id"] for t in tweets], [str(i) for i in range(150)])
+        self.assertEqual(self.tokens, [None, "p2"])
+        # Second page only asks for what is still needed
+        self.assertEqual(self.handler.session.get.call_args.kwargs["params"]["max_results"], 50)
+
+    def test_is_lazy(self):
+        tweets = self.handler.iter_user_tweets("writer")
+        next(tweets)
+        self.assertEqual(self.tokens, [None])
+
+    def test_resume_from_saved_cursor(self):
+        self.pages["p2"] = page([], status_code=429, headers={
+            "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(int(time.time()) + 3600)
+        })
+        first = list(self.handler.iter_user_tweets("writer", resume=True))
+        self.assertEqual(len(first), 100)
+        self.assertEqual(self.handler.cursors.get("timeline:writer"), {"pagination_token": "p2"})
+
+        # Limit resets; a new process picks up at page two
+        self.pages["p2"] = page(range(100, 200), "p3")
+        handler = TwitterHandler()
+        handler.session = self.handler.session
+        handler.username_cache["writer"] = "7"
+        handler.cursors = CursorStore(self.handler.cursors.path)
+        rest = list(handler.iter_user_tweets("writer", resume=True))
+
+        self.assertEqual(rest[0]["id"], "100")
+        self.assertEqual(len(rest), 150)
+        # Finished timelines drop their cursor
+        self.assertIsNone(handler.cursors.get("timeline:writer"))
+
+class TestReservoirSample(unittest.TestCase):
+    def test_sample_size_and_membership(self):
+        sample = reservoir_sample(iter(range(10000)), 20, random.Random(1))
+        self.assertEqual(len(sample), 20)
+        self.assertEqual(len(set(sample)), 20)
+        self.assertTrue(all(0 <= x < 10000 for x in sample))
+        # Not just the head of the stream
+        self.assertTrue(max(sample) >= 20)
+
+    def test_short_stream(self):
+        self.assertEqual(reservoir_sample(range(3), 5), [0, 1, 2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import sys
 import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -10,7 +12,10 @@ from twitter_handler import TwitterHandler
 
 class TestTwitterHandler(unittest.TestCase):
     def setUp(self):
+        # Keep the on-disk user ID cache out of data/ and separate per test
+        self.user_cache_dir = tempfile.mkdtemp()
         self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.user_cache_dir, "user_cache.json"),
             "TWITTER_CONSUMER_KEY": "fake_key",
             "TWITTER_CONSUMER_SECRET": "fake_secret",
             "TWITTER_ACCESS_TOKEN": "fake_token",
@@ -22,6 +27,7 @@ class TestTwitterHandler(unittest.TestCase):
 
     def tearDown(self):
         self.env_patcher.stop()
+        shutil.rmtree(self.user_cache_dir)
 
     def test_retweet_caches_user_id(self):
         # Mock responses
@@ -0,0 +1,109 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from urllib3 import encode_multipart_formdata
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from upload_stream import MultipartStream, mapped_chunks
+
+class TestMultipartStream(unittest.TestCase):
+    def test_matches_standard_encoding(self):
+        fields = {"command": "APPEND", "media_id": "42", "segment_index": 3}
+        stream = MultipartStream(fields, "media", b"\x00payload\xff", boundary="BOUNDARY")
+
+        expected, content_type = encode_multipart_formdata(
+            [(k, str(v)) for k, v in fields.items()] + [("media", ("media", b"\x00payload\xff", "application/octet-stream"))],
+            boundary="BOUNDARY",
+        )
+        self.assertEqual(stream.read(), expected)
+        self.assertEqual(len(stream), len(expected))
+        self.assertEqual(stream.content_type, content_type)
+
+    def test_small_reads_and_rewind(self):
+        stream = MultipartStream({"command": "APPEND"}, "media", b"x" * 100)
+        whole = stream.read()
+        stream.seek(0)
+
+        pieces = []
+        while True:
+            piece = stream.read(7)
+            if not piece:
+                break
+            self.assertLessEqual(len(piece), 7)
+            pieces.append(bytes(piece))
+        self.assertEqual(b"".join(pieces), whole)
+        self.assertEqual(stream.tell(), len(whole))
+
+    def test_payload_is_not_copied(self):
+        buffer = bytearray(b"abcdef")
+        stream = MultipartStream({}, "media", memoryview(buffer)[2:5])
+        buffer[2:5] = b"XYZ"
+        self.assertIn(b"XYZ", stream.read())
+
+class TestMappedChunks(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunks(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"abcdefghij")
+        with mapped_chunks(self.path, 4) as chunks:
+            self.assertEqual([bytes(chunk) for chunk in chunks], [b"abcd", b"efgh", b"ij"])
+
+    def test_empty_file(self):
+        with mapped_chunks(self.path, 4) as chunks:
+            self.assertEqual(list(chunks), [])
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((self.headers["Content-Type"], body))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class TestStreamOverHTTP(unittest.TestCase):
+    def test_requests_sends_stream(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            fd, path = tempfile.mkstemp()
+            with os.fdopen(fd, 'wb') as f:
+                f.write(os.urandom(100000))
+            with mapped_chunks(path, 64 * 1024) as chunks:
+                chunk = next(chunks)
+                stream = MultipartStream({"command": "APPEND"}, "media", chunk)
+                expected = stream.read()
+                stream.seek(0)
+                response = requests.post(f"http://127.0.0.1:{server.server_port}/upload", data=stream,
+                                         headers={"Content-Type": stream.content_type})
+                del chunk, stream
+            os.remove(path)
+
+            self.assertEqual(response.status_code, 204)
+            self.assertEqual(_EchoHandler.received[-1][1], expected)
+            self.assertTrue(_EchoHandler.received[-1][0].startswith("multipart/form-data; boundary="))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
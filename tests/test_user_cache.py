@@ -0,0 +1,97 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from twitter_handler import TwitterHandler
+from user_cache import UserIdCache
+
+class TestUserIdCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "user_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_shared_through_file(self):
+        UserIdCache(self.path)["SomeOne"] = "1"
+        other = UserIdCache(self.path)
+        self.assertEqual(other.get("@someone"), "1")
+        self.assertIn("someone", other)
+        with self.assertRaises(KeyError):
+            other["nobody"]
+
+    def test_ttl(self):
+        cache = UserIdCache(self.path, ttl_seconds=60)
+        cache["old"] = "1"
+        with patch("user_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("old"))
+
+    def test_lru_eviction(self):
+        cache = UserIdCache(self.path, max_entries=2)
+        cache["a"] = "1"
+        cache["b"] = "2"
+        with patch("user_cache.time.time", return_value=time.time() + 1):
+            cache.get("a")  # b is now least recently used
+            cache["c"] = "3"
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), ("1", None, "3"))
+
+class TestHandlerUserIds(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {
+            "TWITTER_USER_CACHE_FILE": os.path.join(self.test_dir, "user_cache.json"),
+            "TWITTER_CONSUMER_KEY": "fake_key",
+            "TWITTER_ACCESS_TOKEN": "fake_token",
+        })
+        self.env_patcher.start()
+        self.handler = TwitterHandler()
+        self.handler.session = MagicMock()
+
+    def tearDown(self):
+        self.env_patcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_my_user_id_survives_restart(self):
+        self.handler.user_id = "99"
+        self.assertEqual(TwitterHandler().user_id, "99")
+        with patch.dict(os.environ, {"TWITTER_ACCESS_TOKEN": "other_token"}):
+            self.assertIsNone(TwitterHandler().user_id)
+
+    def test_batch_resolver(self):
+        self.handler.username_cache["cached"] = "0"
+        usernames = ["cached"] + [f"user{i}" for i in range(150)] + ["missing"]
+
+        def get(url, params=None, **kwargs):
+            names = params["usernames"].split(",")
+            response = MagicMock(status_code=200)
+            response.json.return_value = {
+                "data": [{"id": name[4:], "username": name.upper()} for name in names if name.startswith("user")],
+                "errors": [{"value": name} for name in names if not name.startswith("user")],
+            }
+            return response
+        self.handler.session.get.side_effect = get
+
+        resolved = self.handler.resolve_user_ids(usernames)
+
+        self.assertEqual(len(resolved), 151)
+        self.assertEqual(resolved["user7"], "7")
+        self.assertEqual(resolved["cached"], "0")
+        self.assertNotIn("missing", resolved)
+        self.assertEqual(self.handler.session.get.call_count, 2)  # 151 unknown names, 100 per call
+        first_batch = self.handler.session.get.call_args_list[0].kwargs["params"]["usernames"].split(",")
+        self.assertNotIn("cached", first_batch)
+
+        # Resolved ids are reused by single lookups in another process
+        self.assertEqual(TwitterHandler()._resolve_user_id("USER42"), "42")
+        self.assertEqual(self.handler.session.get.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()